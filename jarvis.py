@@ -1,21 +1,50 @@
+import time
+
+_INICIO_STARTUP = time.perf_counter()
+
 import sys
 import os
 import atexit
-import importlib.util
-import inspect
+import importlib
 import re
 import json
-from datetime import datetime, timedelta
+import subprocess
+import queue
+import threading
+import uuid
+import asyncio
+import concurrent.futures
+from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Optional, Callable, Any, Tuple
 from dotenv import load_dotenv
 
 from skills.util_comuns import (
     LOG_DIR,
     SKILLS_DIR,
+    cancelar_processo,
     cleanup_processos
 )
-from skills.cerebro import gemini_cli_raw
-from skills.codex_cli import executar_codex_cli, executar_codex_cli_raw
+from skills.cerebro import gemini_cli_raw_async
+from skills.codex_cli import executar_codex_cli_async, executar_codex_cli_raw_async
+from skills._motor_async import MOTOR
+from skills._pool_gemini import POOL_GEMINI
+from skills._cache_respostas import CACHE_GEMINI
+from skills._arquivo_logs import ARQUIVO
+from skills._escritor_logs import ESCRITOR
+from skills._cache_artefatos import resumo_artefatos
+from skills._politica_execucao import POLITICA
+from skills import _traces as traces
+from skills._contexto import MotorContexto
+from skills._roteador_local import LIMIAR_PADRAO, ROTAS_LOG, RoteadorLocal
+from skills._manifesto_skills import MANIFESTO_SKILLS, ferramentas_do_arquivo
+from skills._recarregador_skills import MARCADOR_RELOAD, RecarregadorSkills
+
+# --- PERFIL DE STARTUP ---
+# `python jarvis.py --profile-startup` imprime o tempo de cada fase do bootstrap e sai.
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+_FASES_STARTUP: List[Tuple[str, float]] = [("imports", time.perf_counter())]
+_MODULOS_PESADOS = ["pydantic", "numpy", "requests", "lxml", "crawl4ai", "playwright", "yt_dlp", "PIL"]
 
 # --- CONFIGURACAO DE VERSAO ---
 VERSION = "0.4.1"
@@ -41,12 +70,17 @@ ROUTER_MODE = os.getenv("ROUTER_MODE", "rules").lower()
 ROUTER_MODE = ROUTER_MODE if ROUTER_MODE in {"rules", "llm", "hybrid"} else "rules"
 HISTORY_TURNS = int(os.getenv("HISTORY_TURNS", "8"))
 HISTORY_MAX_CHARS = int(os.getenv("HISTORY_MAX_CHARS", "2000"))
-SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "4000"))
+RECALL_MEMORIA = os.getenv("RECALL_MEMORIA", "1").lower() not in {"0", "false", "no"}
+CONTEXT_SUMMARIZE = os.getenv("CONTEXT_SUMMARIZE", "0").lower() not in {"0", "false", "no"}
 CODEX_SANDBOX = os.getenv("CODEX_SANDBOX", "workspace-write")
 CODEX_TIMEOUT = int(os.getenv("CODEX_TIMEOUT", "900"))
 CODEX_MODEL = os.getenv("CODEX_MODEL", "")
 SLASH_ROUTE = os.getenv("SLASH_ROUTE", "auto").lower()
 SLASH_ROUTE = SLASH_ROUTE if SLASH_ROUTE in {"auto", "gemini", "codex"} else "auto"
+STREAM_OUTPUT = os.getenv("STREAM_OUTPUT", "1").lower() not in {"0", "false", "no"}
+ROUTER_SPECULATE = os.getenv("ROUTER_SPECULATE", "1").lower() not in {"0", "false", "no"}
+ROUTER_LOCAL = os.getenv("ROUTER_LOCAL", "1").lower() not in {"0", "false", "no"}
+HOT_RELOAD = os.getenv("JARVIS_HOT_RELOAD", "1").lower() not in {"0", "false", "no"}
 
 SKILLS_ALLOWLIST = {
     s.strip() for s in os.getenv(
@@ -70,10 +104,24 @@ def ensure_skills_dir() -> None:
         init_file.touch()
 
 
+def listar_arquivos_skills() -> List[Path]:
+    """Arquivos skills/*.py candidatos a skill (sem privados `_*.py` e util_comuns)."""
+    with os.scandir(SKILLS_DIR) as it:
+        return sorted(
+            SKILLS_DIR / e.name for e in it
+            if e.name.endswith(".py") and not e.name.startswith("_") and e.name != "util_comuns.py"
+        )
+
+
+def skill_permitida(py_file: Path) -> bool:
+    return py_file.stem in SKILLS_ALLOWLIST
+
+
 def carregar_ferramentas_dinamicas() -> List[Callable]:
     """
-    Carrega ferramentas dinamicamente da pasta skills/.
+    Registra as ferramentas da pasta skills/ a partir do manifesto em cache (ast).
     Critérios: funcoes com docstrings e type hints.
+    Os modulos so sao importados na primeira chamada (ver skills/_manifesto_skills.py).
     Aplica allowlist: apenas infra (sistema, memoria, cerebro, codex_cli).
     """
     ensure_skills_dir()
@@ -81,32 +129,22 @@ def carregar_ferramentas_dinamicas() -> List[Callable]:
 
     print(f"Buscando skills em {SKILLS_DIR.resolve()} (allowlist: {sorted(SKILLS_ALLOWLIST)})")
 
-    for py_file in SKILLS_DIR.glob("*.py"):
-        if py_file.name.startswith("_") or py_file.name == "util_comuns.py":
-            continue
-        if py_file.stem not in SKILLS_ALLOWLIST:
-            continue
+    arquivos = [py_file for py_file in listar_arquivos_skills() if skill_permitida(py_file)]
+    try:
+        manifesto = MANIFESTO_SKILLS.atualizar(arquivos)
+    except Exception as e:
+        print(f"  Falha ao ler manifesto de skills: {e}")
+        return dynamic_tools
 
+    for py_file in arquivos:
         module_name = f"skills.{py_file.stem}"
-        try:
-            if module_name in sys.modules:
-                mod = importlib.reload(sys.modules[module_name])
-            else:
-                spec = importlib.util.spec_from_file_location(module_name, py_file)
-                if spec and spec.loader:
-                    mod = importlib.util.module_from_spec(spec)
-                    sys.modules[module_name] = mod
-                    spec.loader.exec_module(mod)
-                else:
-                    continue
-
-            for name, func in inspect.getmembers(mod, inspect.isfunction):
-                if func.__module__ == module_name:
-                    if func.__doc__ and func.__annotations__:
-                        dynamic_tools.append(func)
-                        print(f"  + Skill carregada: {name} ({module_name})")
-        except Exception as e:
-            print(f"  Falha ao carregar {py_file.name}: {e}")
+        entrada = manifesto[py_file.name]
+        if entrada.get("erro"):
+            print(f"  Falha ao carregar {py_file.name}: {entrada['erro']}")
+            continue
+        for ferramenta in ferramentas_do_arquivo(py_file, entrada):
+            dynamic_tools.append(ferramenta)
+            print(f"  + Skill carregada: {ferramenta.__name__} ({module_name})")
 
     return dynamic_tools
 
@@ -147,19 +185,12 @@ def _parse_direct_tool_call(msg: str) -> Optional[tuple[str, Dict[str, Any]]]:
 atexit.register(cleanup_processos)
 
 
-def rotacionar_logs(dias_retencao: int = 3) -> None:
-    agora = datetime.now()
-    removidos = 0
-    for log_file in LOG_DIR.glob("*.txt"):
-        try:
-            mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-            if agora - mtime > timedelta(days=dias_retencao):
-                log_file.unlink()
-                removidos += 1
-        except:
-            pass
-    if removidos:
-        print(f"{removidos} logs antigos removidos.")
+def rotacionar_logs() -> None:
+    # Retencao por tamanho do arquivo de execucoes: so stat dos segmentos, sem varrer registros.
+    pendentes = ARQUIVO.arquivar_pendentes()
+    removidos = ARQUIVO.aplicar_retencao()
+    if pendentes or removidos:
+        print(f"Arquivo de logs: {pendentes} pendentes arquivados, {removidos} segmentos antigos removidos.")
 
 
 # --- SEGURANCA ---
@@ -204,14 +235,14 @@ def _route_rules(msg: str) -> Optional[str]:
     return None
 
 
-def _route_llm(msg: str) -> Optional[str]:
+async def _route_llm_async(msg: str) -> Optional[str]:
     prompt = (
         "Classifique a mensagem do usuario como GEMINI (pensar) ou CODEX (executar). "
         "Responda APENAS com GEMINI ou CODEX.\n\n"
         f"MENSAGEM:\n{msg}\n"
     )
     try:
-        output = gemini_cli_raw(prompt)
+        output = await gemini_cli_raw_async(prompt, usar_cache=True)
     except Exception:
         return None
     if not output:
@@ -227,19 +258,156 @@ def _route_llm(msg: str) -> Optional[str]:
     return None
 
 
-def escolher_rota(msg: str) -> str:
+def _route_llm(msg: str) -> Optional[str]:
+    return MOTOR.executar(_route_llm_async(msg))
+
+
+def _route_local(msg: str) -> Optional[str]:
+    """Classificador local (skills/_roteador_local.py); None quando incerto ou sem modelo."""
+    if ROTEADOR_LOCAL is None:
+        return None
+    route, confianca = ROTEADOR_LOCAL.prever(msg)
+    return route if confianca >= LIMIAR_PADRAO else None
+
+
+def _registrar_rota(msg: str, route: str, origem: str) -> None:
+    """Diario de roteamento (dataset de treino do roteador local)."""
+    registro = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "msg": msg[:2000],
+        "rota": route,
+        "origem": origem,
+    }
+    traces.anotar(origem_rota=origem)
+    ESCRITOR.anexar(ROTAS_LOG, json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+async def _decidir_rota_async(msg: str) -> Tuple[str, str]:
     rule_choice = _route_rules(msg)
     if ROUTER_MODE == "rules":
-        return rule_choice or "gemini"
-    if ROUTER_MODE == "llm":
-        llm_choice = _route_llm(msg)
-        return llm_choice or rule_choice or "gemini"
-    if ROUTER_MODE == "hybrid":
-        if rule_choice:
-            return rule_choice
-        llm_choice = _route_llm(msg)
-        return llm_choice or "gemini"
-    return rule_choice or "gemini"
+        return (rule_choice, "regras") if rule_choice else ("gemini", "padrao")
+    if ROUTER_MODE == "hybrid" and rule_choice:
+        return rule_choice, "regras"
+    local_choice = _route_local(msg)
+    if local_choice:
+        return local_choice, "local"
+    llm_choice = await _route_llm_async(msg)
+    if llm_choice:
+        return llm_choice, "llm"
+    if ROUTER_MODE == "llm" and rule_choice:
+        return rule_choice, "regras"
+    return "gemini", "padrao"
+
+
+async def escolher_rota_async(msg: str) -> str:
+    route, origem = await _decidir_rota_async(msg)
+    _registrar_rota(msg, route, origem)
+    return route
+
+
+def escolher_rota(msg: str) -> str:
+    return MOTOR.executar(escolher_rota_async(msg))
+
+
+# --- ROTEAMENTO ESPECULATIVO ---
+# Em ROUTER_MODE=llm|hybrid, quando as regras nao decidem, a classificacao via LLM
+# e a chamada ao Gemini (palpite mais provavel) rodam em paralelo. Se a classificacao
+# escolher Codex, a chamada especulativa e cancelada via PROCESSOS_ATIVOS.
+# So o Gemini e especulado: uma execucao especulativa do Codex poderia editar arquivos.
+ESTATISTICAS_ESPECULACAO: Dict[str, float] = {
+    "tentativas": 0,
+    "acertos": 0,
+    "erros": 0,
+    "segundos_economizados": 0.0,
+}
+
+
+class _RepasseEspeculativo:
+    """Segura as linhas da chamada especulativa ate a rota ser confirmada."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._destino: Optional[Callable[[str], None]] = None
+        self._liberado = False
+
+    def receber(self, linha: str) -> None:
+        with self._lock:
+            if not self._liberado:
+                self._buffer.append(linha)
+                return
+            destino = self._destino
+        if destino:
+            destino(linha)
+
+    def liberar(self, destino: Optional[Callable[[str], None]]) -> None:
+        with self._lock:
+            pendentes, self._buffer = self._buffer, []
+            self._destino = destino
+            self._liberado = True
+        if destino:
+            for linha in pendentes:
+                destino(linha)
+
+
+def _deve_especular(msg: str) -> bool:
+    if not ROUTER_SPECULATE or ROUTER_MODE not in {"llm", "hybrid"}:
+        return False
+    return _route_rules(msg) is None and _route_local(msg) is None
+
+
+async def _turno_especulativo(
+    msg: str,
+    prompt_gemini: str,
+    ao_receber: Optional[Callable[[str], None]],
+    ao_rotear: Optional[Callable[[str], None]],
+) -> Tuple[str, Optional[str]]:
+    """
+    Inicia classificacao e Gemini juntos. Retorna (rota, resultado); resultado e None
+    quando a especulacao falhou e a rota escolhida ainda precisa ser executada.
+    """
+    ESTATISTICAS_ESPECULACAO["tentativas"] += 1
+    repasse = _RepasseEspeculativo()
+    rid = str(uuid.uuid4())
+    alvo = asyncio.ensure_future(gemini_cli_raw_async(prompt_gemini, ao_receber=repasse.receber, rid=rid))
+
+    traces.anotar(especulativo=True)
+    inicio = time.perf_counter()
+    with traces.fase("roteamento"):
+        llm_choice = await _route_llm_async(msg)
+    duracao_classificacao = time.perf_counter() - inicio
+    route = llm_choice or "gemini"
+    _registrar_rota(msg, route, "llm" if llm_choice else "padrao")
+
+    if route == "gemini":
+        ESTATISTICAS_ESPECULACAO["acertos"] += 1
+        ESTATISTICAS_ESPECULACAO["segundos_economizados"] += duracao_classificacao
+        if ao_rotear:
+            ao_rotear(route)
+        repasse.liberar(ao_receber)
+        return route, await alvo
+
+    ESTATISTICAS_ESPECULACAO["erros"] += 1
+    repasse.liberar(None)
+    cancelar_processo(rid)
+    alvo.cancel()
+    try:
+        await alvo
+    except (asyncio.CancelledError, Exception):
+        pass
+    print(f"[ROUTER] Especulacao descartada ({rid}): rota {route}.")
+    return route, None
+
+
+def resumo_especulacao() -> str:
+    stats = ESTATISTICAS_ESPECULACAO
+    if not stats["tentativas"]:
+        return "Especulacao: nenhuma tentativa ainda."
+    taxa = 100 * stats["acertos"] / stats["tentativas"]
+    return (
+        f"Especulacao: {int(stats['acertos'])}/{int(stats['tentativas'])} acertos ({taxa:.0f}%), "
+        f"{int(stats['erros'])} cancelamentos, ~{stats['segundos_economizados']:.1f}s economizados."
+    )
 
 
 # --- HISTORICO E CONTEXTO ---
@@ -249,50 +417,16 @@ def _trim_text(text: str, max_chars: int) -> str:
     return f"{text[:max_chars]}\n[...TRUNCADO...]"
 
 
-def _merge_summary(summary: str, overflow: List[Dict[str, str]]) -> str:
-    lines = []
-    if summary:
-        lines.append(summary)
-    for item in overflow:
-        role = item.get("role", "unknown").upper()
-        content = item.get("content", "").strip()
-        if content:
-            lines.append(f"{role}: {content}")
-    combined = "\n".join(lines)
-    if len(combined) > SUMMARY_MAX_CHARS:
-        combined = combined[-SUMMARY_MAX_CHARS:]
-    return combined
-
-
-def _rollup_history(history: List[Dict[str, str]], summary: str) -> Tuple[List[Dict[str, str]], str]:
-    max_items = HISTORY_TURNS * 2
-    if len(history) <= max_items:
-        return history, summary
-    overflow = history[:-max_items]
-    summary = _merge_summary(summary, overflow)
-    return history[-max_items:], summary
-
-
-def _format_history(history: List[Dict[str, str]]) -> str:
-    lines = []
-    for item in history:
-        role = item.get("role", "unknown").upper()
-        content = item.get("content", "")
-        lines.append(f"{role}: {content}")
-    return "\n".join(lines)
-
-
-def _build_context(history: List[Dict[str, str]], summary: str) -> str:
-    parts = []
-    if summary:
-        parts.append(f"RESUMO:\n{summary}")
-    if history:
-        parts.append(f"ULTIMOS TURNOS:\n{_format_history(history)}")
-    return "\n\n".join(parts)
-
-
-def _build_gemini_prompt(msg: str, history: List[Dict[str, str]], summary: str) -> str:
-    context = _build_context(history, summary)
+async def _resumir_contexto(texto: str, max_tokens: int) -> str:
+    prompt = (
+        f"Resuma o historico abaixo em ate {max_tokens * 3 // 4} palavras, preservando fatos, "
+        "decisoes, nomes de arquivos e pendencias. Responda APENAS com o resumo.\n\n"
+        f"HISTORICO:\n{texto}\n"
+    )
+    return await gemini_cli_raw_async(prompt, usar_cache=True)
+
+
+def _build_gemini_prompt(msg: str, context: str) -> str:
     if context:
         return f"{context}\n\nUSUARIO:\n{msg}"
     return msg
@@ -309,25 +443,226 @@ def _extract_codex_final(report: str) -> str:
     return tail.strip()
 
 
+def _imprimir_stream(linha: str) -> None:
+    print(linha, flush=True)
+
+
+async def _executar_rota(
+    route: str,
+    msg: str,
+    context: str,
+    ao_receber: Optional[Callable[[str], None]] = None,
+) -> str:
+    slash = msg.lstrip().startswith("/")
+    if route == "codex":
+        if slash:
+            return await executar_codex_cli_raw_async(
+                prompt=msg,
+                sandbox=CODEX_SANDBOX,
+                timeout_segundos=CODEX_TIMEOUT,
+                modelo=CODEX_MODEL,
+                ao_receber=ao_receber
+            )
+        with traces.fase("prompt"):
+            CONTEXTO.medir(f"{context}\n\n{msg}")
+        return await executar_codex_cli_async(
+            tarefa=msg,
+            contexto=context,
+            sandbox=CODEX_SANDBOX,
+            timeout_segundos=CODEX_TIMEOUT,
+            modelo=CODEX_MODEL,
+            ao_receber=ao_receber
+        )
+    return await gemini_cli_raw_async(_prompt_gemini(msg, context), ao_receber=ao_receber)
+
+
+def _prompt_gemini(msg: str, context: str) -> str:
+    if msg.lstrip().startswith("/"):
+        return msg
+    with traces.fase("prompt"):
+        prompt = _build_gemini_prompt(msg, context)
+        CONTEXTO.medir(prompt)
+    return prompt
+
+
+def _memoria_skill() -> Any:
+    # Importada sob demanda (startup preguicoso); sempre a instancia atual do modulo.
+    return importlib.import_module("skills.memoria")
+
+
+async def _contexto_com_memoria(msg: str, context: str) -> str:
+    lembranca = await asyncio.to_thread(_memoria_skill().RECALL_MEMORIA.recordar, msg)
+    if not lembranca:
+        return context
+    return f"{lembranca}\n\n{context}" if context else lembranca
+
+
+async def executar_turno_async(
+    msg: str,
+    context: str,
+    ao_receber: Optional[Callable[[str], None]] = None,
+    ao_rotear: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, str]:
+    """
+    Roteia e executa um turno no motor async. Retorna (rota, resultado).
+    `context` e o contexto ja renderizado (ver `MotorContexto.renderizar`).
+    Cada turno grava um trace em `jarvis_logs/traces.jsonl` (ver skills/_traces.py).
+    """
+    with traces.turno(msg) as trace:
+        route, result = await _executar_turno(msg, context, ao_receber, ao_rotear)
+        trace.rota = route
+        trace.bytes_saida = len(result.encode("utf-8"))
+        return route, result
+
+
+async def _executar_turno(
+    msg: str,
+    context: str,
+    ao_receber: Optional[Callable[[str], None]],
+    ao_rotear: Optional[Callable[[str], None]],
+) -> Tuple[str, str]:
+    if RECALL_MEMORIA and not msg.lstrip().startswith("/"):
+        with traces.fase("memoria"):
+            context = await _contexto_com_memoria(msg, context)
+
+    if msg.lstrip().startswith("/") and SLASH_ROUTE in {"gemini", "codex"}:
+        route = SLASH_ROUTE
+        traces.anotar(origem_rota="slash")
+    elif _deve_especular(msg):
+        route, result = await _turno_especulativo(
+            msg, _prompt_gemini(msg, context), ao_receber, ao_rotear
+        )
+        if result is not None:
+            return route, result
+    else:
+        with traces.fase("roteamento"):
+            route = await escolher_rota_async(msg)
+
+    if ao_rotear:
+        ao_rotear(route)
+    result = await _executar_rota(route, msg, context, ao_receber)
+    return route, result
+
+
+def _registrar_turno(msg: str, route: str, result: str) -> None:
+    CONTEXTO.adicionar("user", _trim_text(msg, HISTORY_MAX_CHARS))
+    if route == "codex":
+        assistant_text = _extract_codex_final(result)
+    else:
+        assistant_text = result
+    CONTEXTO.adicionar("assistant", _trim_text(assistant_text, HISTORY_MAX_CHARS))
+
+
+def _concluir_background(
+    numero: int,
+    msg: str,
+    concluidos: "queue.Queue[Tuple[str, str, str]]",
+    futuro: concurrent.futures.Future,
+) -> None:
+    try:
+        route, result = futuro.result()
+    except Exception as e:
+        print(f"\n[#{numero}] ERRO: {e}")
+        return
+    resposta = _extract_codex_final(result) if route == "codex" else result
+    print(f"\n[#{numero}] BOT ({route}): {resposta}")
+    concluidos.put((msg, route, result))
+
+
+def _invalidar_resumo_brain(_: List[str]) -> None:
+    # O resumo de skills do Brain so existe se skills.cerebro ja foi importado.
+    cerebro = sys.modules.get("skills.cerebro")
+    if cerebro is not None:
+        cerebro.invalidar_resumo_skills()
+
+
+def _marcar_fase(nome: str) -> None:
+    _FASES_STARTUP.append((nome, time.perf_counter()))
+
+
+def relatorio_startup() -> str:
+    linhas = ["Perfil de startup (ms):"]
+    anterior = _INICIO_STARTUP
+    for nome, instante in _FASES_STARTUP:
+        linhas.append(f"  {nome:<20} {(instante - anterior) * 1000:8.1f}")
+        anterior = instante
+    linhas.append(f"  {'total (processo)':<20} {(anterior - _INICIO_STARTUP) * 1000:8.1f}")
+
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=False)
+    linhas.append(f"  {'piso (python -c pass)':<20} {(time.perf_counter() - inicio) * 1000:7.1f}")
+
+    carregados = [m for m in _MODULOS_PESADOS if m in sys.modules]
+    ausentes = [m for m in _MODULOS_PESADOS if m not in sys.modules]
+    importadas = sum(1 for f in TOOL_MAP.values() if getattr(f, "carregada", True))
+    linhas.append(f"Modulos carregados: {len(sys.modules)}. Pesados importados: {', '.join(carregados) or 'nenhum'}.")
+    linhas.append(f"Pesados adiados: {', '.join(ausentes) or 'nenhum'}.")
+    linhas.append(
+        f"Skills: {len(TOOL_MAP)} registradas, {importadas} ja importadas. "
+        f"Manifesto: {MANIFESTO_SKILLS.stats['reaproveitados']} arquivos em cache, "
+        f"{MANIFESTO_SKILLS.stats['reprocessados']} reprocessados."
+    )
+    return "\n".join(linhas)
+
+
+# --- STATS ---
+# `python jarvis.py stats [N]` agrega os traces (ultimos N turnos) e sai sem subir o REPL.
+if __name__ == "__main__" and sys.argv[1:2] == ["stats"]:
+    ultimos = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 0
+    print(traces.resumo_traces(ultimos))
+    print(POLITICA.resumo())
+    print(ARQUIVO.resumo())
+    sys.exit(0)
+
 # --- BOOTSTRAP ---
 rotacionar_logs()
 print(f"JARVIS V{VERSION} ONLINE. Logs em: {LOG_DIR.resolve()}")
 ensure_skills_dir()
+_marcar_fase("logs")
+
+ROTEADOR_LOCAL = RoteadorLocal.carregar() if ROUTER_LOCAL else None
+if ROTEADOR_LOCAL is not None:
+    print(f"Roteador local carregado ({ROTEADOR_LOCAL.meta.get('amostras', '?')} amostras, limiar {LIMIAR_PADRAO}).")
+_marcar_fase("roteador_local")
+
+CONTEXTO = MotorContexto(
+    max_turnos=HISTORY_TURNS,
+    resumidor=_resumir_contexto if CONTEXT_SUMMARIZE else None,
+)
 
 TODAS_FERRAMENTAS = carregar_ferramentas_dinamicas()
 TOOL_MAP = {func.__name__: func for func in TODAS_FERRAMENTAS}
+_marcar_fase("manifesto_skills")
+
+# Hot-reload: so os modulos alterados sao reimportados e trocados no TOOL_MAP.
+RECARREGADOR = RecarregadorSkills(TOOL_MAP, listar_arquivos_skills, skill_permitida)
+RECARREGADOR.ao_recarregar(_invalidar_resumo_brain)
+if HOT_RELOAD and not PROFILE_STARTUP:
+    RECARREGADOR.iniciar()
+_marcar_fase("recarregador")
+
+if POOL_GEMINI.ativo():
+    POOL_GEMINI.aquecer()
+    print(POOL_GEMINI.resumo())
+_marcar_fase("pool_gemini")
 
 if "verificar_codex_cli" in TOOL_MAP:
     try:
         print(TOOL_MAP["verificar_codex_cli"]())
     except Exception as e:
         print(f"Codex CLI check failed: {e}")
+_marcar_fase("verificar_codex")
 
 
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
-    history: List[Dict[str, str]] = []
-    summary_text = ""
+    if PROFILE_STARTUP:
+        print(relatorio_startup())
+        sys.exit(0)
+
+    # Turnos iniciados com "&" rodam em background no motor async.
+    pendentes: Dict[int, Tuple[str, concurrent.futures.Future]] = {}
+    concluidos: "queue.Queue[Tuple[str, str, str]]" = queue.Queue()
 
     while True:
         try:
@@ -335,6 +670,59 @@ if __name__ == "__main__":
             if msg.strip().lower() in ["exit", "sair", "quit"]:
                 break
 
+            while not concluidos.empty():
+                bg_msg, bg_route, bg_result = concluidos.get()
+                _registrar_turno(bg_msg, bg_route, bg_result)
+
+            if msg.strip().lower() == "especulacao":
+                print(resumo_especulacao())
+                continue
+
+            if msg.strip().lower() in ["cache", "cache limpar"]:
+                if msg.strip().lower() == "cache limpar":
+                    print(f"{CACHE_GEMINI.limpar()} entradas removidas.")
+                print(CACHE_GEMINI.resumo())
+                print(resumo_artefatos())
+                continue
+
+            if msg.strip().lower() == "stats":
+                print(traces.resumo_traces())
+                print(POLITICA.resumo())
+                print(ARQUIVO.resumo())
+                print(ESCRITOR.resumo())
+                continue
+
+            if msg.strip().lower() == "contexto":
+                print(CONTEXTO.resumo())
+                print(_memoria_skill().RECALL_MEMORIA.resumo())
+                continue
+
+            if msg.strip().lower() == "skills":
+                RECARREGADOR.verificar()
+                print(RECARREGADOR.resumo())
+                continue
+
+            if msg.strip().lower() == "turnos":
+                ativos = {n: m for n, (m, f) in pendentes.items() if not f.done()}
+                if not ativos:
+                    print("Nenhum turno em background.")
+                for numero, texto in ativos.items():
+                    print(f"[#{numero}] em execucao: {_trim_text(texto, 80)}")
+                continue
+
+            if msg.lstrip().startswith("&"):
+                tarefa = msg.lstrip()[1:].strip()
+                if not tarefa:
+                    continue
+                numero = len(pendentes) + 1
+                futuro = MOTOR.agendar(executar_turno_async(tarefa, CONTEXTO.renderizar()))
+                pendentes[numero] = (tarefa, futuro)
+                futuro.add_done_callback(
+                    lambda f, n=numero, t=tarefa: _concluir_background(n, t, concluidos, f)
+                )
+                print(f"[#{numero}] Turno iniciado em background.")
+                continue
+
             direto = _parse_direct_tool_call(msg)
             if direto:
                 tool_name, tool_args = direto
@@ -342,49 +730,30 @@ if __name__ == "__main__":
                     try:
                         result = TOOL_MAP[tool_name](**tool_args)
                         print(f"[BOT] {result}")
+                        if MARCADOR_RELOAD in str(result):
+                            RECARREGADOR.verificar()
                     except Exception as e:
                         print(f"[ERROR] Erro ao executar {tool_name}: {e}")
                 else:
                     print(f"[WARN] Skill {tool_name} nao encontrada.")
                 continue
 
-            route = escolher_rota(msg)
-
-            if msg.lstrip().startswith("/"):
-                if SLASH_ROUTE in {"gemini", "codex"}:
-                    route = SLASH_ROUTE
-                if route == "codex":
-                    result = executar_codex_cli_raw(
-                        prompt=msg,
-                        sandbox=CODEX_SANDBOX,
-                        timeout_segundos=CODEX_TIMEOUT,
-                        modelo=CODEX_MODEL
-                    )
-                else:
-                    result = gemini_cli_raw(msg)
-            else:
-                if route == "codex":
-                    context = _build_context(history, summary_text)
-                    result = executar_codex_cli(
-                        tarefa=msg,
-                        contexto=context,
-                        sandbox=CODEX_SANDBOX,
-                        timeout_segundos=CODEX_TIMEOUT,
-                        modelo=CODEX_MODEL
-                    )
-                else:
-                    prompt = _build_gemini_prompt(msg, history, summary_text)
-                    result = gemini_cli_raw(prompt)
-
-            print(f"BOT ({route}): {result}")
-
-            history.append({"role": "user", "content": _trim_text(msg, HISTORY_MAX_CHARS)})
-            if route == "codex":
-                assistant_text = _extract_codex_final(result)
-            else:
-                assistant_text = result
-            history.append({"role": "assistant", "content": _trim_text(assistant_text, HISTORY_MAX_CHARS)})
-            history, summary_text = _rollup_history(history, summary_text)
+            ao_receber = _imprimir_stream if STREAM_OUTPUT else None
+            ao_rotear = (lambda r: print(f"BOT ({r}):")) if STREAM_OUTPUT else None
+            route, result = MOTOR.executar(
+                executar_turno_async(msg, CONTEXTO.renderizar(), ao_receber, ao_rotear)
+            )
+
+            if not STREAM_OUTPUT:
+                print(f"BOT ({route}): {result}")
+            elif route == "codex":
+                print(f"BOT (codex) final:\n{_extract_codex_final(result)}")
+            elif result.startswith(("Erro", "Falha")):
+                print(result)
+
+            _registrar_turno(msg, route, result)
+            if MARCADOR_RELOAD in result:
+                RECARREGADOR.verificar()
 
         except KeyboardInterrupt:
             break
@@ -0,0 +1,117 @@
+"""
+Benchmark de latencia por turno: logs sincronos vs escritor em background.
+
+Cada turno chama o Gemini (stub scripts/fake_gemini.py, pool persistente para
+tirar o spawn da medida) com um prompt de `--kb` KB e grava uma memoria; os
+logs (arquivo de execucoes, metricas, trace) e a visao Markdown da memoria vao
+para um diretorio temporario.
+
+Um diretorio lento e simulado atrasando cada `open` para escrita e cada fsync
+sob o diretorio do benchmark em `--atraso-ms` (round-trip de um volume de rede /
+bind mount do docker). Com `--atraso-ms 0` a medida usa o disco real.
+
+Uso:
+    python scripts/bench_escritor_logs.py --turnos 10 --atraso-ms 30
+    python scripts/bench_escritor_logs.py --fsync lote
+"""
+import argparse
+import builtins
+import os
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault(
+    "GEMINI_CMD",
+    " ".join(shlex.quote(p) for p in [sys.executable, str(ROOT / "scripts" / "fake_gemini.py")]),
+)
+os.environ.setdefault("GEMINI_POOL_ARGS", "--persistent")
+os.environ.setdefault("GEMINI_CACHE", "0")
+os.environ.setdefault("FAKE_GEMINI_LATENCY", "0.01")
+# jarvis_logs e memoria isolados do projeto
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="jarvis_bench_logs_"))
+os.chdir(BENCH_DIR)
+
+from skills import cerebro  # noqa: E402
+from skills import _traces as traces  # noqa: E402
+from skills._escritor_logs import ESCRITOR  # noqa: E402
+from skills._pool_gemini import PoolGemini  # noqa: E402
+from skills.memoria import memorizar  # noqa: E402
+
+
+def _limitar_diretorio(atraso: float) -> None:
+    """Atrasa aberturas para escrita e fsyncs dentro de BENCH_DIR."""
+    if atraso <= 0:
+        return
+    abrir, fsync = builtins.open, os.fsync
+    raiz = str(BENCH_DIR)
+
+    def _open(arquivo, modo="r", *args, **kwargs):
+        if any(c in modo for c in "wax+") and os.path.abspath(str(arquivo)).startswith(raiz):
+            time.sleep(atraso)
+        return abrir(arquivo, modo, *args, **kwargs)
+
+    def _fsync(fd):
+        time.sleep(atraso)
+        return fsync(fd)
+
+    builtins.open = _open
+    os.fsync = _fsync
+
+
+def _medir(nome: str, assincrono: bool, turnos: int, kb: int, pausa: float) -> None:
+    ESCRITOR.assincrono = assincrono
+    prompt = ("contexto do projeto " * (kb * 1024 // 20))[: kb * 1024]
+    latencias = []
+    for i in range(turnos):
+        inicio = time.perf_counter()
+        with traces.turno(f"turno {i}"):
+            saida = cerebro._executar_gemini_cli(f"{prompt}\n{nome} {i}", rid=f"bench-{nome}-{i}", proc_type="bench")
+            memorizar(f"{nome}: fato do turno {i}", topico="bench")
+        latencias.append(time.perf_counter() - inicio)
+        if saida.startswith("Erro"):
+            print(f"  {nome}: {saida}")
+        time.sleep(pausa)
+    inicio = time.perf_counter()
+    ESCRITOR.esperar()
+    dreno = time.perf_counter() - inicio
+    print(
+        f"{nome:<8} n={turnos:<3} "
+        f"p50={statistics.median(latencias) * 1000:8.1f}ms "
+        f"media={statistics.mean(latencias) * 1000:8.1f}ms "
+        f"max={max(latencias) * 1000:8.1f}ms "
+        f"(dreno final {dreno * 1000:.0f}ms)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, default=10)
+    parser.add_argument("--kb", type=int, default=64, help="tamanho do prompt logado por turno")
+    parser.add_argument("--atraso-ms", type=float, default=30.0, help="atraso por open/fsync no diretorio lento")
+    parser.add_argument("--pausa", type=float, default=0.2, help="intervalo entre turnos (tempo do usuario)")
+    parser.add_argument("--fsync", choices=["nunca", "lote", "sempre"], default=ESCRITOR.fsync)
+    args = parser.parse_args()
+
+    ESCRITOR.fsync = args.fsync
+    cerebro.POOL_GEMINI = PoolGemini(tamanho=1, modo="persistent")
+    cerebro.POOL_GEMINI.aquecer()
+    time.sleep(1.0)
+    cerebro._executar_gemini_cli("aquecimento", rid="bench-aquecimento", proc_type="bench")
+    _limitar_diretorio(args.atraso_ms / 1000)
+
+    print(f"diretorio={BENCH_DIR} atraso={args.atraso_ms:.0f}ms fsync={args.fsync} prompt={args.kb}KB")
+    _medir("sincrono", False, args.turnos, args.kb, args.pausa)
+    _medir("async", True, args.turnos, args.kb, args.pausa)
+    print(f"  {ESCRITOR.resumo()}")
+    cerebro.POOL_GEMINI.encerrar_todos()
+
+
+if __name__ == "__main__":
+    main()
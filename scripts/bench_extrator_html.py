@@ -0,0 +1,178 @@
+"""
+Benchmark da extracao HTML -> texto: BeautifulSoup vs parse incremental.
+
+Para cada pagina do corpus mede o caminho antigo do fallback HTTP
+(`BeautifulSoup(html, "html.parser")` + `get_text` + truncar em `--limite`)
+contra `skills/_extrator_html.extrair_markdown` com cada analisador
+disponivel (lxml, html.parser), com o limite (para cedo) e sem limite
+(documento inteiro, para comparar o custo de parse em si). Reporta:
+- throughput (MB de HTML por segundo, melhor de `--repeticoes`);
+- pico de memoria Python por pagina (tracemalloc; alocacoes internas do
+  libxml2 nao entram na conta), maximo e mediana do corpus;
+- fracao do HTML efetivamente lida e tamanho medio do texto extraido.
+
+Sem `--corpus`, gera um corpus sintetico (paginas de 50 KB a 5 MB com
+scripts, estilos, menus, `<main>` ou so `<div>`) num diretorio temporario.
+Com `--corpus DIR`, usa os `.html`/`.htm` salvos em DIR (recursivo).
+
+Uso:
+    python scripts/bench_extrator_html.py --paginas 12 --repeticoes 3
+    python scripts/bench_extrator_html.py --corpus ~/paginas_salvas --limite 40000
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills._extrator_html import analisadores_disponiveis, extrair_markdown  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # sem bs4 so o extrator novo e medido
+    BeautifulSoup = None
+
+_PALAVRAS = (
+    "dados sistema pagina conteudo rede busca modelo texto processo memoria tempo resultado "
+    "servidor cliente arquivo analise projeto codigo teste usuario pesquisa valor campo"
+).split()
+
+
+def _frase(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(_PALAVRAS) for _ in range(n)).capitalize() + "."
+
+
+def _pagina(rnd: random.Random, i: int, alvo_bytes: int) -> str:
+    """HTML sintetico com boilerplate realista em volta do conteudo; ~alvo_bytes de tamanho."""
+    menu = "".join(f'<li><a href="/secao/{j}">Secao {j}</a></li>' for j in range(150))
+    cabeca = (
+        f"<!DOCTYPE html><html lang=pt><head><meta charset=utf-8><title>Pagina {i} do corpus</title>"
+        f"<style>{'.c{color:#333;margin:0 auto;padding:4px} ' * 400}</style>"
+        f"<script>window.__ESTADO__ = {{{', '.join(f'k{j}: [{j}, {j + 1}]' for j in range(2000))}}};</script>"
+        f"</head><body><header><nav><ul>{menu}</ul></nav><h1>Site de teste</h1></header>"
+        f"<aside role=complementary>{_frase(rnd, 40)}</aside>"
+    )
+    tag = "main" if i % 3 else "div"
+    blocos: List[str] = [f"<{tag} id=conteudo><article><h1>Artigo {i}</h1>"]
+    tamanho = len(cabeca)
+    secao = 0
+    while tamanho < alvo_bytes:
+        secao += 1
+        partes = [f"<h2>Secao {secao}</h2>"]
+        partes += [f"<p>{_frase(rnd, rnd.randint(20, 80))} <a href='/x'>{_frase(rnd, 3)}</a></p>" for _ in range(6)]
+        partes.append("<ul>" + "".join(f"<li>{_frase(rnd, 8)}</li>" for _ in range(5)) + "</ul>")
+        partes.append(f"<script>track({secao}, '{'x' * 500}');</script>")
+        if secao % 4 == 0:
+            partes.append(f"<pre>def f{secao}(x):\n    return x * {secao}\n</pre>")
+            partes.append("<table>" + "".join(f"<tr><td>{j}</td><td>{_frase(rnd, 4)}</td></tr>" for j in range(8))
+                          + "</table>")
+        bloco = "".join(partes)
+        blocos.append(bloco)
+        tamanho += len(bloco)
+    blocos.append(f"</article></{tag}><footer>{_frase(rnd, 30)} {menu}</footer></body></html>")
+    return cabeca + "".join(blocos)
+
+
+def gerar_corpus(paginas: int, minimo_kb: int, maximo_kb: int) -> Path:
+    pasta = Path(tempfile.mkdtemp(prefix="jarvis_bench_html_"))
+    rnd = random.Random(42)
+    for i in range(paginas):
+        fracao = i / max(1, paginas - 1)
+        alvo = int(minimo_kb * 1024 * (maximo_kb / minimo_kb) ** fracao)
+        (pasta / f"pagina{i:02d}.html").write_text(_pagina(rnd, i, alvo), encoding="utf-8")
+    return pasta
+
+
+Extracao = Callable[[str], Tuple[str, int]]
+
+
+def _bs4(limite: int) -> Extracao:
+    # Caminho antigo de skills/navegacao._fallback_request (documento inteiro).
+    def extrair(html: str) -> Tuple[str, int]:
+        soup = BeautifulSoup(html, "html.parser")
+        title = soup.title.get_text(strip=True) if soup.title else ""
+        text = " ".join(soup.get_text(" ", strip=True).split())[:limite]
+        return f"# {title}\n\n{text}", len(html)
+    return extrair
+
+
+def _extrator(analisador: str, limite: int) -> Extracao:
+    def extrair(html: str) -> Tuple[str, int]:
+        extracao = extrair_markdown(html, limite, analisador)
+        return f"# {extracao.titulo}\n\n{extracao.texto}", extracao.lidos
+    return extrair
+
+
+def _medir(nome: str, funcao: Extracao, paginas: List[str], repeticoes: int) -> Dict[str, object]:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for html in paginas:
+            funcao(html)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    picos, lidos, saidas = [], 0, 0
+    for html in paginas:
+        tracemalloc.start()
+        texto, lido = funcao(html)
+        picos.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        lidos += lido
+        saidas += len(texto)
+    total = sum(len(h) for h in paginas)
+    return {
+        "nome": nome,
+        "segundos": melhor,
+        "mb_s": total / 1024 / 1024 / melhor,
+        "pico_max": max(picos),
+        "pico_mediana": statistics.median(picos),
+        "lido": lidos / total,
+        "saida_media": saidas / len(paginas),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="diretorio com paginas .html salvas (padrao: corpus sintetico)")
+    parser.add_argument("--paginas", type=int, default=12, help="paginas do corpus sintetico")
+    parser.add_argument("--min-kb", type=int, default=50)
+    parser.add_argument("--max-kb", type=int, default=5 * 1024)
+    parser.add_argument("--limite", type=int, default=40000, help="orcamento de caracteres (como o fallback)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    pasta = args.corpus or gerar_corpus(args.paginas, args.min_kb, args.max_kb)
+    arquivos = sorted(p for p in pasta.rglob("*") if p.suffix.lower() in {".html", ".htm"})
+    if not arquivos:
+        sys.exit(f"Nenhum .html em {pasta}")
+    paginas = [p.read_text(encoding="utf-8", errors="replace") for p in arquivos]
+    total_mb = sum(len(h) for h in paginas) / 1024 / 1024
+    print(f"corpus: {len(paginas)} paginas, {total_mb:.1f} MB de HTML em {pasta} | limite {args.limite} chars")
+
+    casos: List[Tuple[str, Extracao]] = []
+    if BeautifulSoup is not None:
+        casos.append(("bs4 html.parser (antigo)", _bs4(args.limite)))
+    else:
+        print("(bs4 nao instalado: caminho antigo fora da comparacao)")
+    for analisador in analisadores_disponiveis():
+        casos.append((f"extrator {analisador}", _extrator(analisador, args.limite)))
+        casos.append((f"extrator {analisador} sem limite", _extrator(analisador, 1 << 62)))
+
+    print(f"{'caminho':<34} {'tempo':>8} {'MB/s':>8} {'pico max':>10} {'pico med':>10} {'HTML lido':>10} {'saida':>8}")
+    for nome, funcao in casos:
+        r = _medir(nome, funcao, paginas, args.repeticoes)
+        print(
+            f"{r['nome']:<34} {r['segundos']:7.2f}s {r['mb_s']:8.1f} {r['pico_max'] / 1024 / 1024:8.1f}MB "
+            f"{r['pico_mediana'] / 1024 / 1024:8.1f}MB {r['lido']:9.0%} {r['saida_media']:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
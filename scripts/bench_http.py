@@ -0,0 +1,149 @@
+"""
+Validacao offline da camada HTTP das skills web (skills/_http.py).
+
+Sobe um `http.server` local (HTTP/1.1, keep-alive) que conta requests e
+conexoes TCP por rota e confere:
+- /fresco    (Cache-Control: max-age=60): a segunda leitura nao chega ao servidor;
+- /etag      (ETag + no-cache): a segunda leitura e um GET condicional -> 304;
+- /lastmod   (Last-Modified): idem, via If-Modified-Since;
+- /no-store  : nunca cacheado, toda leitura chega ao servidor;
+- conexoes   : N requests pela sessao compartilhada vs `requests.get` avulso;
+- limite     : N requests com intervalo minimo por host.
+
+Uso:
+    python scripts/bench_http.py --requests 10 --intervalo 0.2
+"""
+import argparse
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# jarvis_logs (cache_http) isolado do projeto
+os.chdir(tempfile.mkdtemp(prefix="jarvis_bench_http_"))
+
+import requests  # noqa: E402
+
+from skills._http import CACHE_HTTP, ClienteHTTP, LimitadorHosts  # noqa: E402
+
+HITS: Counter = Counter()
+CONEXOES: Counter = Counter()
+_ULTIMA_MODIFICACAO = formatdate(time.time() - 3600, usegmt=True)
+
+
+class _Contador(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        CONEXOES["total"] += 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        rota = self.path.split("?", 1)[0]
+        HITS[rota] += 1
+        headers = {}
+        if rota == "/fresco":
+            headers["Cache-Control"] = "max-age=60"
+        elif rota == "/etag":
+            headers.update({"ETag": '"v1"', "Cache-Control": "no-cache"})
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._responder(304, headers, b"")
+        elif rota == "/lastmod":
+            headers["Last-Modified"] = _ULTIMA_MODIFICACAO
+            if self.headers.get("If-Modified-Since") == _ULTIMA_MODIFICACAO:
+                return self._responder(304, headers, b"")
+        elif rota == "/no-store":
+            headers["Cache-Control"] = "no-store"
+        corpo = f"<html><body>{rota} #{HITS[rota]}</body></html>".encode("utf-8")
+        self._responder(200, headers, corpo)
+
+    def _responder(self, status: int, headers: dict, corpo: bytes) -> None:
+        self.send_response(status)
+        for nome, valor in headers.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def _servir() -> str:
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Contador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def _conferir(descricao: str, obtido: object, esperado: object) -> bool:
+    ok = obtido == esperado
+    print(f"  [{'ok' if ok else 'FALHOU'}] {descricao}: {obtido} (esperado {esperado})")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--intervalo", type=float, default=0.2, help="intervalo minimo por host no teste de limite")
+    args = parser.parse_args()
+    base = _servir()
+    cliente = ClienteHTTP(limitador=LimitadorHosts(padrao=0.0, excecoes={}))
+    resultados = []
+
+    print(f"servidor de fixture em {base}")
+    print("cache condicional:")
+    estados = [cliente.get(f"{base}/fresco").headers["X-Jarvis-Cache"] for _ in range(3)]
+    resultados.append(_conferir("/fresco hits no servidor", HITS["/fresco"], 1))
+    resultados.append(_conferir("/fresco estados", estados, ["MISS", "HIT", "HIT"]))
+    for rota in ("/etag", "/lastmod"):
+        respostas = [cliente.get(f"{base}{rota}") for _ in range(3)]
+        resultados.append(_conferir(f"{rota} hits no servidor (304 incluidos)", HITS[rota], 3))
+        resultados.append(_conferir(
+            f"{rota} estados", [r.headers["X-Jarvis-Cache"] for r in respostas], ["MISS", "REVALIDADO", "REVALIDADO"]
+        ))
+        resultados.append(_conferir(f"{rota} corpo reaproveitado", respostas[2].text, respostas[0].text))
+    for _ in range(3):
+        cliente.get(f"{base}/no-store")
+    resultados.append(_conferir("/no-store hits no servidor", HITS["/no-store"], 3))
+
+    print("conexoes TCP:")
+    CONEXOES.clear()
+    inicio = time.perf_counter()
+    for i in range(args.requests):
+        requests.get(f"{base}/avulso?i={i}", timeout=5)
+    avulso = time.perf_counter() - inicio
+    conexoes_avulso = CONEXOES["total"]
+    CONEXOES.clear()
+    inicio = time.perf_counter()
+    for i in range(args.requests):
+        cliente.get(f"{base}/sessao?i={i}", usar_cache=False)
+    sessao = time.perf_counter() - inicio
+    print(f"  requests.get avulso: {conexoes_avulso} conexoes, {avulso * 1000:.0f}ms")
+    print(f"  sessao compartilhada: {CONEXOES['total']} conexoes, {sessao * 1000:.0f}ms")
+    resultados.append(_conferir("sessao reutiliza a conexao (no maximo 1 nova)", CONEXOES["total"] <= 1, True))
+
+    print("limite por host:")
+    limitado = ClienteHTTP(limitador=LimitadorHosts(padrao=args.intervalo, excecoes={}))
+    inicio = time.perf_counter()
+    for i in range(args.requests):
+        limitado.get(f"{base}/limite?i={i}", usar_cache=False)
+    duracao = time.perf_counter() - inicio
+    minimo = args.intervalo * (args.requests - 1)
+    resultados.append(_conferir(f"{args.requests} requests levam >= {minimo:.1f}s", duracao >= minimo, True))
+
+    print(cliente.resumo())
+    print(f"cache em {CACHE_HTTP.diretorio.resolve()}")
+    sys.exit(0 if all(resultados) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark/teste offline da navegacao: browser por chamada vs pool de abas.
+
+Sobe um `http.server` local com paginas de fixture (sem rede) e mede:
+- `navegar_web` em sequencia com NAVEGADOR_POOL desligado (Chromium novo por URL);
+- `navegar_web` em sequencia com o pool (browser e abas reutilizados);
+- `navegar_varias` com todas as URLs de uma vez (abas em paralelo).
+Cada resposta e conferida contra o marcador da pagina.
+
+Requer crawl4ai + `playwright install chromium`.
+
+Uso:
+    python scripts/bench_navegacao.py --paginas 6 --abas 3
+"""
+import argparse
+import functools
+import http.server
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills import navegacao  # noqa: E402
+from skills._pool_navegador import POOL_NAVEGADOR  # noqa: E402
+
+
+class _Silencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def servir_fixture(paginas: int) -> str:
+    """Gera `paginas` HTMLs num diretorio temporario e os serve em 127.0.0.1 (porta livre)."""
+    pasta = Path(tempfile.mkdtemp(prefix="jarvis_bench_nav_"))
+    for i in range(paginas):
+        paragrafos = "\n".join(f"<p>Paragrafo {j} da pagina {i}.</p>" for j in range(50))
+        (pasta / f"pagina{i}.html").write_text(
+            f"<html><head><title>Pagina {i}</title></head><body>"
+            f"<h1>MARCADOR-{i}</h1>{paragrafos}"
+            f"<script>document.body.insertAdjacentHTML('beforeend', '<p>JS-{i}</p>')</script>"
+            f"</body></html>",
+            encoding="utf-8",
+        )
+    handler = functools.partial(_Silencioso, directory=str(pasta))
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def _conferir(nome: str, conteudo: str, i: int) -> None:
+    if f"MARCADOR-{i}" not in conteudo:
+        print(f"  {nome}: pagina {i} sem o marcador esperado: {conteudo[:200]!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, default=6)
+    parser.add_argument("--abas", type=int, default=3)
+    args = parser.parse_args()
+
+    base = servir_fixture(args.paginas)
+    urls = [f"{base}/pagina{i}.html" for i in range(args.paginas)]
+    POOL_NAVEGADOR.max_abas = args.abas
+    print(f"fixture em {base} ({args.paginas} paginas)")
+
+    for nome, ativo in (("sem pool", False), ("pool", True)):
+        POOL_NAVEGADOR.ativo = ativo
+        inicio = time.perf_counter()
+        for i, url in enumerate(urls):
+            _conferir(nome, navegacao.navegar_web(url), i)
+        duracao = time.perf_counter() - inicio
+        print(f"{nome:<10} sequencial: {duracao:6.2f}s ({duracao / len(urls) * 1000:.0f}ms/pagina)")
+
+    inicio = time.perf_counter()
+    relatorio = navegacao.navegar_varias(urls)
+    duracao = time.perf_counter() - inicio
+    for i in range(len(urls)):
+        _conferir("navegar_varias", relatorio, i)
+    print(f"{'pool':<10} navegar_varias: {duracao:6.2f}s")
+    print(f"  {POOL_NAVEGADOR.resumo()}")
+
+
+if __name__ == "__main__":
+    main()
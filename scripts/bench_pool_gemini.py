@@ -0,0 +1,78 @@
+"""
+Benchmark de latencia do Gemini CLI: spawn por chamada vs pool quente.
+
+Roda offline contra o stub scripts/fake_gemini.py (GEMINI_CMD pode ser
+sobrescrito para medir o CLI real).
+
+Uso:
+    python scripts/bench_pool_gemini.py --chamadas 10 --pausa 1.0
+"""
+import argparse
+import os
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault(
+    "GEMINI_CMD",
+    " ".join(shlex.quote(p) for p in [sys.executable, str(ROOT / "scripts" / "fake_gemini.py")]),
+)
+os.environ.setdefault("GEMINI_POOL_ARGS", "--persistent")
+# mede o CLI/pool, nao o cache de respostas
+os.environ["GEMINI_CACHE"] = "0"
+# jarvis_logs isolado do projeto
+os.chdir(tempfile.mkdtemp(prefix="jarvis_bench_"))
+
+from skills import cerebro  # noqa: E402
+from skills._pool_gemini import PoolGemini  # noqa: E402
+
+
+def _medir(nome: str, pool: PoolGemini, chamadas: int, pausa: float) -> None:
+    cerebro.POOL_GEMINI = pool
+    if pool.ativo():
+        pool.aquecer()
+        time.sleep(pausa)
+
+    latencias = []
+    for i in range(chamadas):
+        inicio = time.perf_counter()
+        saida = cerebro._executar_gemini_cli(
+            f"prompt de teste {i}", rid=f"bench-{nome}-{i}", proc_type="bench", usar_cache=False
+        )
+        latencias.append(time.perf_counter() - inicio)
+        if saida.startswith("Erro"):
+            print(f"  {nome}: {saida}")
+        time.sleep(pausa)
+
+    print(
+        f"{nome:<12} n={chamadas:<3} "
+        f"p50={statistics.median(latencias) * 1000:8.1f}ms "
+        f"media={statistics.mean(latencias) * 1000:8.1f}ms "
+        f"max={max(latencias) * 1000:8.1f}ms"
+    )
+    if pool.tamanho:
+        print(f"  {pool.resumo()}")
+    pool.encerrar_todos()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=8)
+    parser.add_argument("--pausa", type=float, default=1.0, help="intervalo entre turnos (tempo do usuario)")
+    parser.add_argument("--tamanho", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"GEMINI_CMD={os.environ['GEMINI_CMD']}")
+    _medir("spawn", PoolGemini(tamanho=0), args.chamadas, args.pausa)
+    _medir("prespawn", PoolGemini(tamanho=args.tamanho, modo="prespawn"), args.chamadas, args.pausa)
+    _medir("persistent", PoolGemini(tamanho=args.tamanho, modo="persistent"), args.chamadas, args.pausa)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Stub local do Gemini CLI para benchmarks e testes offline (sem rede).
+
+Uso:
+    GEMINI_CMD="python scripts/fake_gemini.py" python jarvis.py
+
+    # pool persistente (protocolo com marcador de fim)
+    GEMINI_POOL_SIZE=2 GEMINI_POOL_MODE=persistent GEMINI_POOL_ARGS=--persistent ...
+
+Variaveis:
+    FAKE_GEMINI_STARTUP: segundos simulando o bootstrap do Node/auth (padrao 0.8).
+    FAKE_GEMINI_LATENCY: segundos entre linhas da resposta (padrao 0.05).
+    FAKE_GEMINI_LINES: linhas emitidas por resposta (padrao 3).
+    FAKE_GEMINI_FAIL: se "1", responde com erro (exit 1).
+"""
+import os
+import sys
+import time
+
+# Mesmo marcador de skills/_pool_gemini.py (o stub nao importa o pacote).
+MARCADOR_FIM = "<<<JARVIS_EOR>>>"
+
+STARTUP = float(os.getenv("FAKE_GEMINI_STARTUP", "0.8"))
+LATENCIA = float(os.getenv("FAKE_GEMINI_LATENCY", "0.05"))
+LINHAS = int(os.getenv("FAKE_GEMINI_LINES", "3"))
+FALHAR = os.getenv("FAKE_GEMINI_FAIL", "") == "1"
+
+_PALAVRAS_CODEX = ("codar", "corrigir", "rodar", "teste", "arquivo", "bug", "implementar", "pytest")
+
+
+def responder(prompt: str) -> list:
+    if "Responda APENAS com GEMINI ou CODEX" in prompt:
+        mensagem = prompt.split("MENSAGEM:", 1)[-1].lower()
+        return ["CODEX" if any(p in mensagem for p in _PALAVRAS_CODEX) else "GEMINI"]
+    resumo = " ".join(prompt.split())[:80]
+    return [f"[fake-gemini] linha {i + 1}/{LINHAS}: {resumo}" for i in range(LINHAS)]
+
+
+def emitir(prompt: str) -> int:
+    if FALHAR:
+        print("fake-gemini: erro simulado", file=sys.stderr, flush=True)
+        return 1
+    for linha in responder(prompt):
+        time.sleep(LATENCIA)
+        print(linha, flush=True)
+    return 0
+
+
+def main() -> int:
+    if "--version" in sys.argv:
+        print("fake-gemini 0.0.0")
+        return 0
+
+    time.sleep(STARTUP)
+
+    if "--persistent" in sys.argv:
+        buffer = []
+        for linha in sys.stdin:
+            linha = linha.rstrip("\n")
+            if linha != MARCADOR_FIM:
+                buffer.append(linha)
+                continue
+            codigo = emitir("\n".join(buffer))
+            print(f"{MARCADOR_FIM} {codigo}", flush=True)
+            buffer = []
+        return 0
+
+    return emitir(sys.stdin.read())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
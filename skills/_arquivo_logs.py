@@ -0,0 +1,347 @@
+"""
+Arquivo de execucoes: segmentos comprimidos append-only com indice por rid.
+
+Substitui os arquivos soltos `{rid}_input.txt`, `{rid}_output.txt`,
+`{rid}_codex_*.txt` em `jarvis_logs/`. Cada parte de uma execucao (input,
+output, stream, last_message, relatorio) vira um registro:
+- o texto e comprimido como um frame/membro independente (zstd se o pacote
+  `zstandard` estiver instalado, senao gzip) e anexado ao segmento atual
+  `jarvis_logs/arquivo/seg-NNNNNN.<gz|zst>`;
+- uma linha JSON `{rid, ts, rota, parte, off, len, bytes}` vai para o indice do
+  segmento (`seg-NNNNNN.idx`), permitindo ler um registro sem descomprimir o
+  resto do segmento.
+Um segmento fecha ao passar de ARQUIVO_SEGMENTO_MB. A retencao
+(ARQUIVO_MAX_MB) apaga os segmentos mais antigos inteiros e so olha os metadados
+(stat) dos segmentos, nao os registros.
+
+Arquivos que precisam existir durante a execucao (log incremental de stream,
+`--output-last-message` do Codex) sao escritos em `jarvis_logs/em_andamento/`
+e arquivados ao final (`arquivar_arquivo`); sobras de uma sessao interrompida
+sao arquivadas no startup.
+
+Consulta: `python -m skills._arquivo_logs listar|mostrar|importar|resumo`.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+from skills._escritor_logs import ESCRITOR
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARQUIVO_DIR = LOG_DIR / "arquivo"
+EM_ANDAMENTO_DIR = LOG_DIR / "em_andamento"
+SEGMENTO_MAX_BYTES = int(float(os.getenv("ARQUIVO_SEGMENTO_MB", "16")) * 1024 * 1024)
+RETENCAO_MAX_BYTES = int(float(os.getenv("ARQUIVO_MAX_MB", "512")) * 1024 * 1024)
+CODEC = os.getenv("ARQUIVO_CODEC", "zstd" if zstandard is not None else "gzip").lower()
+CODEC = "zstd" if CODEC == "zstd" and zstandard is not None else "gzip"
+_EXTENSOES = {"gzip": ".gz", "zstd": ".zst"}
+_SEGMENTO_RE = re.compile(r"^seg-(\d{6})\.(gz|zst)$")
+# Arquivos soltos do formato antigo: <rid>_<parte>.txt
+_LEGADO_RE = re.compile(r"^(?P<rid>.+?)_(?P<parte>codex_input|codex_output|codex_stream|codex_last_message|input|output|patch)\.txt$")
+
+
+def _comprimir(dados: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(dados)
+    return gzip.compress(dados, compresslevel=6, mtime=0)
+
+
+def _descomprimir(dados: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("segmento zstd, mas o pacote zstandard nao esta instalado")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(dados)
+    return gzip.decompress(dados)
+
+
+class ArquivoExecucoes:
+    """Segmentos comprimidos + indice por segmento (ver docstring do modulo)."""
+
+    def __init__(
+        self,
+        pasta: Path = ARQUIVO_DIR,
+        segmento_max_bytes: int = SEGMENTO_MAX_BYTES,
+        retencao_max_bytes: int = RETENCAO_MAX_BYTES,
+        codec: str = CODEC,
+    ):
+        self.pasta = pasta
+        self.segmento_max_bytes = max(64 * 1024, segmento_max_bytes)
+        self.retencao_max_bytes = retencao_max_bytes
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._atual: Optional[Tuple[int, Path]] = None
+        self.stats: Dict[str, int] = {"registros": 0, "bytes": 0, "comprimidos": 0, "segmentos_removidos": 0}
+
+    # --- SEGMENTOS ---
+    def segmentos(self) -> List[Tuple[int, Path]]:
+        """(numero, caminho) dos segmentos existentes, do mais antigo ao mais novo."""
+        if not self.pasta.is_dir():
+            return []
+        encontrados = []
+        with os.scandir(self.pasta) as it:
+            for e in it:
+                m = _SEGMENTO_RE.match(e.name)
+                if m:
+                    encontrados.append((int(m.group(1)), Path(e.path)))
+        return sorted(encontrados)
+
+    @staticmethod
+    def _indice_de(segmento: Path) -> Path:
+        return segmento.with_suffix(".idx")
+
+    def _segmento_para_escrita(self) -> Path:
+        if self._atual is None:
+            existentes = self.segmentos()
+            if existentes and existentes[-1][1].suffix == _EXTENSOES[self.codec]:
+                self._atual = existentes[-1]
+            else:
+                numero = existentes[-1][0] + 1 if existentes else 1
+                self._atual = (numero, self.pasta / f"seg-{numero:06d}{_EXTENSOES[self.codec]}")
+        numero, caminho = self._atual
+        try:
+            cheio = caminho.stat().st_size >= self.segmento_max_bytes
+        except FileNotFoundError:
+            cheio = False
+        if cheio:
+            numero += 1
+            self._atual = (numero, self.pasta / f"seg-{numero:06d}{_EXTENSOES[self.codec]}")
+            self.aplicar_retencao()
+        return self._atual[1]
+
+    # --- ESCRITA ---
+    def gravar(self, rid: str, rota: str, parte: str, texto: str, ts: Optional[str] = None) -> List[Path]:
+        """Anexa `texto` como registro (rid, parte) do segmento atual. Devolve [segmento, indice]."""
+        dados = texto.encode("utf-8")
+        comprimido = _comprimir(dados, self.codec)
+        with self._lock:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            segmento = self._segmento_para_escrita()
+            with open(segmento, "ab") as f:
+                offset = f.tell()
+                f.write(comprimido)
+            entrada = {
+                "rid": rid,
+                "ts": ts or datetime.now().isoformat(timespec="seconds"),
+                "rota": rota,
+                "parte": parte,
+                "off": offset,
+                "len": len(comprimido),
+                "bytes": len(dados),
+            }
+            indice = self._indice_de(segmento)
+            with open(indice, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            self.stats["registros"] += 1
+            self.stats["bytes"] += len(dados)
+            self.stats["comprimidos"] += len(comprimido)
+        return [segmento, indice]
+
+    def arquivar_arquivo(self, rid: str, rota: str, parte: str, caminho: Path) -> List[Path]:
+        """Arquiva um arquivo temporario (log incremental, last message) e o remove."""
+        try:
+            texto = caminho.read_text(encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            return []
+        tocados = self.gravar(rid, rota, parte, texto)
+        try:
+            caminho.unlink()
+        except OSError:
+            pass
+        return tocados
+
+    # Variantes usadas pelos bridges: a escrita sai do caminho do turno (skills/_escritor_logs.py).
+    def enfileirar(self, rid: str, rota: str, parte: str, texto: str) -> None:
+        ts = datetime.now().isoformat(timespec="seconds")
+        ESCRITOR.executar(lambda: self.gravar(rid, rota, parte, texto, ts), len(texto))
+
+    def enfileirar_arquivo(self, rid: str, rota: str, parte: str, caminho: Path) -> None:
+        ESCRITOR.executar(lambda: self.arquivar_arquivo(rid, rota, parte, caminho))
+
+    def arquivar_pendentes(self) -> int:
+        """Arquiva sobras de `em_andamento/` (sessao interrompida no meio de uma chamada)."""
+        if not EM_ANDAMENTO_DIR.is_dir():
+            return 0
+        total = 0
+        with os.scandir(EM_ANDAMENTO_DIR) as it:
+            pendentes = [Path(e.path) for e in it if e.is_file()]
+        for caminho in pendentes:
+            m = _LEGADO_RE.match(caminho.name)
+            rid, parte = (m.group("rid"), m.group("parte")) if m else (caminho.stem, "arquivo")
+            self.arquivar_arquivo(rid, _rota_da_parte(parte), _parte_curta(parte), caminho)
+            total += 1
+        return total
+
+    # --- RETENCAO ---
+    def aplicar_retencao(self) -> int:
+        """Apaga os segmentos mais antigos (e seus indices) ate caber em ARQUIVO_MAX_MB."""
+        segmentos = self.segmentos()
+        tamanhos = []
+        for numero, caminho in segmentos:
+            try:
+                tamanhos.append((numero, caminho, caminho.stat().st_size))
+            except FileNotFoundError:
+                continue
+        total = sum(t for _, _, t in tamanhos)
+        atual = self._atual[0] if self._atual else None
+        removidos = 0
+        for numero, caminho, tamanho in tamanhos:
+            if total <= self.retencao_max_bytes or numero == atual or numero == tamanhos[-1][0]:
+                break
+            for alvo in (caminho, self._indice_de(caminho)):
+                try:
+                    alvo.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= tamanho
+            removidos += 1
+        self.stats["segmentos_removidos"] += removidos
+        return removidos
+
+    # --- LEITURA ---
+    def entradas(self, mais_novas_primeiro: bool = True) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """(segmento, entrada do indice) de todos os registros."""
+        segmentos = self.segmentos()
+        if mais_novas_primeiro:
+            segmentos = segmentos[::-1]
+        for _, segmento in segmentos:
+            try:
+                with open(self._indice_de(segmento), encoding="utf-8") as f:
+                    linhas = f.readlines()
+            except FileNotFoundError:
+                continue
+            if mais_novas_primeiro:
+                linhas = linhas[::-1]
+            for linha in linhas:
+                try:
+                    yield segmento, json.loads(linha)
+                except ValueError:
+                    continue
+
+    def ler(self, segmento: Path, entrada: Dict[str, Any]) -> str:
+        with open(segmento, "rb") as f:
+            f.seek(entrada["off"])
+            dados = f.read(entrada["len"])
+        codec = "zstd" if segmento.suffix == ".zst" else "gzip"
+        return _descomprimir(dados, codec).decode("utf-8", errors="replace")
+
+    def buscar(self, rid: str) -> List[Tuple[Dict[str, Any], str]]:
+        """Todas as partes arquivadas de um rid (prefixo aceito), na ordem de gravacao."""
+        achados = [(s, e) for s, e in self.entradas() if e.get("rid", "").startswith(rid)]
+        return [(e, self.ler(s, e)) for s, e in reversed(achados)]
+
+    def resumo(self) -> str:
+        segmentos = self.segmentos()
+        tamanho = sum(c.stat().st_size for _, c in segmentos if c.exists())
+        taxa = self.stats["comprimidos"] / self.stats["bytes"] if self.stats["bytes"] else 0.0
+        return (
+            f"Arquivo de execucoes ({self.pasta}, {self.codec}): {len(segmentos)} segmentos, "
+            f"{tamanho / 1e6:.1f}MB de {self.retencao_max_bytes / 1e6:.1f}MB. Nesta sessao: "
+            f"{self.stats['registros']} registros ({self.stats['bytes'] / 1e6:.2f}MB -> {taxa:.0%}), "
+            f"{self.stats['segmentos_removidos']} segmentos removidos pela retencao."
+        )
+
+
+def _rota_da_parte(parte: str) -> str:
+    return "codex" if parte.startswith("codex_") else "gemini"
+
+
+def _parte_curta(parte: str) -> str:
+    return parte[len("codex_"):] if parte.startswith("codex_") else parte
+
+
+def caminho_em_andamento(rid: str, parte: str) -> Path:
+    """Arquivo temporario de uma parte escrita durante a execucao (arquivado ao final)."""
+    EM_ANDAMENTO_DIR.mkdir(parents=True, exist_ok=True)
+    return EM_ANDAMENTO_DIR / f"{rid}_{parte}.txt"
+
+
+ARQUIVO = ArquivoExecucoes()
+
+
+# --- CLI ---
+def _cmd_listar(args: argparse.Namespace) -> int:
+    vistos: Dict[str, Dict[str, Any]] = {}
+    for _, e in ARQUIVO.entradas():
+        if args.rota and e.get("rota") != args.rota:
+            continue
+        if args.desde and e.get("ts", "") < args.desde:
+            continue
+        info = vistos.setdefault(e["rid"], {"ts": e["ts"], "rota": e["rota"], "partes": [], "bytes": 0})
+        info["partes"].append(e["parte"])
+        info["bytes"] += e.get("bytes", 0)
+        if len(vistos) > args.n:
+            vistos.pop(e["rid"])
+            break
+    for rid, info in vistos.items():
+        print(f"{info['ts']}  {info['rota']:<15} {rid}  {','.join(reversed(info['partes']))}  {info['bytes']}B")
+    return 0
+
+
+def _cmd_mostrar(args: argparse.Namespace) -> int:
+    achados = ARQUIVO.buscar(args.rid)
+    if args.parte:
+        achados = [(e, t) for e, t in achados if e["parte"] == args.parte]
+    if not achados:
+        print(f"Nenhum registro para '{args.rid}'.")
+        return 1
+    for entrada, texto in achados:
+        print(f"===== {entrada['rid']} | {entrada['rota']} | {entrada['parte']} | {entrada['ts']} =====")
+        print(texto)
+    return 0
+
+
+def _cmd_importar(args: argparse.Namespace) -> int:
+    """Move os arquivos soltos do formato antigo (`jarvis_logs/*.txt`) para o arquivo."""
+    pasta = Path(args.logs)
+    importados = 0
+    with os.scandir(pasta) as it:
+        candidatos = sorted((e.stat().st_mtime, e.path) for e in it if e.is_file() and _LEGADO_RE.match(e.name))
+    for mtime, caminho in candidatos:
+        m = _LEGADO_RE.match(os.path.basename(caminho))
+        texto = Path(caminho).read_text(encoding="utf-8", errors="replace")
+        ts = datetime.fromtimestamp(mtime).isoformat(timespec="seconds")
+        ARQUIVO.gravar(m.group("rid"), _rota_da_parte(m.group("parte")), _parte_curta(m.group("parte")), texto, ts)
+        os.unlink(caminho)
+        importados += 1
+    print(f"{importados} arquivos importados.")
+    print(ARQUIVO.resumo())
+    return 0
+
+
+def _cmd_resumo(args: argparse.Namespace) -> int:
+    print(ARQUIVO.resumo())
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m skills._arquivo_logs")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_listar = sub.add_parser("listar", help="execucoes mais recentes")
+    p_listar.add_argument("-n", type=int, default=20)
+    p_listar.add_argument("--rota", default="")
+    p_listar.add_argument("--desde", default="", help="timestamp ISO minimo (ex: 2026-02-07T10:00)")
+    p_mostrar = sub.add_parser("mostrar", help="conteudo arquivado de um rid (ou prefixo)")
+    p_mostrar.add_argument("rid")
+    p_mostrar.add_argument("--parte", default="", help="input, output, stream, last_message, relatorio...")
+    p_importar = sub.add_parser("importar", help="migra os .txt soltos do formato antigo")
+    p_importar.add_argument("--logs", default=str(LOG_DIR))
+    sub.add_parser("resumo", help="tamanho e segmentos do arquivo")
+    args = parser.parse_args(argv)
+    comandos = {"listar": _cmd_listar, "mostrar": _cmd_mostrar, "importar": _cmd_importar, "resumo": _cmd_resumo}
+    return comandos[args.comando](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
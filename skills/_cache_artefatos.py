@@ -0,0 +1,75 @@
+"""
+Memoizacao de artefatos de prompt derivados do sistema de arquivos.
+
+O resumo de skills do Brain e a arvore do projeto so mudam quando arquivos
+mudam. Cada `ArtefatoMemoizado` guarda o ultimo valor junto com uma
+impressao digital barata (stat de arquivos/diretorios, sem ler nem fazer
+parse de conteudo) e so reconstroi quando ela muda. Uma impressao `None`
+significa "ainda sem base" (ex.: depende do que a construcao visitou) e e
+recalculada logo apos construir.
+
+`stats` conta acertos, reconstrucoes e o tempo economizado (custo da ultima
+construcao menos o da validacao); `resumo_artefatos()` agrega todos os
+artefatos registrados.
+"""
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_REGISTRO: Dict[str, "ArtefatoMemoizado"] = {}
+
+
+class ArtefatoMemoizado(Generic[T]):
+    """Valor recalculado so quando `impressao()` muda (ou apos `invalidar()`)."""
+
+    def __init__(self, nome: str, impressao: Callable[[], Optional[Hashable]], construir: Callable[[], T]):
+        self.nome = nome
+        self.impressao = impressao
+        self.construir = construir
+        self._lock = threading.Lock()
+        self._valor: Optional[Tuple[Hashable, T]] = None
+        self._custo_ms = 0.0
+        self.stats: Dict[str, float] = {"acertos": 0, "reconstrucoes": 0, "ms_economizados": 0.0, "ms_construcao": 0.0}
+        _REGISTRO[nome] = self
+
+    def obter(self) -> T:
+        inicio = time.perf_counter()
+        digital = self.impressao()
+        with self._lock:
+            if self._valor is not None and digital is not None and self._valor[0] == digital:
+                self.stats["acertos"] += 1
+                validacao_ms = (time.perf_counter() - inicio) * 1000
+                self.stats["ms_economizados"] += max(0.0, self._custo_ms - validacao_ms)
+                return self._valor[1]
+        valor = self.construir()
+        if digital is None:
+            digital = self.impressao()
+        custo_ms = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self._valor = (digital, valor)
+            self._custo_ms = custo_ms
+            self.stats["reconstrucoes"] += 1
+            self.stats["ms_construcao"] += custo_ms
+        return valor
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._valor = None
+
+    def resumo(self) -> str:
+        s = self.stats
+        total = s["acertos"] + s["reconstrucoes"]
+        if not total:
+            return f"{self.nome}: nenhum uso ainda."
+        return (
+            f"{self.nome}: {int(s['acertos'])}/{int(total)} acertos, {int(s['reconstrucoes'])} reconstrucoes "
+            f"(ultima {self._custo_ms:.1f}ms), ~{s['ms_economizados']:.0f}ms economizados."
+        )
+
+
+def resumo_artefatos() -> str:
+    if not _REGISTRO:
+        return "Artefatos memoizados: nenhum registrado."
+    return "Artefatos memoizados:\n" + "\n".join(f"  {a.resumo()}" for a in _REGISTRO.values())
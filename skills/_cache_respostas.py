@@ -0,0 +1,203 @@
+"""
+Cache de respostas do Gemini CLI enderecado por conteudo.
+
+A chave e o SHA-256 do prompt final junto com o comando/configuracao do CLI
+(argumentos, variaveis de modelo/projeto em GEMINI_CACHE_ENV e os
+`.gemini/settings.json`), entao qualquer mudanca de modelo ou argumentos gera
+chaves novas. O uso e opt-in por chamada (`usar_cache=True`): so chamadas
+idempotentes (classificacao de rota, resumo de contexto, `iniciar_raciocinio`)
+consultam o cache; turnos de conversa e pass-through `/` sempre chamam o CLI. Cada entrada
+e um arquivo JSON em `jarvis_logs/cache_gemini/<2 hex>/<sha>.json`; o mtime do
+arquivo marca o ultimo acesso (LRU) e o campo `criado` controla o TTL.
+
+So respostas bem-sucedidas (exit 0, sem timeout) sao gravadas. Variaveis:
+    GEMINI_CACHE=0             desliga o cache
+    GEMINI_CACHE_TTL           segundos de validade (padrao 86400)
+    GEMINI_CACHE_MAX_MB        tamanho maximo em disco (padrao 64)
+    GEMINI_CACHE_MAX_ENTRIES   numero maximo de entradas (padrao 5000)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+
+CACHE_ATIVO = os.getenv("GEMINI_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", "86400"))
+CACHE_MAX_BYTES = int(float(os.getenv("GEMINI_CACHE_MAX_MB", "64")) * 1024 * 1024)
+CACHE_MAX_ENTRADAS = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "5000"))
+CACHE_DIR = LOG_DIR / "cache_gemini"
+
+_VERSAO_CHAVE = "v1"
+
+
+def chave_cache(prompt: str, config: Iterable[str]) -> str:
+    """SHA-256 do prompt final + configuracao (comando, argumentos, modelo)."""
+    h = hashlib.sha256(_VERSAO_CHAVE.encode())
+    for parte in config:
+        h.update(b"\0" + parte.encode("utf-8", "replace"))
+    h.update(b"\0\0" + prompt.encode("utf-8", "replace"))
+    return h.hexdigest()
+
+
+class CacheRespostas:
+    """Cache em disco com TTL, limite LRU (bytes/entradas) e contadores de hit/miss."""
+
+    def __init__(
+        self,
+        diretorio: Path = CACHE_DIR,
+        ttl: float = CACHE_TTL,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entradas: int = CACHE_MAX_ENTRADAS,
+        ativo: bool = CACHE_ATIVO,
+        nome: str = "Cache Gemini",
+        variavel: str = "GEMINI_CACHE",
+    ):
+        self.nome = nome
+        self.variavel = variavel
+        self.diretorio = Path(diretorio)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entradas = max(1, max_entradas)
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        # chave -> (ultimo acesso, tamanho em bytes); carregado sob demanda
+        self._indice: Optional[Dict[str, Tuple[float, int]]] = None
+        self._bytes = 0
+        self.stats: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "gravacoes": 0,
+            "expirados": 0,
+            "removidos_lru": 0,
+            "segundos_economizados": 0.0,
+        }
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / chave[:2] / f"{chave}.json"
+
+    def _carregar_indice(self) -> Dict[str, Tuple[float, int]]:
+        if self._indice is not None:
+            return self._indice
+        indice: Dict[str, Tuple[float, int]] = {}
+        total = 0
+        if self.diretorio.exists():
+            for sub in os.scandir(self.diretorio):
+                if not sub.is_dir():
+                    continue
+                for entrada in os.scandir(sub.path):
+                    if not entrada.name.endswith(".json"):
+                        continue
+                    st = entrada.stat()
+                    indice[entrada.name[:-5]] = (st.st_mtime, st.st_size)
+                    total += st.st_size
+        self._indice = indice
+        self._bytes = total
+        return indice
+
+    def _remover(self, chave: str) -> None:
+        _, tamanho = self._indice.pop(chave, (0.0, 0))
+        self._bytes -= tamanho
+        try:
+            self._caminho(chave).unlink()
+        except OSError:
+            pass
+
+    def obter(self, chave: str) -> Optional[str]:
+        """Devolve a resposta em cache ou None (miss/expirada). Atualiza o LRU no hit."""
+        if not self.ativo:
+            return None
+        with self._lock:
+            indice = self._carregar_indice()
+            if chave not in indice:
+                self.stats["misses"] += 1
+                return None
+            caminho = self._caminho(chave)
+            try:
+                dados = json.loads(caminho.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._remover(chave)
+                self.stats["misses"] += 1
+                return None
+            agora = time.time()
+            if self.ttl > 0 and agora - float(dados.get("criado", 0)) > self.ttl:
+                self._remover(chave)
+                self.stats["expirados"] += 1
+                self.stats["misses"] += 1
+                return None
+            try:
+                os.utime(caminho, (agora, agora))
+            except OSError:
+                pass
+            indice[chave] = (agora, indice[chave][1])
+            self.stats["hits"] += 1
+            self.stats["segundos_economizados"] += float(dados.get("duracao", 0.0))
+            return dados.get("resposta")
+
+    def gravar(self, chave: str, resposta: str, duracao: float = 0.0) -> None:
+        """Grava a resposta (escrita atomica) e aplica os limites de tamanho/entradas."""
+        if not self.ativo:
+            return
+        corpo = json.dumps(
+            {"criado": time.time(), "duracao": round(duracao, 4), "resposta": resposta},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        if len(corpo) > self.max_bytes:
+            return
+        with self._lock:
+            indice = self._carregar_indice()
+            caminho = self._caminho(chave)
+            try:
+                caminho.parent.mkdir(parents=True, exist_ok=True)
+                tmp = caminho.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(corpo)
+                os.replace(tmp, caminho)
+            except OSError:
+                return
+            _, anterior = indice.get(chave, (0.0, 0))
+            indice[chave] = (time.time(), len(corpo))
+            self._bytes += len(corpo) - anterior
+            self.stats["gravacoes"] += 1
+            self._aplicar_limites()
+
+    def _aplicar_limites(self) -> None:
+        indice = self._indice
+        if self._bytes <= self.max_bytes and len(indice) <= self.max_entradas:
+            return
+        for chave, _ in sorted(indice.items(), key=lambda item: item[1][0]):
+            if self._bytes <= self.max_bytes and len(indice) <= self.max_entradas:
+                break
+            self._remover(chave)
+            self.stats["removidos_lru"] += 1
+
+    def limpar(self) -> int:
+        """Remove todas as entradas. Devolve quantas foram apagadas."""
+        with self._lock:
+            indice = self._carregar_indice()
+            chaves = list(indice)
+            for chave in chaves:
+                self._remover(chave)
+            return len(chaves)
+
+    def resumo(self) -> str:
+        if not self.ativo:
+            return f"{self.nome}: desativado ({self.variavel}=0)."
+        with self._lock:
+            indice = self._carregar_indice()
+            entradas, tamanho = len(indice), self._bytes
+        s = self.stats
+        consultas = s["hits"] + s["misses"]
+        taxa = f"{100 * s['hits'] / consultas:.0f}%" if consultas else "n/a"
+        return (
+            f"{self.nome}: {int(s['hits'])} hits / {int(s['misses'])} misses ({taxa}), "
+            f"{entradas} entradas, {tamanho / 1024:.1f} KiB, "
+            f"{int(s['expirados'])} expirados, {int(s['removidos_lru'])} removidos (LRU), "
+            f"~{s['segundos_economizados']:.1f}s economizados."
+        )
+
+
+CACHE_GEMINI = CacheRespostas()
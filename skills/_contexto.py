@@ -0,0 +1,192 @@
+"""
+Motor de contexto incremental da sessao (historico + resumo) com orcamento em tokens.
+
+Cada mensagem vira um segmento pre-renderizado ("ROLE: conteudo") com sua
+estimativa de tokens calculada uma unica vez. Segmentos que excedem o limite de
+turnos ou de tokens saem pelo inicio da janela e sao compactados num resumo
+rolante: cada turno antigo vira uma linha condensada (cortada em fronteira de
+palavra). Se o resumo passar do orcamento, as linhas sao condensadas de novo;
+so quando ja estao no tamanho minimo as mais antigas sao descartadas.
+
+Opcionalmente um `resumidor` async (ex.: Gemini) reescreve o resumo em
+background, sem bloquear o proximo turno; enquanto ele roda, o contexto
+continua limitado pela compactacao local.
+
+Variaveis:
+    CONTEXT_MAX_TOKENS   orcamento dos ultimos turnos (padrao 2000)
+    SUMMARY_MAX_TOKENS   orcamento do resumo (padrao SUMMARY_MAX_CHARS / 4)
+    CONTEXT_DIGEST_TOKENS tamanho inicial de cada linha do resumo (padrao 60)
+"""
+import concurrent.futures
+import os
+import re
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from skills._motor_async import MOTOR
+
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "2000"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", str(int(os.getenv("SUMMARY_MAX_CHARS", "4000")) // 4)))
+DIGEST_TOKENS = int(os.getenv("CONTEXT_DIGEST_TOKENS", "60"))
+_DIGEST_MINIMO = 12
+_CHARS_POR_TOKEN = 4
+
+Resumidor = Callable[[str, int], Awaitable[str]]
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa barata (~4 caracteres por token), suficiente para orcamento."""
+    return (len(texto) + _CHARS_POR_TOKEN - 1) // _CHARS_POR_TOKEN
+
+
+def condensar(texto: str, max_tokens: int) -> str:
+    """Reduz o texto a ~max_tokens, numa unica linha, cortando em fronteira de palavra."""
+    texto = re.sub(r"\s+", " ", texto).strip()
+    limite = max_tokens * _CHARS_POR_TOKEN
+    if len(texto) <= limite:
+        return texto
+    corte = texto.rfind(" ", 0, limite)
+    if corte < limite // 2:
+        corte = limite
+    return texto[:corte].rstrip(" ,;:") + " [...]"
+
+
+class MotorContexto:
+    """Janela de turnos recentes + resumo rolante, renderizados incrementalmente."""
+
+    def __init__(
+        self,
+        max_turnos: int = 8,
+        max_tokens: int = CONTEXT_MAX_TOKENS,
+        max_tokens_resumo: int = SUMMARY_MAX_TOKENS,
+        resumidor: Optional[Resumidor] = None,
+    ):
+        self.max_itens = max(2, max_turnos * 2)
+        self.max_tokens = max(1, max_tokens)
+        self.max_tokens_resumo = max(_DIGEST_MINIMO, max_tokens_resumo)
+        self.resumidor = resumidor
+        self._lock = threading.Lock()
+        self._segmentos: Deque[Tuple[str, int]] = deque()
+        self._tokens_segmentos = 0
+        # Resumo = base (reescrita pelo resumidor) + linhas (seq, texto) condensadas localmente
+        self._base = ""
+        self._linhas: List[Tuple[int, str]] = []
+        self._seq = 0
+        self._digest = DIGEST_TOKENS
+        self._job: Optional[concurrent.futures.Future] = None
+        self._render: Optional[str] = None
+        self.stats: Dict[str, int] = {
+            "compactacoes": 0,
+            "descartes": 0,
+            "resumos_llm": 0,
+            "prompts": 0,
+            "prompt_ultimo": 0,
+            "prompt_max": 0,
+            "prompt_total": 0,
+        }
+
+    # --- ESCRITA ---
+    def adicionar(self, role: str, conteudo: str) -> None:
+        texto = f"{role.upper()}: {conteudo}"
+        with self._lock:
+            self._segmentos.append((texto, estimar_tokens(texto)))
+            self._tokens_segmentos += self._segmentos[-1][1]
+            while len(self._segmentos) > self.max_itens or (
+                self._tokens_segmentos > self.max_tokens and len(self._segmentos) > 1
+            ):
+                antigo, tokens = self._segmentos.popleft()
+                self._tokens_segmentos -= tokens
+                self._seq += 1
+                self._linhas.append((self._seq, condensar(antigo, self._digest)))
+            registrar = self._compactar_resumo()
+            self._render = None
+        if registrar is not None:
+            # Fora do lock: se o resumo ja terminou, o callback roda nesta thread e precisa do lock.
+            registrar()
+
+    def _texto_resumo(self) -> str:
+        return "\n".join([self._base] * bool(self._base) + [t for _, t in self._linhas])
+
+    def _compactar_resumo(self) -> Optional[Callable[[], None]]:
+        """Condensa o resumo ate caber; se agendar um resumo via LLM, devolve o registro do callback."""
+        if estimar_tokens(self._texto_resumo()) <= self.max_tokens_resumo:
+            return None
+        registrar = None
+        if self.resumidor is not None and self._job is None:
+            registrar = self._agendar_resumo()
+
+        self.stats["compactacoes"] += 1
+        if estimar_tokens(self._base) > self.max_tokens_resumo // 2:
+            self._base = condensar(self._base, self.max_tokens_resumo // 2)
+        while estimar_tokens(self._texto_resumo()) > self.max_tokens_resumo:
+            if self._digest > _DIGEST_MINIMO:
+                self._digest = max(_DIGEST_MINIMO, self._digest // 2)
+                self._linhas = [(seq, condensar(t, self._digest)) for seq, t in self._linhas]
+            elif self._linhas:
+                self._linhas.pop(0)
+                self.stats["descartes"] += 1
+            else:
+                break
+        return registrar
+
+    def _agendar_resumo(self) -> Callable[[], None]:
+        ate_seq = self._linhas[-1][0] if self._linhas else self._seq
+        texto = self._texto_resumo()
+        alvo = self.max_tokens_resumo // 2
+        job = self._job = MOTOR.agendar(self.resumidor(texto, alvo))
+        return lambda: job.add_done_callback(lambda f: self._aplicar_resumo(f, ate_seq, alvo))
+
+    def _aplicar_resumo(self, futuro: concurrent.futures.Future, ate_seq: int, alvo: int) -> None:
+        with self._lock:
+            self._job = None
+            try:
+                novo = (futuro.result() or "").strip()
+            except Exception:
+                return
+            if not novo or novo.startswith(("Erro", "Falha")):
+                return
+            self._base = condensar(novo, alvo) if estimar_tokens(novo) > alvo else novo
+            self._linhas = [(seq, t) for seq, t in self._linhas if seq > ate_seq]
+            self._digest = DIGEST_TOKENS
+            self.stats["resumos_llm"] += 1
+            self._render = None
+
+    # --- LEITURA ---
+    def renderizar(self) -> str:
+        """Contexto pronto para o prompt (reutilizado enquanto nada mudar)."""
+        with self._lock:
+            if self._render is None:
+                partes = []
+                resumo = self._texto_resumo()
+                if resumo:
+                    partes.append(f"RESUMO:\n{resumo}")
+                if self._segmentos:
+                    partes.append("ULTIMOS TURNOS:\n" + "\n".join(t for t, _ in self._segmentos))
+                self._render = "\n\n".join(partes)
+            return self._render
+
+    def medir(self, prompt: str) -> int:
+        """Registra o tamanho (tokens estimados) do prompt final de um turno."""
+        tokens = estimar_tokens(prompt)
+        with self._lock:
+            self.stats["prompts"] += 1
+            self.stats["prompt_ultimo"] = tokens
+            self.stats["prompt_max"] = max(self.stats["prompt_max"], tokens)
+            self.stats["prompt_total"] += tokens
+        return tokens
+
+    def resumo(self) -> str:
+        contexto = estimar_tokens(self.renderizar())
+        with self._lock:
+            s = dict(self.stats)
+            linhas, segmentos, job = len(self._linhas), len(self._segmentos), self._job is not None
+            tokens_resumo = estimar_tokens(self._texto_resumo())
+        media = s["prompt_total"] // s["prompts"] if s["prompts"] else 0
+        return (
+            f"Contexto: ~{contexto} tokens ({segmentos} mensagens ~{self._tokens_segmentos}/{self.max_tokens}, "
+            f"resumo ~{tokens_resumo}/{self.max_tokens_resumo} em {linhas} linhas"
+            f"{', resumo LLM em andamento' if job else ''}). "
+            f"Prompts: ultimo ~{s['prompt_ultimo']}, media ~{media}, max ~{s['prompt_max']} tokens. "
+            f"{s['compactacoes']} compactacoes, {s['descartes']} linhas descartadas, {s['resumos_llm']} resumos LLM."
+        )
@@ -0,0 +1,201 @@
+"""
+Escritor de logs em background: tira as escritas de auditoria do caminho do turno.
+
+Os bridges (arquivo de execucoes, metricas de stream, traces) e a exportacao
+Markdown do `memorizar` enfileiram operacoes em vez de escrever na hora; uma
+thread dedicada as executa em ordem:
+- Lotes: a thread espera ate LOG_LOTE_MS pelo proximo item e processa ate
+  LOG_LOTE_MAX operacoes de uma vez; `anexar` consecutivos no mesmo arquivo
+  viram um unico open/write.
+- fsync (LOG_FSYNC): `nunca` (padrao, o SO decide), `lote` (um fsync por
+  arquivo tocado no fim de cada lote) ou `sempre` (fsync apos cada operacao).
+- Contrapressao: a fila e limitada em bytes (LOG_FILA_MAX_MB). Cheia, o produtor
+  espera a thread liberar espaco (`LOG_FILA_CHEIA=bloquear`, padrao) ou a
+  operacao e descartada e contada (`descartar`).
+`LOG_ASSINCRONO=0` executa tudo na thread do chamador (comportamento antigo).
+`esperar()` bloqueia ate a fila esvaziar (leituras que dependem do que foi
+enfileirado, encerramento do processo).
+
+Benchmark sync x async num diretorio lento: `python scripts/bench_escritor_logs.py`.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+ASSINCRONO = os.getenv("LOG_ASSINCRONO", "1").lower() not in {"0", "false", "no"}
+FSYNC = os.getenv("LOG_FSYNC", "nunca").lower()
+LOTE_MAX = max(1, int(os.getenv("LOG_LOTE_MAX", "256")))
+LOTE_SEGUNDOS = float(os.getenv("LOG_LOTE_MS", "20")) / 1000
+FILA_MAX_BYTES = int(float(os.getenv("LOG_FILA_MAX_MB", "16")) * 1024 * 1024)
+FILA_CHEIA = os.getenv("LOG_FILA_CHEIA", "bloquear").lower()
+_POLITICAS_FSYNC = {"nunca", "lote", "sempre"}
+
+# (tipo, alvo, texto, custo em bytes): tipo "anexar" -> alvo e o Path;
+# tipo "executar" -> alvo e a tarefa, que devolve os arquivos que tocou.
+Operacao = Tuple[str, object, str, int]
+Tarefa = Callable[[], Optional[Iterable[Path]]]
+
+
+def _fsync(caminho: Path) -> None:
+    with open(caminho, "ab") as f:
+        os.fsync(f.fileno())
+
+
+class EscritorLogs:
+    """Fila limitada + thread de escrita com lotes e politica de fsync (ver docstring do modulo)."""
+
+    def __init__(
+        self,
+        assincrono: bool = ASSINCRONO,
+        fsync: str = FSYNC,
+        lote_max: int = LOTE_MAX,
+        lote_segundos: float = LOTE_SEGUNDOS,
+        fila_max_bytes: int = FILA_MAX_BYTES,
+        fila_cheia: str = FILA_CHEIA,
+    ):
+        self.assincrono = assincrono
+        self.fsync = fsync if fsync in _POLITICAS_FSYNC else "nunca"
+        self.lote_max = max(1, lote_max)
+        self.lote_segundos = max(0.0, lote_segundos)
+        self.fila_max_bytes = max(1, fila_max_bytes)
+        self.descartar_quando_cheia = fila_cheia == "descartar"
+        self._fila: Deque[Operacao] = deque()
+        self._bytes_fila = 0
+        self._pendentes = 0
+        self._cond = threading.Condition()
+        self._lock_sincrono = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.ultimo_erro = ""
+        self.stats: Dict[str, float] = {
+            "operacoes": 0, "lotes": 0, "bytes": 0, "fsyncs": 0, "erros": 0,
+            "descartadas": 0, "esperas": 0, "espera_ms": 0.0, "pico_fila": 0,
+        }
+
+    # --- PRODUTOR ---
+    def anexar(self, caminho: Path, texto: str) -> None:
+        """Anexa `texto` ao arquivo (append em texto UTF-8)."""
+        self._enfileirar(("anexar", Path(caminho), texto, len(texto)))
+
+    def executar(self, tarefa: Tarefa, custo_bytes: int = 0) -> None:
+        """Roda `tarefa()` na thread de escrita; ela devolve os arquivos tocados (para o fsync)."""
+        self._enfileirar(("executar", tarefa, "", custo_bytes))
+
+    def _enfileirar(self, operacao: Operacao) -> None:
+        if not self.assincrono:
+            with self._lock_sincrono:
+                self._processar([operacao])
+            return
+        custo = operacao[3]
+        with self._cond:
+            self._garantir_thread()
+            if self._bytes_fila + custo > self.fila_max_bytes and self._fila:
+                if self.descartar_quando_cheia:
+                    self.stats["descartadas"] += 1
+                    return
+                inicio = time.perf_counter()
+                self.stats["esperas"] += 1
+                while self._bytes_fila + custo > self.fila_max_bytes and self._fila:
+                    self._cond.wait()
+                self.stats["espera_ms"] += (time.perf_counter() - inicio) * 1000
+            self._fila.append(operacao)
+            self._bytes_fila += custo
+            self._pendentes += 1
+            self.stats["pico_fila"] = max(self.stats["pico_fila"], len(self._fila))
+            self._cond.notify_all()
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia ate todas as operacoes enfileiradas terminarem. False se o timeout expirar."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pendentes == 0, timeout)
+
+    # --- THREAD DE ESCRITA ---
+    def _garantir_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._rodar, daemon=True, name="jarvis-escritor-logs")
+            self._thread.start()
+
+    def _rodar(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._fila))
+                if len(self._fila) < self.lote_max and self.lote_segundos:
+                    # Janela curta para juntar as escritas de um mesmo turno num lote.
+                    self._cond.wait_for(lambda: len(self._fila) >= self.lote_max, self.lote_segundos)
+                lote = [self._fila.popleft() for _ in range(min(self.lote_max, len(self._fila)))]
+            try:
+                self._processar(lote)
+            finally:
+                with self._cond:
+                    self._bytes_fila -= sum(op[3] for op in lote)
+                    self._pendentes -= len(lote)
+                    self._cond.notify_all()
+
+    def _processar(self, lote: List[Operacao]) -> None:
+        tocados: Dict[Path, None] = {}
+        anexos: Dict[Path, List[str]] = {}
+        for tipo, alvo, texto, custo in lote:
+            if tipo == "anexar":
+                anexos.setdefault(alvo, []).append(texto)
+                continue
+            self._descarregar(anexos, tocados)
+            try:
+                arquivos = alvo() or ()
+                if self.fsync == "sempre":
+                    self._sincronizar(arquivos)
+                tocados.update(dict.fromkeys(arquivos))
+            except Exception as e:
+                self._erro(e)
+            self.stats["bytes"] += custo
+        self._descarregar(anexos, tocados)
+        if self.fsync == "lote":
+            self._sincronizar(tocados)
+        self.stats["operacoes"] += len(lote)
+        self.stats["lotes"] += 1
+
+    def _descarregar(self, anexos: Dict[Path, List[str]], tocados: Dict[Path, None]) -> None:
+        for caminho, textos in anexos.items():
+            dados = "".join(textos)
+            try:
+                with open(caminho, "a", encoding="utf-8") as f:
+                    f.write(dados)
+                    if self.fsync == "sempre":
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self.stats["fsyncs"] += 1
+                tocados[caminho] = None
+            except Exception as e:
+                self._erro(e)
+            self.stats["bytes"] += len(dados)
+        anexos.clear()
+
+    def _sincronizar(self, arquivos: Iterable[Path]) -> None:
+        for caminho in arquivos:
+            try:
+                _fsync(caminho)
+                self.stats["fsyncs"] += 1
+            except OSError as e:
+                self._erro(e)
+
+    def _erro(self, erro: Exception) -> None:
+        self.stats["erros"] += 1
+        self.ultimo_erro = f"{type(erro).__name__}: {erro}"
+
+    def resumo(self) -> str:
+        s = self.stats
+        modo = "assincrono" if self.assincrono else "sincrono"
+        linha = (
+            f"Escritor de logs ({modo}, fsync={self.fsync}): {s['operacoes']:.0f} operacoes em "
+            f"{s['lotes']:.0f} lotes, {s['bytes'] / 1e6:.2f}MB, {s['fsyncs']:.0f} fsyncs | fila "
+            f"{len(self._fila)} itens/{self._bytes_fila / 1e6:.2f}MB (pico {s['pico_fila']:.0f}) | "
+            f"{s['esperas']:.0f} esperas por fila cheia ({s['espera_ms']:.0f}ms), "
+            f"{s['descartadas']:.0f} descartadas, {s['erros']:.0f} erros"
+        )
+        return linha + (f" (ultimo: {self.ultimo_erro})" if self.ultimo_erro else "")
+
+
+ESCRITOR = EscritorLogs()
+atexit.register(ESCRITOR.esperar, 10.0)
@@ -0,0 +1,327 @@
+"""
+Extracao incremental de HTML para texto/markdown (sem montar arvore DOM).
+
+Substitui `BeautifulSoup(html, "html.parser").get_text()` nas skills web: em
+vez de parsear o documento inteiro e so depois truncar, o HTML e alimentado
+em pedacos de 64 KB num parser de eventos (start/end/data) e o alvo para
+assim que tem o que precisa:
+- `extrair_markdown`: conteudo principal em markdown (titulos `#`, listas
+  `- `, paragrafos, `pre` cercado por ```), descartando script/style/svg/
+  nav/aside/iframe/elementos ocultos e header/footer fora de main/article.
+  Ao achar `<main>` (ou role="main") descarta o que veio antes e para no
+  fechamento dele; sem main, para quando atinge `limite` caracteres.
+- `coletar_elementos`: texto e atributos dos elementos escolhidos por um
+  seletor (ex.: links de resultado do DuckDuckGo), parando no limite por tipo.
+
+Analisador (EXTRATOR_HTML_ANALISADOR): `lxml` (HTMLParser do libxml2 com
+target, sem arvore) quando instalado, senao `html.parser` da stdlib; `auto`
+(padrao) escolhe o primeiro disponivel.
+Benchmark: `python scripts/bench_extrator_html.py [--corpus DIR]`.
+"""
+import os
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    from lxml import etree
+except ImportError:  # lxml e opcional: cai no html.parser da stdlib
+    etree = None
+
+ANALISADOR = os.getenv("EXTRATOR_HTML_ANALISADOR", "auto").strip().lower()
+LIMITE_PADRAO = 40000
+_PEDACO = 64 * 1024
+
+# Elementos sem tag de fechamento (o html.parser nao emite `end` para eles).
+_VAZIAS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+_IGNORADAS = {
+    "script", "style", "noscript", "template", "svg", "math", "canvas", "object", "iframe",
+    "nav", "aside", "dialog", "button", "select", "textarea",
+}
+_IGNORADAS_FORA_DO_CONTEUDO = {"header", "footer"}
+_PAPEIS_IGNORADOS = {"navigation", "banner", "contentinfo", "complementary", "search", "menu", "menubar", "dialog"}
+_TITULOS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_BLOCOS = {
+    "p", "div", "section", "article", "main", "blockquote", "table", "tr", "ul", "ol", "dl", "dt", "dd",
+    "figure", "figcaption", "address", "details", "summary", "body", "header", "footer",
+}
+_CELULAS = {"td", "th"}
+
+Html = Union[str, Iterable[str]]
+Seletor = Callable[[str, Dict[str, str]], Optional[str]]
+
+
+def analisadores_disponiveis() -> List[str]:
+    return (["lxml"] if etree is not None else []) + ["html.parser"]
+
+
+def _resolver(analisador: Optional[str]) -> str:
+    nome = (analisador or ANALISADOR).strip().lower()
+    if nome == "lxml" and etree is None:
+        raise ImportError("EXTRATOR_HTML_ANALISADOR=lxml, mas o lxml nao esta instalado")
+    if nome not in {"lxml", "html.parser"}:
+        return analisadores_disponiveis()[0]
+    return nome
+
+
+class _AdaptadorHTMLParser(HTMLParser):
+    """Repassa os eventos do html.parser para um alvo no formato de target do lxml."""
+
+    def __init__(self, alvo: Any):
+        super().__init__(convert_charrefs=True)
+        self.alvo = alvo
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.alvo.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in _VAZIAS:
+            self.alvo.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        self.alvo.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.alvo.data(data)
+
+
+def _pedacos(html: Html) -> Iterator[str]:
+    if isinstance(html, str):
+        for i in range(0, len(html), _PEDACO):
+            yield html[i:i + _PEDACO]
+    else:
+        yield from html
+
+
+def alimentar(alvo: Any, html: Html, analisador: Optional[str] = None) -> Any:
+    """Alimenta `html` (texto ou iteravel de pedacos) no alvo ate acabar ou `alvo.parado`. Devolve o alvo."""
+    if _resolver(analisador) == "lxml":
+        parser = etree.HTMLParser(target=alvo, no_network=True)
+    else:
+        parser = _AdaptadorHTMLParser(alvo)
+    for pedaco in _pedacos(html):
+        alvo.lidos += len(pedaco)
+        parser.feed(pedaco)
+        if alvo.parado:
+            return alvo
+    parser.close()
+    return alvo
+
+
+class ExtratorMarkdown:
+    """Alvo de parse que monta o markdown do conteudo principal ate `limite` caracteres (ver docstring do modulo)."""
+
+    def __init__(self, limite: int = LIMITE_PADRAO):
+        self.limite = limite
+        self.truncado = False
+        self.parado = False
+        self.lidos = 0
+        self._partes: List[str] = []
+        self._total = 0
+        self._quebras = 0
+        self._espaco = False
+        self._prefixo = ""
+        self._ignorando: Optional[str] = None
+        self._prof_ignorando = 0
+        self._titulo: Optional[List[str]] = None
+        self._no_titulo = False
+        self._principal: Optional[str] = None
+        self._prof_principal = 0
+        self._conteudo = 0
+        self._pre = 0
+
+    @property
+    def texto(self) -> str:
+        return "".join(self._partes)
+
+    @property
+    def titulo(self) -> str:
+        return " ".join("".join(self._titulo or []).split())
+
+    # --- EVENTOS (interface de target do lxml) ---
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        if self.parado:
+            return
+        if self._ignorando is not None:
+            if tag == self._ignorando:
+                self._prof_ignorando += 1
+            return
+        if tag in _VAZIAS:
+            if tag == "br" and self._pre:
+                self._emitir("\n", cru=True)
+            elif tag == "br":
+                self._quebrar(1)
+            elif tag == "hr":
+                self._quebrar(2)
+            return
+        if self._boilerplate(tag, attrs):
+            self._ignorando, self._prof_ignorando = tag, 1
+            return
+        if tag == "title":
+            self._no_titulo = self._titulo is None
+            if self._no_titulo:
+                self._titulo = []
+            return
+
+        if self._principal is None and (tag == "main" or attrs.get("role") == "main"):
+            # Conteudo principal marcado: o que veio antes (menus, banners) sai do resultado.
+            self._principal, self._prof_principal = tag, 1
+            self._partes.clear()
+            self._total, self._quebras, self._espaco, self._prefixo = 0, 0, False, ""
+        elif tag == self._principal:
+            self._prof_principal += 1
+        if tag in ("main", "article"):
+            self._conteudo += 1
+
+        if tag in _TITULOS:
+            self._quebrar(2)
+            self._prefixo = "#" * int(tag[1]) + " "
+        elif tag == "li":
+            self._quebrar(1)
+            self._prefixo = "- "
+        elif tag == "pre":
+            self._quebrar(2)
+            self._emitir("```\n", cru=True)
+            self._pre += 1
+        elif tag in _BLOCOS:
+            self._quebrar(2)
+        elif tag in _CELULAS:
+            self._espaco = True
+
+    def end(self, tag: str) -> None:
+        if self.parado or tag in _VAZIAS:
+            return
+        if self._ignorando is not None:
+            if tag == self._ignorando:
+                self._prof_ignorando -= 1
+                if self._prof_ignorando == 0:
+                    self._ignorando = None
+            return
+        if tag == "title":
+            self._no_titulo = False
+            return
+
+        if tag == "pre" and self._pre:
+            self._pre -= 1
+            self._emitir("\n```", cru=True)
+        if tag in _TITULOS or tag in _BLOCOS or tag == "pre":
+            self._prefixo = ""
+            self._quebrar(2)
+        elif tag == "li":
+            self._prefixo = ""
+            self._quebrar(1)
+        elif tag in _CELULAS:
+            self._espaco = True
+        if tag in ("main", "article") and self._conteudo:
+            self._conteudo -= 1
+        if tag == self._principal and self._prof_principal:
+            self._prof_principal -= 1
+            if self._prof_principal == 0:
+                self.parado = True
+
+    def data(self, texto: str) -> None:
+        if self.parado or self._ignorando is not None:
+            return
+        if self._no_titulo:
+            self._titulo.append(texto)
+            return
+        if self._pre:
+            self._emitir(texto, cru=True)
+            return
+        if texto[:1].isspace():
+            self._espaco = True
+        palavras = " ".join(texto.split())
+        if palavras:
+            self._emitir(palavras)
+            self._espaco = texto[-1].isspace()
+
+    def close(self) -> "ExtratorMarkdown":
+        return self
+
+    # --- MONTAGEM ---
+    def _boilerplate(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if tag in _IGNORADAS or "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if tag in _IGNORADAS_FORA_DO_CONTEUDO and not (self._conteudo or self._principal):
+            return True
+        return attrs.get("role", "") in _PAPEIS_IGNORADOS
+
+    def _quebrar(self, n: int) -> None:
+        self._quebras = max(self._quebras, n)
+
+    def _emitir(self, texto: str, cru: bool = False) -> None:
+        separador = ""
+        if self._total:
+            if self._quebras:
+                separador = "\n" * self._quebras
+            elif self._espaco and not cru:
+                separador = " "
+        pedaco = separador + self._prefixo + texto
+        self._quebras, self._espaco, self._prefixo = 0, False, ""
+        restante = self.limite - self._total
+        if len(pedaco) > restante:
+            pedaco = pedaco[:restante]
+            self.truncado = self.parado = True
+        self._partes.append(pedaco)
+        self._total += len(pedaco)
+
+
+class ColetorElementos:
+    """Alvo de parse que guarda (tipo, atributos, texto) dos elementos para os quais `seletor` devolve um tipo."""
+
+    def __init__(self, seletor: Seletor, limites: Optional[Dict[str, int]] = None):
+        self.seletor = seletor
+        self.limites = limites or {}
+        self.itens: List[Tuple[str, Dict[str, str], str]] = []
+        self.contagem: Counter = Counter()
+        self.parado = False
+        self.lidos = 0
+        self._abertos: List[List[Any]] = []  # [tipo, tag, atributos, profundidade, partes]
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        if self.parado or tag in _VAZIAS:
+            return
+        for aberto in self._abertos:
+            if aberto[1] == tag:
+                aberto[3] += 1
+        tipo = self.seletor(tag, attrs)
+        if tipo:
+            self._abertos.append([tipo, tag, attrs, 1, []])
+
+    def end(self, tag: str) -> None:
+        if self.parado:
+            return
+        for aberto in list(self._abertos):
+            if aberto[1] != tag:
+                continue
+            aberto[3] -= 1
+            if aberto[3] == 0:
+                self._abertos.remove(aberto)
+                tipo, _, attrs, _, partes = aberto
+                self.itens.append((tipo, attrs, " ".join("".join(partes).split())))
+                self.contagem[tipo] += 1
+                if self.contagem[tipo] >= self.limites.get(tipo, float("inf")):
+                    self.parado = True
+                    return
+
+    def data(self, texto: str) -> None:
+        if not self.parado:
+            for aberto in self._abertos:
+                aberto[4].append(texto)
+
+    def close(self) -> "ColetorElementos":
+        return self
+
+
+def extrair_markdown(html: Html, limite: int = LIMITE_PADRAO, analisador: Optional[str] = None) -> ExtratorMarkdown:
+    """Markdown do conteudo principal (`.texto`, `.titulo`, `.truncado`, `.lidos` = chars de HTML consumidos)."""
+    return alimentar(ExtratorMarkdown(limite), html, analisador)
+
+
+def coletar_elementos(html: Html, seletor: Seletor, limites: Optional[Dict[str, int]] = None,
+                      analisador: Optional[str] = None) -> List[Tuple[str, Dict[str, str], str]]:
+    """(tipo, atributos, texto) dos elementos escolhidos por `seletor`, na ordem do documento."""
+    return alimentar(ColetorElementos(seletor, limites), html, analisador).itens
@@ -0,0 +1,210 @@
+"""
+Camada HTTP compartilhada das skills web (`pesquisa`, `navegacao`).
+
+- Sessao: um unico `requests.Session` com pool de conexoes (HTTP_POOL_MAX por
+  host) reaproveita TCP+TLS entre chamadas em vez de um handshake por request.
+- Cache em disco (so GET 200): `jarvis_logs/cache_http/`, mesmo armazenamento
+  LRU do cache do Gemini (skills/_cache_respostas.py). Respostas frescas
+  (`Cache-Control: max-age` ou `Expires`) voltam sem rede; vencidas com ETag /
+  Last-Modified sao revalidadas com If-None-Match / If-Modified-Since e um 304
+  reaproveita o corpo guardado. `no-store` nunca e gravado e `no-cache` sempre
+  revalida. Header `X-Jarvis-Cache` na resposta: HIT, REVALIDADO ou MISS.
+- Limite por host: intervalo minimo entre requests ao mesmo host
+  (HTTP_INTERVALO_HOST, padrao 0; excecoes por dominio em HTTP_INTERVALO_HOSTS,
+  padrao `duckduckgo.com=1.5`), para nao disparar captcha no DuckDuckGo.
+
+Variaveis: HTTP_CACHE=0 desliga o cache; HTTP_CACHE_MAX_MB, HTTP_CACHE_TTL
+(retencao maxima de uma entrada, mesmo revalidavel).
+Validacao offline: `python scripts/bench_http.py`.
+"""
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from skills.util_comuns import LOG_DIR
+from skills._cache_respostas import CacheRespostas, chave_cache
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+POOL_MAX = int(os.getenv("HTTP_POOL_MAX", "10"))
+INTERVALO_HOST = float(os.getenv("HTTP_INTERVALO_HOST", "0"))
+INTERVALO_HOSTS = os.getenv("HTTP_INTERVALO_HOSTS", "duckduckgo.com=1.5")
+
+CACHE_HTTP = CacheRespostas(
+    diretorio=LOG_DIR / "cache_http",
+    ttl=float(os.getenv("HTTP_CACHE_TTL", str(7 * 86400))),
+    max_bytes=int(float(os.getenv("HTTP_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    ativo=os.getenv("HTTP_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"},
+    nome="Cache HTTP",
+    variavel="HTTP_CACHE",
+)
+_HEADERS_GUARDADOS = ("content-type", "etag", "last-modified", "cache-control", "expires", "date")
+
+
+def _excecoes_intervalo(texto: str) -> Dict[str, float]:
+    excecoes = {}
+    for item in texto.split(","):
+        dominio, _, segundos = item.strip().partition("=")
+        if dominio and segundos:
+            excecoes[dominio.strip().lower()] = float(segundos)
+    return excecoes
+
+
+def validade(headers: Any) -> Optional[float]:
+    """Segundos de frescor segundo Cache-Control/Expires (0 = revalidar sempre); None para no-store."""
+    diretivas = {}
+    for parte in headers.get("Cache-Control", "").lower().split(","):
+        nome, _, valor = parte.strip().partition("=")
+        if nome:
+            diretivas[nome] = valor.strip('"')
+    if "no-store" in diretivas:
+        return None
+    if "no-cache" in diretivas:
+        return 0.0
+    if diretivas.get("max-age", "").isdigit():
+        return float(diretivas["max-age"])
+    if headers.get("Expires"):
+        try:
+            expira = parsedate_to_datetime(headers["Expires"]).timestamp()
+            data = parsedate_to_datetime(headers["Date"]).timestamp() if headers.get("Date") else time.time()
+            return max(0.0, expira - data)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
+
+
+class LimitadorHosts:
+    """Intervalo minimo entre requests ao mesmo host; chamadas concorrentes reservam vagas em sequencia."""
+
+    def __init__(self, padrao: float = INTERVALO_HOST, excecoes: Optional[Dict[str, float]] = None):
+        self.padrao = padrao
+        self.excecoes = _excecoes_intervalo(INTERVALO_HOSTS) if excecoes is None else excecoes
+        self._proximo: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, float] = {"esperas": 0, "segundos_espera": 0.0}
+
+    def intervalo(self, host: str) -> float:
+        host = host.lower()
+        for dominio, segundos in self.excecoes.items():
+            if host == dominio or host.endswith("." + dominio):
+                return segundos
+        return self.padrao
+
+    def aguardar(self, host: str) -> float:
+        """Dorme o necessario para respeitar o intervalo do host. Devolve a espera em segundos."""
+        intervalo = self.intervalo(host)
+        if intervalo <= 0:
+            return 0.0
+        with self._lock:
+            agora = time.monotonic()
+            vez = max(agora, self._proximo.get(host, 0.0))
+            self._proximo[host] = vez + intervalo
+        espera = vez - agora
+        if espera > 0:
+            self.stats["esperas"] += 1
+            self.stats["segundos_espera"] += espera
+            time.sleep(espera)
+        return espera
+
+
+class ClienteHTTP:
+    """Sessao com pool de conexoes + cache condicional + limite por host (ver docstring do modulo)."""
+
+    def __init__(self, cache: CacheRespostas = CACHE_HTTP, limitador: Optional[LimitadorHosts] = None):
+        self.cache = cache
+        self.limitador = limitador or LimitadorHosts()
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=POOL_MAX, pool_maxsize=POOL_MAX)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.headers["User-Agent"] = USER_AGENT
+        self.stats: Dict[str, int] = {"requests": 0, "frescos": 0, "revalidados": 0, "baixados": 0}
+
+    def get(self, url: str, params: Any = None, headers: Optional[Dict[str, str]] = None,
+            timeout: float = 15, usar_cache: bool = True) -> requests.Response:
+        url = requests.Request("GET", url, params=params).prepare().url
+        chave = chave_cache(url, ["http-get"]) if usar_cache and self.cache.ativo else None
+        guardado = None
+        if chave:
+            bruto = self.cache.obter(chave)
+            guardado = json.loads(bruto) if bruto else None
+        if guardado and guardado["expira"] > time.time():
+            self.stats["frescos"] += 1
+            return _resposta_guardada(guardado, "HIT")
+
+        condicionais = dict(headers or {})
+        if guardado and guardado["headers"].get("etag"):
+            condicionais["If-None-Match"] = guardado["headers"]["etag"]
+        if guardado and guardado["headers"].get("last-modified"):
+            condicionais["If-Modified-Since"] = guardado["headers"]["last-modified"]
+        inicio = time.perf_counter()
+        resposta = self._enviar("GET", url, headers=condicionais, timeout=timeout)
+
+        if guardado and resposta.status_code == 304:
+            guardado["headers"].update(_guardaveis(resposta.headers))
+            guardado["expira"] = time.time() + (validade(CaseInsensitiveDict(guardado["headers"])) or 0.0)
+            self.cache.gravar(chave, json.dumps(guardado, ensure_ascii=False), time.perf_counter() - inicio)
+            self.stats["revalidados"] += 1
+            return _resposta_guardada(guardado, "REVALIDADO")
+
+        self.stats["baixados"] += 1
+        resposta.headers["X-Jarvis-Cache"] = "MISS"
+        frescor = validade(resposta.headers)
+        if chave and resposta.status_code == 200 and frescor is not None and (
+            frescor > 0 or "ETag" in resposta.headers or "Last-Modified" in resposta.headers
+        ):
+            entrada = {
+                "url": resposta.url,
+                "headers": _guardaveis(resposta.headers),
+                "texto": resposta.text,
+                "expira": time.time() + frescor,
+            }
+            self.cache.gravar(chave, json.dumps(entrada, ensure_ascii=False), time.perf_counter() - inicio)
+        return resposta
+
+    def post(self, url: str, data: Any = None, headers: Optional[Dict[str, str]] = None,
+             timeout: float = 15) -> requests.Response:
+        """POST pela sessao compartilhada (com limite por host, sem cache)."""
+        return self._enviar("POST", url, data=data, headers=headers, timeout=timeout)
+
+    def _enviar(self, metodo: str, url: str, **kwargs: Any) -> requests.Response:
+        self.limitador.aguardar(urlsplit(url).hostname or "")
+        self.stats["requests"] += 1
+        return self.sessao.request(metodo, url, **kwargs)
+
+    def resumo(self) -> str:
+        s, lim = self.stats, self.limitador.stats
+        return (
+            f"HTTP: {s['requests']} requests de rede, {s['frescos']} servidos do cache sem rede, "
+            f"{s['revalidados']} revalidados (304), {s['baixados']} baixados | limite por host: "
+            f"{lim['esperas']:.0f} esperas ({lim['segundos_espera']:.1f}s)\n{self.cache.resumo()}"
+        )
+
+
+def _guardaveis(headers: Any) -> Dict[str, str]:
+    return {k: headers[k] for k in _HEADERS_GUARDADOS if k in headers}
+
+
+def _resposta_guardada(guardado: Dict[str, Any], estado: str) -> requests.Response:
+    resposta = requests.Response()
+    resposta.status_code = 200
+    resposta.url = guardado["url"]
+    resposta.encoding = "utf-8"
+    resposta._content = guardado["texto"].encode("utf-8")
+    resposta.headers = CaseInsensitiveDict(guardado["headers"])
+    resposta.headers["X-Jarvis-Cache"] = estado
+    return resposta
+
+
+HTTP = ClienteHTTP()
@@ -0,0 +1,441 @@
+"""
+Indice persistente da arvore do projeto (caminho, tipo, tamanho, mtime).
+
+Substitui o `os.walk` completo de `get_project_structure`. O indice guarda,
+por diretorio, o mtime e as entradas (nome -> tipo, tamanho, mtime). A cada
+consulta, `atualizar()` so faz stat dos diretorios conhecidos: criar, remover
+ou renomear algo muda o mtime do diretorio pai, e so esses diretorios passam
+por um novo `os.scandir` (diff contra o que estava indexado; subarvores novas
+sao varridas, as removidas saem do indice). Edicoes de conteudo nao mudam o
+mtime do diretorio: tamanhos/mtimes de arquivos sao reconferidos pela visao
+por tamanho, no maximo a cada INDICE_RESTAT_SEGUNDOS.
+
+As exclusoes seguem o `.gitignore` (da raiz e de subdiretorios, com `!`,
+`/` ancorado, `dir/` e `**`), `.git/info/exclude` e ESTRUTURA_IGNORAR
+(padrao ".git"). Diretorios ignorados nem sao varridos.
+
+O estado e persistido em `jarvis_logs/indice_arquivos.json` (no maximo a cada
+30s e na saida). Sem dependencias externas (nao usa inotify).
+"""
+import atexit
+import fnmatch
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_VERSAO = 1
+_INTERVALO_SALVAR = 30.0
+RESTAT_SEGUNDOS = float(os.getenv("INDICE_RESTAT_SEGUNDOS", "10"))
+IGNORAR_EXTRA = [p.strip() for p in os.getenv("ESTRUTURA_IGNORAR", ".git").split(",") if p.strip()]
+
+# nome -> (tipo "d"/"f", tamanho, mtime_ns)
+Entrada = Tuple[str, int, int]
+
+
+# --- .gitignore ---
+class RegraIgnore:
+    """Uma linha de .gitignore, relativa ao diretorio `base` onde foi declarada."""
+
+    __slots__ = ("base", "negar", "so_diretorio", "regex")
+
+    def __init__(self, base: str, padrao: str):
+        self.base = base
+        self.negar = padrao.startswith("!")
+        if self.negar:
+            padrao = padrao[1:]
+        self.so_diretorio = padrao.endswith("/")
+        padrao = padrao.rstrip("/")
+        ancorado = "/" in padrao
+        padrao = padrao.lstrip("/")
+        corpo = _traduzir_glob(padrao)
+        self.regex = re.compile(corpo if ancorado else f"(?:.*/)?{corpo}")
+
+    def casa(self, relativo: str, e_diretorio: bool) -> bool:
+        if self.so_diretorio and not e_diretorio:
+            return False
+        if self.base:
+            if not relativo.startswith(self.base + "/"):
+                return False
+            relativo = relativo[len(self.base) + 1:]
+        return self.regex.fullmatch(relativo) is not None
+
+
+def _traduzir_glob(padrao: str) -> str:
+    """Glob do gitignore -> regex (`**` atravessa diretorios, `*`/`?` nao)."""
+    partes, i = [], 0
+    while i < len(padrao):
+        c = padrao[i]
+        if padrao.startswith("**/", i):
+            partes.append("(?:.*/)?")
+            i += 3
+            continue
+        if padrao.startswith("/**", i) and i + 3 == len(padrao):
+            partes.append("/.*")
+            i += 3
+            continue
+        if padrao.startswith("**", i):
+            partes.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            partes.append("[^/]*")
+        elif c == "?":
+            partes.append("[^/]")
+        elif c == "[":
+            fim = padrao.find("]", i + 1)
+            if fim == -1:
+                partes.append(re.escape(c))
+            else:
+                classe = padrao[i + 1:fim].replace("\\", "\\\\")
+                if classe.startswith("!"):
+                    classe = "^" + classe[1:]
+                partes.append(f"[{classe}]")
+                i = fim
+        elif c == "\\" and i + 1 < len(padrao):
+            i += 1
+            partes.append(re.escape(padrao[i]))
+        else:
+            partes.append(re.escape(c))
+        i += 1
+    return "".join(partes)
+
+
+def ler_regras(arquivo: Path, base: str) -> List[RegraIgnore]:
+    regras = []
+    try:
+        linhas = arquivo.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return regras
+    for linha in linhas:
+        linha = linha.rstrip()
+        if linha and not linha.startswith("#"):
+            regras.append(RegraIgnore(base, linha))
+    return regras
+
+
+def ignorado(relativo: str, e_diretorio: bool, regras: List[RegraIgnore]) -> bool:
+    """A ultima regra que casa decide (regras de subdiretorios vem depois das da raiz)."""
+    for regra in reversed(regras):
+        if regra.casa(relativo, e_diretorio):
+            return not regra.negar
+    return False
+
+
+def _juntar(base: str, nome: str) -> str:
+    return f"{base}/{nome}" if base else nome
+
+
+class IndiceArquivos:
+    """Arvore do projeto indexada por diretorio, atualizada por diff de `os.scandir`."""
+
+    def __init__(self, raiz: Path = Path("."), caminho_indice: Optional[Path] = None):
+        self.raiz = raiz
+        self.caminho_indice = caminho_indice
+        self._lock = threading.RLock()
+        # diretorio relativo ("" = raiz) -> (mtime_ns, {nome: Entrada})
+        self._dirs: Dict[str, Tuple[int, Dict[str, Entrada]]] = {}
+        # diretorio relativo -> mtime_ns do .gitignore dele (0 = sem .gitignore)
+        self._gitignores: Dict[str, int] = {}
+        self._regras: Dict[str, List[RegraIgnore]] = {}
+        self._regras_base: Optional[List[RegraIgnore]] = None
+        self._carregado = False
+        self._sujo = False
+        self._ultimo_salvamento = 0.0
+        self._ultimo_restat = 0.0
+        self.versao = 0  # incrementada a cada mudanca na arvore indexada
+        self.stats: Dict[str, float] = {"varreduras": 0, "diretorios_revarridos": 0, "ms_ultima_atualizacao": 0.0}
+        atexit.register(self.salvar)
+
+    # --- REGRAS ---
+    def _regras_raiz(self) -> List[RegraIgnore]:
+        regras = [RegraIgnore("", p) for p in IGNORAR_EXTRA]
+        return regras + ler_regras(self.raiz / ".git" / "info" / "exclude", "")
+
+    def _regras_de(self, diretorio: str) -> List[RegraIgnore]:
+        """Regras aplicaveis as entradas de `diretorio` (raiz + .gitignore dos ancestrais)."""
+        regras = list(self._regras_base or [])
+        partes = diretorio.split("/") if diretorio else []
+        for i in range(len(partes) + 1):
+            regras.extend(self._regras.get("/".join(partes[:i]), []))
+        return regras
+
+    def _mtime_gitignore(self, diretorio: str) -> int:
+        try:
+            return os.stat(self.raiz / diretorio / ".gitignore").st_mtime_ns
+        except OSError:
+            return 0
+
+    def _carregar_gitignore(self, diretorio: str) -> None:
+        mtime = self._mtime_gitignore(diretorio)
+        self._gitignores[diretorio] = mtime
+        if mtime:
+            self._regras[diretorio] = ler_regras(self.raiz / diretorio / ".gitignore", diretorio)
+        else:
+            self._regras.pop(diretorio, None)
+
+    # --- VARREDURA ---
+    def _varrer(self, diretorio: str) -> None:
+        """(Re)varre `diretorio` e, recursivamente, os subdiretorios novos."""
+        pendentes = [diretorio]
+        while pendentes:
+            atual = pendentes.pop()
+            self._carregar_gitignore(atual)
+            regras = self._regras_de(atual)
+            anteriores = self._dirs.get(atual, (0, {}))[1]
+            entradas: Dict[str, Entrada] = {}
+            try:
+                mtime_dir = os.stat(self.raiz / atual).st_mtime_ns
+                with os.scandir(self.raiz / atual) as it:
+                    for e in it:
+                        try:
+                            e_dir = e.is_dir(follow_symlinks=False)
+                            relativo = _juntar(atual, e.name)
+                            if ignorado(relativo, e_dir, regras):
+                                continue
+                            st = e.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        entradas[e.name] = ("d" if e_dir else "f", 0 if e_dir else st.st_size, st.st_mtime_ns)
+            except OSError:
+                self._remover_subarvore(atual)
+                continue
+            for nome, (tipo, _, _) in anteriores.items():
+                if tipo == "d" and entradas.get(nome, ("f",))[0] != "d":
+                    self._remover_subarvore(_juntar(atual, nome))
+            for nome, (tipo, _, _) in entradas.items():
+                sub = _juntar(atual, nome)
+                if tipo == "d" and sub not in self._dirs:
+                    pendentes.append(sub)
+            self._dirs[atual] = (mtime_dir, entradas)
+            self.stats["diretorios_revarridos"] += 1
+        self.versao += 1
+        self._sujo = True
+
+    def _remover_subarvore(self, diretorio: str) -> None:
+        prefixo = diretorio + "/"
+        for d in [d for d in self._dirs if not diretorio or d == diretorio or d.startswith(prefixo)]:
+            del self._dirs[d]
+            self._gitignores.pop(d, None)
+            self._regras.pop(d, None)
+        self.versao += 1
+        self._sujo = True
+
+    def atualizar(self) -> int:
+        """Sincroniza com o disco (stat por diretorio; scandir so nos alterados). Retorna `versao`."""
+        inicio = time.perf_counter()
+        with self._lock:
+            self._carregar()
+            if self._regras_base is None:
+                self._regras_base = self._regras_raiz()
+            if not self._dirs:
+                self._varrer("")
+                self.stats["varreduras"] += 1
+                self._ultimo_restat = time.monotonic()
+            else:
+                for diretorio in sorted(self._dirs, key=lambda d: d.count("/")):
+                    if diretorio not in self._dirs:
+                        continue  # removido junto com um ancestral nesta passada
+                    try:
+                        mtime = os.stat(self.raiz / diretorio).st_mtime_ns
+                    except OSError:
+                        self._remover_subarvore(diretorio)
+                        continue
+                    if self._gitignores.get(diretorio) != self._mtime_gitignore(diretorio):
+                        # Regras mudaram: a subarvore inteira precisa ser refeita.
+                        self._remover_subarvore(diretorio)
+                        self._varrer(diretorio)
+                    elif mtime != self._dirs[diretorio][0]:
+                        self._varrer(diretorio)
+            self._salvar()
+        self.stats["ms_ultima_atualizacao"] = (time.perf_counter() - inicio) * 1000
+        return self.versao
+
+    def _restat_arquivos(self) -> None:
+        """Reconfere tamanho/mtime de cada arquivo (edicoes nao mudam o mtime do diretorio)."""
+        for diretorio, (_, entradas) in list(self._dirs.items()):
+            try:
+                with os.scandir(self.raiz / diretorio) as it:
+                    for e in it:
+                        anterior = entradas.get(e.name)
+                        if anterior is None or anterior[0] != "f":
+                            continue
+                        st = e.stat(follow_symlinks=False)
+                        if (st.st_size, st.st_mtime_ns) != anterior[1:]:
+                            entradas[e.name] = ("f", st.st_size, st.st_mtime_ns)
+                            self.versao += 1
+                            self._sujo = True
+            except OSError:
+                continue
+        self._ultimo_restat = time.monotonic()
+
+    # --- PERSISTENCIA ---
+    def _carregar(self) -> None:
+        if self._carregado:
+            return
+        self._carregado = True
+        self._ultimo_salvamento = time.monotonic()
+        if not self.caminho_indice or not self.caminho_indice.exists():
+            return
+        try:
+            dados = json.loads(self.caminho_indice.read_text(encoding="utf-8"))
+            if dados.get("versao") != _VERSAO or dados.get("raiz") != str(self.raiz.resolve()):
+                return
+            for diretorio, (mtime, entradas) in dados["dirs"].items():
+                self._dirs[diretorio] = (mtime, {nome: tuple(e) for nome, e in entradas.items()})
+            for diretorio, mtime in dados["gitignores"].items():
+                self._gitignores[diretorio] = mtime
+                if mtime:
+                    self._regras[diretorio] = ler_regras(self.raiz / diretorio / ".gitignore", diretorio)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._dirs.clear()
+            self._gitignores.clear()
+            self._regras.clear()
+
+    def salvar(self) -> None:
+        """Grava o indice em disco se houver mudancas pendentes."""
+        with self._lock:
+            self._salvar(forcar=True)
+
+    def _salvar(self, forcar: bool = False) -> None:
+        if not self._sujo or not self.caminho_indice:
+            return
+        if not forcar and time.monotonic() - self._ultimo_salvamento < _INTERVALO_SALVAR:
+            return
+        dados = {
+            "versao": _VERSAO,
+            "raiz": str(self.raiz.resolve()),
+            "dirs": self._dirs,
+            "gitignores": self._gitignores,
+        }
+        try:
+            tmp = self.caminho_indice.with_suffix(".tmp")
+            tmp.write_text(json.dumps(dados, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.caminho_indice)
+            self._sujo = False
+            self._ultimo_salvamento = time.monotonic()
+        except OSError:
+            pass
+
+    # --- VISOES ---
+    def _arquivos(self, base: str) -> Iterator[Tuple[str, Entrada]]:
+        prefixo = base + "/" if base else ""
+        for diretorio, (_, entradas) in self._dirs.items():
+            if diretorio == base or diretorio.startswith(prefixo):
+                for nome, entrada in entradas.items():
+                    if entrada[0] == "f":
+                        yield _juntar(diretorio, nome), entrada
+
+    def arvore(
+        self,
+        base: str = "",
+        profundidade: Optional[int] = None,
+        padrao: Optional[str] = None,
+        max_linhas: int = 400,
+        sincronizar: bool = True,
+    ) -> str:
+        """
+        Arvore a partir de `base` (relativo a raiz). `profundidade` limita os niveis
+        expandidos (os demais viram um resumo com contagem); `padrao` e um glob
+        aplicado ao nome (ou ao caminho relativo, se tiver "/").
+        """
+        if sincronizar:
+            self.atualizar()
+        with self._lock:
+            if base not in self._dirs:
+                return f"❌ Diretorio '{base or '.'}' nao indexado (inexistente ou ignorado)."
+            filtro = _filtro_glob(padrao)
+            contagens = self._contagens(base, filtro) if (filtro or profundidade is not None) else {}
+            linhas: List[str] = []
+            exibidos = 0
+            truncado = False
+            pilha = [(base, 0)]
+            while pilha:
+                diretorio, nivel = pilha.pop()
+                if filtro is not None and not contagens.get(diretorio):
+                    continue  # nada nesta subarvore passa no filtro
+                indent = " " * 4 * nivel
+                nome_dir = os.path.basename(diretorio) if diretorio else self.raiz.resolve().name
+                expandir = profundidade is None or nivel < profundidade
+                sufixo = "" if expandir else f" ({contagens.get(diretorio, 0)} arquivos)"
+                novas = [f"{indent}📂 {nome_dir}/{sufixo}"]
+                entradas = self._dirs[diretorio][1]
+                subdirs = []
+                if expandir:
+                    for nome in sorted(entradas):
+                        tipo = entradas[nome][0]
+                        relativo = _juntar(diretorio, nome)
+                        if tipo == "d":
+                            if relativo in self._dirs:
+                                subdirs.append(relativo)
+                        elif filtro is None or filtro(nome, relativo):
+                            novas.append(f"{indent}    📄 {nome}")
+                if len(linhas) + len(novas) > max_linhas:
+                    truncado = True
+                    break
+                linhas.extend(novas)
+                exibidos += 1
+                pilha.extend((d, nivel + 1) for d in reversed(subdirs))
+            if filtro is not None and not linhas:
+                return f"ℹ️ Nenhum arquivo casa com '{padrao}' em '{base or '.'}'."
+            if truncado:
+                prefixo = base + "/" if base else ""
+                total = sum(1 for d in self._dirs if d == base or d.startswith(prefixo))
+                linhas.append(
+                    f"[... limite de {max_linhas} linhas: {total - exibidos} de {total} diretorios nao exibidos; "
+                    "use profundidade ou padrao para refinar ...]"
+                )
+            return "\n".join(linhas)
+
+    def _contagens(self, base: str, filtro) -> Dict[str, int]:
+        """Arquivos (que passam no filtro) por diretorio, incluindo subdiretorios."""
+        prefixo = base + "/" if base else ""
+        contagens: Dict[str, int] = {}
+        for diretorio, (_, entradas) in self._dirs.items():
+            if diretorio == base or diretorio.startswith(prefixo):
+                if filtro is None:
+                    contagens[diretorio] = sum(1 for e in entradas.values() if e[0] == "f")
+                else:
+                    contagens[diretorio] = sum(
+                        1 for nome, e in entradas.items()
+                        if e[0] == "f" and filtro(nome, _juntar(diretorio, nome))
+                    )
+        # Dos mais profundos para a raiz, cada diretorio soma no pai.
+        for diretorio in sorted(contagens, key=lambda d: d.count("/"), reverse=True):
+            if diretorio != base:
+                pai = diretorio.rpartition("/")[0]
+                if pai in contagens:
+                    contagens[pai] += contagens[diretorio]
+        return contagens
+
+    def maiores(self, base: str = "", n: int = 20, padrao: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Os `n` maiores arquivos sob `base` (caminho relativo, bytes)."""
+        self.atualizar()
+        with self._lock:
+            if time.monotonic() - self._ultimo_restat >= RESTAT_SEGUNDOS:
+                self._restat_arquivos()
+            filtro = _filtro_glob(padrao)
+            candidatos = (
+                (relativo, entrada[1]) for relativo, entrada in self._arquivos(base)
+                if filtro is None or filtro(relativo.rsplit("/", 1)[-1], relativo)
+            )
+            return heapq.nlargest(max(1, n), candidatos, key=lambda item: item[1])
+
+    def total(self) -> Tuple[int, int]:
+        """(diretorios, arquivos) indexados."""
+        with self._lock:
+            arquivos = sum(1 for _, entradas in self._dirs.values() for e in entradas.values() if e[0] == "f")
+            return len(self._dirs), arquivos
+
+
+def _filtro_glob(padrao: Optional[str]):
+    if not padrao:
+        return None
+    regex = re.compile(fnmatch.translate(padrao))
+    if "/" in padrao:
+        return lambda nome, relativo: regex.match(relativo) is not None
+    return lambda nome, relativo: regex.match(nome) is not None
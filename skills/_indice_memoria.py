@@ -0,0 +1,278 @@
+"""
+Indice invertido (BM25) sobre as entradas `### timestamp` do dossie em memoria/.
+
+Cada arquivo .md e dividido em entradas pelos cabecalhos `### `; o indice guarda
+apenas offsets (bytes) e frequencias de termos, e o texto e lido do arquivo so
+para os resultados. A manutencao e incremental:
+- `memorizar` chama `atualizar(path)` apos o append: so o trecho a partir do
+  ultimo offset indexado e lido e tokenizado;
+- em cada busca, arquivos com mtime/tamanho diferentes sao reindexados (ou so
+  o final, se o arquivo apenas cresceu com novas entradas).
+O estado e persistido em `jarvis_logs/indice_memoria.json` entre sessoes.
+"""
+import atexit
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+
+INDICE_PATH = LOG_DIR / "indice_memoria.json"
+_VERSAO = 1
+_K1 = 1.5
+_B = 0.75
+_INTERVALO_SALVAR = 30.0
+_CABECALHO = re.compile(rb"(?m)^### ")
+_TERMO = re.compile(r"\w+")
+
+# (inicio, fim, titulo, frequencias)
+Entrada = Tuple[int, int, str, Dict[str, int]]
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Minusculas, sem acentos, palavras com 2+ caracteres."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return [t for t in _TERMO.findall(texto) if len(t) > 1]
+
+
+def _dividir_entradas(dados: bytes, base: int) -> List[Entrada]:
+    """Divide `dados` (lidos a partir do offset `base`) em entradas por cabecalho `### `."""
+    inicios = [m.start() for m in _CABECALHO.finditer(dados)]
+    if not inicios or dados[: inicios[0]].strip():
+        inicios.insert(0, 0)
+    entradas: List[Entrada] = []
+    for i, ini in enumerate(inicios):
+        fim = inicios[i + 1] if i + 1 < len(inicios) else len(dados)
+        bloco = dados[ini:fim].decode("utf-8", "replace")
+        if not bloco.strip():
+            continue
+        primeira = bloco.strip().split("\n", 1)[0]
+        titulo = primeira[4:].strip() if primeira.startswith("### ") else ""
+        entradas.append((base + ini, base + fim, titulo, dict(Counter(tokenizar(bloco)))))
+    return entradas
+
+
+class IndiceMemoria:
+    """Indice BM25 incremental sobre os arquivos .md de um diretorio."""
+
+    def __init__(self, diretorio: Path, caminho_indice: Optional[Path] = INDICE_PATH):
+        self.diretorio = Path(diretorio)
+        self.caminho_indice = caminho_indice
+        self._lock = threading.Lock()
+        self._arquivos: Dict[str, Dict] = {}
+        self._docs: Dict[int, Tuple[str, Entrada]] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._tamanhos: Dict[int, int] = {}
+        self._total_termos = 0
+        self._proximo_id = 0
+        self.versao = 0  # incrementada a cada mudanca no conjunto de entradas
+        self._carregado = False
+        self._sujo = False
+        self._ultimo_salvamento = 0.0
+        self.stats: Dict[str, int] = {"reindexados": 0, "anexos": 0, "buscas": 0}
+        atexit.register(self.salvar)
+
+    # --- ESTRUTURA EM MEMORIA ---
+    def _incluir(self, nome: str, entrada: Entrada) -> None:
+        doc_id = self._proximo_id
+        self._proximo_id += 1
+        self.versao += 1
+        self._docs[doc_id] = (nome, entrada)
+        self._arquivos[nome]["docs"].append(doc_id)
+        self._tamanhos[doc_id] = sum(entrada[3].values())
+        for termo, tf in entrada[3].items():
+            self._postings.setdefault(termo, {})[doc_id] = tf
+            self._total_termos += tf
+
+    def _excluir_arquivo(self, nome: str) -> None:
+        estado = self._arquivos.pop(nome, None)
+        if not estado:
+            return
+        self.versao += 1
+        for doc_id in estado["docs"]:
+            _, entrada = self._docs.pop(doc_id)
+            self._tamanhos.pop(doc_id, None)
+            for termo, tf in entrada[3].items():
+                lista = self._postings.get(termo)
+                if lista is not None:
+                    lista.pop(doc_id, None)
+                    if not lista:
+                        del self._postings[termo]
+                self._total_termos -= tf
+
+    # --- PERSISTENCIA ---
+    def _carregar(self) -> None:
+        if self._carregado:
+            return
+        self._carregado = True
+        self._ultimo_salvamento = time.monotonic()
+        if not self.caminho_indice or not self.caminho_indice.exists():
+            return
+        try:
+            dados = json.loads(self.caminho_indice.read_text(encoding="utf-8"))
+            if dados.get("versao") != _VERSAO:
+                return
+            for nome, estado in dados["arquivos"].items():
+                self._arquivos[nome] = {"mtime": estado["mtime"], "tamanho": estado["tamanho"], "docs": []}
+                for ini, fim, titulo, tf in estado["entradas"]:
+                    self._incluir(nome, (ini, fim, titulo, tf))
+        except (OSError, ValueError, KeyError, TypeError):
+            self._arquivos.clear()
+            self._docs.clear()
+            self._postings.clear()
+            self._tamanhos.clear()
+            self._total_termos = 0
+
+    def salvar(self) -> None:
+        """Grava o indice em disco se houver mudancas pendentes."""
+        with self._lock:
+            self._salvar(forcar=True)
+
+    def _salvar(self, forcar: bool = False) -> None:
+        if not self._sujo or not self.caminho_indice:
+            return
+        # Regravar o JSON inteiro custa O(entradas): no maximo a cada _INTERVALO_SALVAR.
+        if not forcar and time.monotonic() - self._ultimo_salvamento < _INTERVALO_SALVAR:
+            return
+        dados = {
+            "versao": _VERSAO,
+            "arquivos": {
+                nome: {
+                    "mtime": estado["mtime"],
+                    "tamanho": estado["tamanho"],
+                    "entradas": [list(self._docs[d][1]) for d in estado["docs"]],
+                }
+                for nome, estado in self._arquivos.items()
+            },
+        }
+        try:
+            tmp = self.caminho_indice.with_suffix(".tmp")
+            tmp.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.caminho_indice)
+            self._sujo = False
+            self._ultimo_salvamento = time.monotonic()
+        except OSError:
+            pass
+
+    # --- SINCRONIZACAO ---
+    def _atualizar_arquivo(self, path: Path) -> None:
+        nome = path.name
+        try:
+            st = path.stat()
+        except OSError:
+            if nome in self._arquivos:
+                self._excluir_arquivo(nome)
+                self._sujo = True
+            return
+        estado = self._arquivos.get(nome)
+        if estado and estado["mtime"] == st.st_mtime and estado["tamanho"] == st.st_size:
+            return
+
+        with open(path, "rb") as f:
+            if estado and st.st_size > estado["tamanho"]:
+                # Apenas cresceu: se o trecho novo comeca em um cabecalho, indexa so ele.
+                f.seek(estado["tamanho"])
+                cauda = f.read()
+                if cauda.lstrip(b"\r\n").startswith(b"### "):
+                    base = estado["tamanho"]
+                    estado["mtime"], estado["tamanho"] = st.st_mtime, base + len(cauda)
+                    for entrada in _dividir_entradas(cauda, base):
+                        self._incluir(nome, entrada)
+                    self.stats["anexos"] += 1
+                    self._sujo = True
+                    return
+                f.seek(0)
+            dados = f.read()
+
+        self._excluir_arquivo(nome)
+        self._arquivos[nome] = {"mtime": st.st_mtime, "tamanho": len(dados), "docs": []}
+        for entrada in _dividir_entradas(dados, 0):
+            self._incluir(nome, entrada)
+        self.stats["reindexados"] += 1
+        self._sujo = True
+
+    def atualizar(self, path: Path) -> None:
+        """
+        Indexa o que mudou em um arquivo (chamado apos `memorizar`). Nao grava o
+        indice em disco: a proxima busca persiste, e uma sessao nova so rele o final.
+        """
+        with self._lock:
+            self._carregar()
+            self._atualizar_arquivo(Path(path))
+
+    def sincronizar(self) -> None:
+        """Reindexa apenas arquivos novos/alterados (mtime/tamanho) e remove os apagados."""
+        with self._lock:
+            self._carregar()
+            self._sincronizar()
+            self._salvar()
+
+    def _sincronizar(self) -> None:
+        presentes = set()
+        if self.diretorio.exists():
+            for entrada in os.scandir(self.diretorio):
+                if entrada.name.endswith(".md") and entrada.is_file():
+                    presentes.add(entrada.name)
+                    self._atualizar_arquivo(Path(entrada.path))
+        for nome in list(self._arquivos):
+            if nome not in presentes:
+                self._excluir_arquivo(nome)
+                self._sujo = True
+
+    # --- BUSCA ---
+    def buscar(self, consulta: str, k: int = 5) -> List[Tuple[float, str, Entrada]]:
+        """Top-k entradas por BM25: lista de (score, arquivo, entrada)."""
+        termos = set(tokenizar(consulta))
+        with self._lock:
+            self._carregar()
+            self._sincronizar()
+            self._salvar()
+            self.stats["buscas"] += 1
+            n = len(self._docs)
+            if not n or not termos:
+                return []
+            media = self._total_termos / n
+            scores: Dict[int, float] = {}
+            for termo in termos:
+                lista = self._postings.get(termo)
+                if not lista:
+                    continue
+                idf = math.log(1 + (n - len(lista) + 0.5) / (len(lista) + 0.5))
+                for doc_id, tf in lista.items():
+                    norma = tf + _K1 * (1 - _B + _B * self._tamanhos[doc_id] / media)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_K1 + 1) / norma
+            melhores = heapq.nlargest(max(1, k), scores.items(), key=lambda item: item[1])
+            return [(score, *self._docs[doc_id]) for doc_id, score in melhores]
+
+    def entradas(self) -> List[Tuple[str, Entrada]]:
+        """Sincroniza e devolve (arquivo, entrada) de todas as entradas, na ordem de indexacao."""
+        with self._lock:
+            self._carregar()
+            self._sincronizar()
+            self._salvar()
+            return list(self._docs.values())
+
+    def frequencias(self, termos: List[str]) -> Tuple[int, Dict[str, int]]:
+        """Total de entradas e document frequency de cada termo (para IDF)."""
+        with self._lock:
+            return len(self._docs), {t: len(self._postings.get(t, ())) for t in termos}
+
+    def ler(self, nome: str, entrada: Entrada) -> str:
+        """Le o texto de uma entrada direto do arquivo, pelo offset."""
+        ini, fim = entrada[0], entrada[1]
+        with open(self.diretorio / nome, "rb") as f:
+            f.seek(ini)
+            return f.read(fim - ini).decode("utf-8", "replace").strip()
+
+    def total_entradas(self) -> int:
+        with self._lock:
+            return len(self._docs)
@@ -0,0 +1,305 @@
+"""
+Gerenciador de jobs de longa duracao (`executar_processo_background`).
+
+Cada job roda no motor async (skills/_motor_async.py) num grupo de processos
+proprio (`start_new_session`), com stdout+stderr drenados continuamente para:
+- um log rotativo em `jarvis_logs/jobs/<id>.log` (JOBS_LOG_MAX_BYTES,
+  JOBS_LOG_BACKUPS arquivos `.1`, `.2`, ...); a numeracao continua do maior
+  id ja presente em JOBS_DIR, entao uma sessao nova nao sobrescreve logs antigos;
+- um buffer circular em memoria usado por `tail`.
+Enquanto o job roda, CPU e RSS do grupo inteiro sao amostrados a cada
+JOBS_AMOSTRA_SEGUNDOS (via psutil se instalado, senao /proc no Linux).
+JOBS_MAX_CONCORRENTES limita quantos jobs rodam ao mesmo tempo.
+
+O job fica em PROCESSOS_ATIVOS (chave = PID) com um adaptador que encerra o
+grupo todo, entao `cleanup_processos` nao deixa netos orfaos.
+"""
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from skills.util_comuns import LOG_DIR, PROCESSOS_ATIVOS, PROCESSOS_LOCK
+from skills._motor_async import MOTOR, ProcessoGrupo, _ler_linhas, _LIMITE_LINHA, opcoes_grupo, sinalizar_grupo
+from skills._streaming import BufferCircular
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+JOBS_DIR = LOG_DIR / "jobs"
+MAX_CONCORRENTES = int(os.getenv("JOBS_MAX_CONCORRENTES", "4"))
+LOG_MAX_BYTES = int(os.getenv("JOBS_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("JOBS_LOG_BACKUPS", "2"))
+AMOSTRA_SEGUNDOS = float(os.getenv("JOBS_AMOSTRA_SEGUNDOS", "2"))
+BUFFER_CHARS = int(os.getenv("JARVIS_BACKGROUND_MAX_CHARS", "20000"))
+_MAX_FINALIZADOS = 50
+_TOLERANCIA_TERMINO = 3.0
+
+
+class LimiteJobs(RuntimeError):
+    """Ja ha JOBS_MAX_CONCORRENTES jobs em execucao."""
+
+
+class LogRotativo:
+    """Arquivo de log que rotaciona ao passar de `max_bytes` (job.log -> job.log.1 -> ...)."""
+
+    def __init__(self, caminho: Path, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.caminho = caminho
+        self.max_bytes = max(1024, max_bytes)
+        self.backups = max(0, backups)
+        self.rotacoes = 0
+        self._arquivo: Optional[TextIO] = open(caminho, "w", encoding="utf-8")
+        self._tamanho = 0
+
+    def escrever(self, linha: str) -> None:
+        if self._arquivo is None:
+            return
+        dados = linha + "\n"
+        if self._tamanho + len(dados) > self.max_bytes and self._tamanho:
+            self._rotacionar()
+        self._arquivo.write(dados)
+        self._tamanho += len(dados)
+
+    def _rotacionar(self) -> None:
+        self._arquivo.close()
+        for i in range(self.backups, 0, -1):
+            origem = self.caminho if i == 1 else self.caminho.with_name(f"{self.caminho.name}.{i - 1}")
+            if origem.exists():
+                os.replace(origem, self.caminho.with_name(f"{self.caminho.name}.{i}"))
+        self._arquivo = open(self.caminho, "w", encoding="utf-8")
+        self._tamanho = 0
+        self.rotacoes += 1
+
+    def flush(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.flush()
+
+    def fechar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+# --- AMOSTRAGEM DE CPU/RSS ---
+_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _amostrar_grupo(pid: int) -> Optional[Tuple[float, int]]:
+    """(segundos de CPU acumulados, RSS em bytes) do grupo/arvore do job; None se indisponivel."""
+    if psutil is not None:
+        try:
+            raiz = psutil.Process(pid)
+            processos = [raiz] + raiz.children(recursive=True)
+        except psutil.Error:
+            return None
+        cpu, rss = 0.0, 0
+        for p in processos:
+            with contextlib.suppress(psutil.Error):
+                t = p.cpu_times()
+                cpu += t.user + t.system + getattr(t, "children_user", 0.0) + getattr(t, "children_system", 0.0)
+                rss += p.memory_info().rss
+        return cpu, rss
+    if not os.path.isdir("/proc"):
+        return None
+    cpu_ticks, rss_paginas, achou = 0, 0, False
+    for nome in os.listdir("/proc"):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f"/proc/{nome}/stat", "rb") as f:
+                campos = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        # campos[0] = estado; pgrp = campo 5 do stat; utime..cstime = 14..17; rss = 24
+        if int(campos[2]) != pid:
+            continue
+        achou = True
+        cpu_ticks += sum(int(c) for c in campos[11:15])
+        rss_paginas += int(campos[21])
+    return (cpu_ticks / _TICKS, rss_paginas * _PAGINA) if achou else None
+
+
+class Job:
+    """Estado de um processo em background e suas metricas."""
+
+    def __init__(self, job_id: str, comando: str, log: LogRotativo):
+        self.id = job_id
+        self.comando = comando
+        self.log = log
+        self.saida = BufferCircular(BUFFER_CHARS)
+        self.pid: Optional[int] = None
+        self.inicio = time.time()
+        self.fim: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.cancelado = False
+        self.linhas = 0
+        self.cpu_segundos = 0.0
+        self.cpu_percentual = 0.0
+        self.rss_bytes = 0
+        self.rss_pico = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.fim is None
+
+    def estado(self) -> str:
+        if self.ativo:
+            return "executando"
+        if self.cancelado:
+            return f"cancelado (exit {self.returncode})"
+        return f"concluido (exit {self.returncode})"
+
+    def resumo(self) -> str:
+        duracao = (self.fim or time.time()) - self.inicio
+        return (
+            f"{self.id} [PID {self.pid}] {self.estado()} ha {duracao:.0f}s | "
+            f"CPU {self.cpu_segundos:.1f}s ({self.cpu_percentual:.0f}% atual) | "
+            f"RSS {self.rss_bytes / 1e6:.1f}MB (pico {self.rss_pico / 1e6:.1f}MB) | "
+            f"{self.linhas} linhas | log: {self.log.caminho}\n    $ {self.comando}"
+        )
+
+
+def _maior_id_existente() -> int:
+    # `job-12.log`, `job-12.log.1`, ... de sessoes anteriores.
+    maior = 0
+    for p in JOBS_DIR.glob("job-*.log*"):
+        numero = p.name[len("job-"):].split(".", 1)[0]
+        if numero.isdigit():
+            maior = max(maior, int(numero))
+    return maior
+
+
+class GerenciadorJobs:
+    """Inicia, acompanha e encerra jobs em background no motor async."""
+
+    def __init__(self, max_concorrentes: int = MAX_CONCORRENTES):
+        self.max_concorrentes = max(1, max_concorrentes)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._contador: Optional[int] = None
+
+    def ativos(self) -> List[Job]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.ativo]
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def obter(self, chave: str) -> Optional[Job]:
+        """Busca por id (`job-3`, `3`) ou PID."""
+        chave = chave.strip()
+        with self._lock:
+            if chave in self._jobs:
+                return self._jobs[chave]
+            if f"job-{chave}" in self._jobs:
+                return self._jobs[f"job-{chave}"]
+            return next((j for j in self._jobs.values() if str(j.pid) == chave), None)
+
+    def iniciar(self, comando: str) -> Job:
+        """Inicia o comando shell como job. Levanta LimiteJobs se o limite estiver cheio."""
+        with self._lock:
+            em_execucao = [j for j in self._jobs.values() if j.ativo]
+            if len(em_execucao) >= self.max_concorrentes:
+                raise LimiteJobs(
+                    f"limite de {self.max_concorrentes} jobs simultaneos atingido "
+                    f"({', '.join(j.id for j in em_execucao)}); use cancelar_job ou aguarde."
+                )
+            JOBS_DIR.mkdir(parents=True, exist_ok=True)
+            if self._contador is None:
+                self._contador = _maior_id_existente()
+            self._contador += 1
+            job_id = f"job-{self._contador}"
+            job = Job(job_id, comando, LogRotativo(JOBS_DIR / f"{job_id}.log"))
+            self._jobs[job_id] = job
+            self._podar()
+        try:
+            MOTOR.executar(self._iniciar(job))
+        except Exception:
+            job.fim = time.time()
+            job.log.fechar()
+            raise
+        return job
+
+    def _podar(self) -> None:
+        finalizados = [j for j in self._jobs.values() if not j.ativo]
+        for job in finalizados[: max(0, len(finalizados) - _MAX_FINALIZADOS)]:
+            del self._jobs[job.id]
+
+    async def _iniciar(self, job: Job) -> None:
+        proc = await asyncio.create_subprocess_shell(
+            job.comando,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=_LIMITE_LINHA,
+            **opcoes_grupo(),
+        )
+        job.pid = proc.pid
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS[str(proc.pid)] = {
+                "proc": ProcessoGrupo(proc),
+                "cmd": job.comando,
+                "type": "background",
+                "job": job.id,
+            }
+        asyncio.ensure_future(self._acompanhar(job, proc))
+
+    async def _acompanhar(self, job: Job, proc: asyncio.subprocess.Process) -> None:
+        amostrador = asyncio.ensure_future(self._amostrar(job))
+        try:
+            async for linha in _ler_linhas(proc.stdout):
+                job.saida.adicionar(linha)
+                job.log.escrever(linha)
+                job.linhas += 1
+            await proc.wait()
+        finally:
+            amostrador.cancel()
+            job.returncode = proc.returncode
+            job.cpu_percentual = 0.0
+            job.fim = time.time()
+            job.log.fechar()
+            with PROCESSOS_LOCK:
+                PROCESSOS_ATIVOS.pop(str(proc.pid), None)
+
+    async def _amostrar(self, job: Job) -> None:
+        anterior: Optional[Tuple[float, float]] = None
+        while True:
+            amostra = await asyncio.to_thread(_amostrar_grupo, job.pid)
+            agora = time.monotonic()
+            if amostra is not None:
+                cpu, rss = amostra
+                if anterior is not None and agora > anterior[1]:
+                    job.cpu_percentual = max(0.0, 100 * (cpu - anterior[0]) / (agora - anterior[1]))
+                anterior = (cpu, agora)
+                job.cpu_segundos = max(job.cpu_segundos, cpu)
+                job.rss_bytes = rss
+                job.rss_pico = max(job.rss_pico, rss)
+            job.log.flush()
+            await asyncio.sleep(AMOSTRA_SEGUNDOS)
+
+    def cancelar(self, job: Job) -> bool:
+        """SIGTERM no grupo; SIGKILL se nao sair em alguns segundos."""
+        if not job.ativo or job.pid is None:
+            return False
+        job.cancelado = True
+        sinalizar_grupo(job.pid, forcar=False)
+        limite = time.monotonic() + _TOLERANCIA_TERMINO
+        while job.ativo and time.monotonic() < limite:
+            time.sleep(0.05)
+        if job.ativo:
+            sinalizar_grupo(job.pid, forcar=True)
+        return True
+
+    def tail(self, job: Job, linhas: int = 50) -> str:
+        texto = job.saida.texto()
+        return "\n".join(texto.splitlines()[-max(1, linhas):])
+
+
+JOBS = GerenciadorJobs()
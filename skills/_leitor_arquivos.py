@@ -0,0 +1,193 @@
+"""
+Leitura por faixas e escrita atomica de arquivos grandes (memoria constante).
+
+A leitura usa `mmap`: o arquivo nunca e carregado inteiro, so as paginas
+tocadas pelo trecho pedido. Todas as funcoes devolvem texto limitado a
+`max_bytes` (LER_ARQUIVO_MAX_BYTES) com um aviso explicito quando cortam:
+- `trecho_bytes`: faixa [inicio, fim) em bytes;
+- `trecho_linhas`: linhas [inicio, fim] (1-based), contando quebras em blocos;
+- `cauda`: ultimas N linhas, com `mmap.rfind` a partir do fim;
+- `grep`: regex (bytes) aplicada direto sobre o mmap, com numero de linha.
+
+`escrever_atomico` grava em blocos de ESCRITA_BLOCO_BYTES num arquivo
+temporario do mesmo diretorio e faz `os.replace` (leitores nunca veem o
+arquivo pela metade).
+"""
+import mmap
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+MAX_BYTES = int(os.getenv("LER_ARQUIVO_MAX_BYTES", str(64 * 1024)))
+BLOCO_BYTES = int(os.getenv("ESCRITA_BLOCO_BYTES", str(1024 * 1024)))
+_BLOCO_CONTAGEM = 1024 * 1024
+
+
+@contextmanager
+def _mapear(p: Path) -> Iterator[Optional[mmap.mmap]]:
+    """mmap somente leitura (None para arquivo vazio, que nao pode ser mapeado)."""
+    with open(p, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def _decodificar(dados: bytes) -> str:
+    return dados.decode("utf-8", errors="replace")
+
+
+def _aviso(mostrados: int, total: int, dica: str) -> str:
+    return f"\n[... truncado: {mostrados} de {total} bytes exibidos; {dica} ...]"
+
+
+def _contar_linhas(mm: mmap.mmap, inicio: int, fim: int) -> int:
+    """Quebras de linha em mm[inicio:fim], em blocos (sem copiar a faixa inteira)."""
+    total = 0
+    while inicio < fim:
+        passo = min(fim, inicio + _BLOCO_CONTAGEM)
+        total += mm[inicio:passo].count(b"\n")
+        inicio = passo
+    return total
+
+
+def _pular_linhas(mm: mmap.mmap, pos: int, n: int) -> int:
+    """Offset logo apos a n-esima quebra de linha a partir de `pos` (-1 se o arquivo acabar antes)."""
+    while n > 0:
+        passo = min(len(mm), pos + _BLOCO_CONTAGEM)
+        if pos >= passo:
+            return -1
+        quebras = mm[pos:passo].count(b"\n")
+        if quebras < n:
+            n -= quebras
+            pos = passo
+            continue
+        for _ in range(n):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+    return pos
+
+
+def trecho_bytes(p: Path, inicio: int = 0, fim: int = 0, max_bytes: int = MAX_BYTES) -> str:
+    """Bytes [inicio, fim) do arquivo (fim <= 0 = ate o final), limitado a max_bytes."""
+    with _mapear(p) as mm:
+        if mm is None:
+            return ""
+        tamanho = len(mm)
+        inicio = max(0, min(inicio, tamanho))
+        fim = tamanho if fim <= 0 else max(inicio, min(fim, tamanho))
+        corte = min(fim, inicio + max_bytes)
+        texto = _decodificar(mm[inicio:corte])
+        if corte < fim:
+            texto += _aviso(corte - inicio, fim - inicio, f"continue com byte_inicio={corte}")
+        return texto
+
+
+def trecho_linhas(p: Path, inicio: int = 1, fim: int = 0, max_bytes: int = MAX_BYTES) -> str:
+    """Linhas [inicio, fim] (1-based, fim <= 0 = ate o final), limitado a max_bytes."""
+    with _mapear(p) as mm:
+        if mm is None:
+            return ""
+        pos = _pular_linhas(mm, 0, max(1, inicio) - 1)
+        if pos == -1 or pos >= len(mm):
+            return f"ℹ️ O arquivo tem menos de {inicio} linhas."
+        limite = len(mm)
+        if fim > 0:
+            limite = _pular_linhas(mm, pos, fim - max(1, inicio) + 1)
+            limite = len(mm) if limite == -1 else limite
+        corte = min(limite, pos + max_bytes)
+        texto = _decodificar(mm[pos:corte])
+        if corte < limite:
+            linha = max(1, inicio) + _contar_linhas(mm, pos, corte)
+            texto += _aviso(corte - pos, limite - pos, f"continue com linha_inicio={linha}")
+        return texto
+
+
+def cauda(p: Path, linhas: int, max_bytes: int = MAX_BYTES) -> str:
+    """Ultimas `linhas` linhas do arquivo, limitado a max_bytes (mantem o final)."""
+    with _mapear(p) as mm:
+        if mm is None:
+            return ""
+        fim = len(mm)
+        pos = fim - 1 if mm[fim - 1:fim] == b"\n" else fim
+        for _ in range(max(1, linhas)):
+            pos = mm.rfind(b"\n", 0, pos)
+            if pos == -1:
+                break
+        inicio = pos + 1
+        if fim - inicio > max_bytes:
+            corte = fim - max_bytes
+            return f"[... truncado: {max_bytes} de {fim - inicio} bytes exibidos ...]\n" + _decodificar(mm[corte:fim])
+        return _decodificar(mm[inicio:fim])
+
+
+def grep(p: Path, padrao: str, max_resultados: int = 200, max_bytes: int = MAX_BYTES) -> str:
+    """Linhas que casam com a regex `padrao` (`^`/`$` ancoram em cada linha), prefixadas pelo numero da linha."""
+    regex = re.compile(padrao.encode("utf-8"), re.MULTILINE)
+    resultados: List[str] = []
+    usados = 0
+    with _mapear(p) as mm:
+        if mm is None:
+            return f"ℹ️ Nenhuma ocorrencia de '{padrao}'."
+        linha, contado_ate, proxima_busca = 1, 0, 0
+        while len(resultados) < max_resultados:
+            m = regex.search(mm, proxima_busca)
+            if m is None or (m.start() >= len(mm) and mm[-1:] == b"\n"):
+                break  # casamento vazio depois da quebra final nao e uma linha
+            ini = mm.rfind(b"\n", 0, m.start()) + 1
+            fim = mm.find(b"\n", m.start())
+            fim = len(mm) if fim == -1 else fim
+            linha += _contar_linhas(mm, contado_ate, ini)
+            contado_ate = ini
+            texto = f"{linha}: {_decodificar(mm[ini:min(fim, ini + 500)]).rstrip()}"
+            if usados + len(texto) + 1 > max_bytes:
+                resultados.append(f"[... truncado em {max_bytes} bytes; refine o padrao ...]")
+                break
+            resultados.append(texto)
+            usados += len(texto) + 1
+            proxima_busca = fim + 1
+            if proxima_busca > len(mm):
+                break
+        else:
+            resultados.append(f"[... limite de {max_resultados} ocorrencias ...]")
+    if not resultados:
+        return f"ℹ️ Nenhuma ocorrencia de '{padrao}'."
+    return "\n".join(resultados)
+
+
+def escrever_atomico(p: Path, conteudo: str, bloco: int = BLOCO_BYTES) -> int:
+    """Grava `conteudo` em blocos num temporario ao lado de `p` e troca com os.replace. Retorna bytes."""
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=f".{p.name}.", suffix=".tmp")
+    total = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for i in range(0, len(conteudo), bloco):
+                trecho = conteudo[i:i + bloco]
+                if os.linesep != "\n":
+                    trecho = trecho.replace("\n", os.linesep)  # mesmo comportamento de write_text
+                dados = trecho.encode("utf-8")
+                f.write(dados)
+                total += len(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(p).st_mode & 0o7777)
+        except OSError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return total
+
@@ -0,0 +1,186 @@
+"""
+Manifesto das skills em cache + proxies de carregamento preguicoso.
+
+O loader do Jarvis so precisa de nome, docstring e assinatura de cada
+ferramenta para montar o TOOL_MAP; importar o modulo (e as dependencias
+pesadas dele) fica para a primeira chamada. O manifesto e extraido via `ast`
+(mesmos criterios do loader antigo: funcao de topo, sincrona, nao geradora,
+com docstring e type hints) e guardado em `jarvis_logs/manifesto_skills.json`,
+invalidado por mtime/tamanho e, se eles mudarem, pelo SHA-256 do arquivo.
+"""
+import ast
+import hashlib
+import importlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from skills.util_comuns import LOG_DIR
+
+MANIFESTO_PATH = LOG_DIR / "manifesto_skills.json"
+_VERSAO = 1
+
+
+def _instrucoes_topo(corpo: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Instrucoes de nivel de modulo, incluindo as dentro de if/try/with."""
+    for node in corpo:
+        yield node
+        if isinstance(node, (ast.If, ast.Try, ast.With)):
+            for bloco in ("body", "orelse", "finalbody"):
+                yield from _instrucoes_topo(getattr(node, bloco, []))
+            for handler in getattr(node, "handlers", []):
+                yield from _instrucoes_topo(handler.body)
+
+
+def _e_gerador(func: ast.FunctionDef) -> bool:
+    pendentes = list(func.body)
+    while pendentes:
+        node = pendentes.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        pendentes.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _anotada(func: ast.FunctionDef) -> bool:
+    args = func.args
+    todos = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+    return func.returns is not None or any(a.annotation is not None for a in todos)
+
+
+def extrair_ferramentas(codigo: str) -> List[Dict[str, str]]:
+    """Ferramentas (nome, doc, assinatura) definidas no codigo de um modulo de skill."""
+    ferramentas: Dict[str, Dict[str, str]] = {}
+    for node in _instrucoes_topo(ast.parse(codigo).body):
+        if isinstance(node, ast.FunctionDef):
+            doc = ast.get_docstring(node)
+            if doc and _anotada(node) and not _e_gerador(node):
+                ferramentas[node.name] = {
+                    "nome": node.name,
+                    "doc": doc,
+                    "assinatura": f"{node.name}({ast.unparse(node.args)})",
+                }
+                continue
+        # Redefinicoes posteriores (async, classe, atribuicao) sobrescrevem o nome.
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            ferramentas.pop(node.name, None)
+    return list(ferramentas.values())
+
+
+class ManifestoSkills:
+    """Cache em disco das ferramentas extraidas de cada arquivo de skill."""
+
+    def __init__(self, caminho: Optional[Path] = MANIFESTO_PATH):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._arquivos: Optional[Dict[str, Dict[str, Any]]] = None
+        self.stats: Dict[str, int] = {"reaproveitados": 0, "reprocessados": 0}
+
+    def _carregar(self) -> Dict[str, Dict[str, Any]]:
+        if self._arquivos is None:
+            self._arquivos = {}
+            if self.caminho and self.caminho.exists():
+                try:
+                    dados = json.loads(self.caminho.read_text(encoding="utf-8"))
+                    if dados.get("versao") == _VERSAO:
+                        self._arquivos = dados["arquivos"]
+                except (OSError, ValueError, KeyError):
+                    pass
+        return self._arquivos
+
+    def _salvar(self) -> None:
+        if not self.caminho:
+            return
+        try:
+            tmp = self.caminho.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"versao": _VERSAO, "arquivos": self._arquivos}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.caminho)
+        except OSError:
+            pass
+
+    def _entrada(self, py_file: Path, cache: Dict[str, Dict[str, Any]]) -> bool:
+        """Atualiza a entrada do arquivo; retorna True se o manifesto mudou."""
+        st = py_file.stat()
+        anterior = cache.get(py_file.name)
+        if anterior and anterior["mtime"] == st.st_mtime and anterior["tamanho"] == st.st_size:
+            self.stats["reaproveitados"] += 1
+            return False
+        conteudo = py_file.read_bytes()
+        digest = hashlib.sha256(conteudo).hexdigest()
+        if anterior and anterior["sha256"] == digest:
+            anterior["mtime"], anterior["tamanho"] = st.st_mtime, st.st_size
+            self.stats["reaproveitados"] += 1
+            return True
+        entrada: Dict[str, Any] = {"mtime": st.st_mtime, "tamanho": st.st_size, "sha256": digest}
+        try:
+            entrada["ferramentas"] = extrair_ferramentas(conteudo.decode("utf-8-sig"))
+        except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+            entrada["ferramentas"] = []
+            entrada["erro"] = f"{type(e).__name__}: {e}"
+        cache[py_file.name] = entrada
+        self.stats["reprocessados"] += 1
+        return True
+
+    def atualizar(self, arquivos: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+        """Devolve {nome_arquivo: entrada} para os arquivos dados, reprocessando so os alterados."""
+        with self._lock:
+            cache = self._carregar()
+            mudou = False
+            vistos = set()
+            for py_file in arquivos:
+                vistos.add(py_file.name)
+                mudou |= self._entrada(py_file, cache)
+            for nome in [n for n in cache if n not in vistos]:
+                del cache[nome]
+                mudou = True
+            if mudou:
+                self._salvar()
+            return {nome: cache[nome] for nome in vistos}
+
+
+class ToolPreguicosa:
+    """Callable que so importa o modulo da skill na primeira chamada."""
+
+    def __init__(self, modulo: str, nome: str, doc: str, assinatura: str = ""):
+        self.__name__ = nome
+        self.__qualname__ = nome
+        self.__module__ = modulo
+        self.__doc__ = doc
+        self.assinatura = assinatura or f"{nome}(...)"
+        self._func: Optional[Callable[..., Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def carregada(self) -> bool:
+        return self._func is not None
+
+    def carregar(self) -> Callable[..., Any]:
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    modulo = importlib.import_module(self.__module__)
+                    self._func = getattr(modulo, self.__name__)
+        return self._func
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.carregar()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        estado = "carregada" if self.carregada else "preguicosa"
+        return f"<ToolPreguicosa {self.__module__}.{self.assinatura} ({estado})>"
+
+
+def ferramentas_do_arquivo(py_file: Path, entrada: Dict[str, Any]) -> List[ToolPreguicosa]:
+    """Proxies das ferramentas listadas no manifesto de um arquivo `skills/<modulo>.py`."""
+    modulo = f"skills.{py_file.stem}"
+    return [
+        ToolPreguicosa(modulo, f["nome"], f["doc"], f["assinatura"])
+        for f in entrada.get("ferramentas", [])
+    ]
+
+
+MANIFESTO_SKILLS = ManifestoSkills()
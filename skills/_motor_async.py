@@ -0,0 +1,286 @@
+"""
+Motor assincrono (asyncio) dos bridges de CLI.
+
+Um unico event loop roda numa thread dedicada. Os subprocessos sao criados com
+`asyncio.create_subprocess_exec`/`create_subprocess_shell` e as chamadas de CLI
+sao limitadas por um semaforo (JARVIS_MAX_CONCURRENCY). As funcoes sincronas
+dos bridges (`gemini_cli_raw`, `executar_codex_cli`, ...) sao wrappers finos que
+submetem corrotinas a este loop: as skills existentes continuam funcionando e o
+REPL pode disparar varios turnos em paralelo sem uma thread por pipe.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Iterator, List, Optional
+
+from skills.util_comuns import PROCESSOS_ATIVOS, PROCESSOS_LOCK
+from skills._streaming import ExecucaoStream, iniciar_log
+from skills import _traces as traces
+
+MAX_CONCURRENCIA = int(os.getenv("JARVIS_MAX_CONCURRENCY", "4"))
+_LIMITE_LINHA = 1024 * 1024
+
+_FIM = object()
+
+
+class ProcessoAsync:
+    """
+    Adapta `asyncio.subprocess.Process` para a interface sincrona usada por
+    `cleanup_processos` (poll/terminate/kill/wait), chamada de outras threads.
+    """
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self._proc = proc
+
+    @property
+    def pid(self) -> int:
+        return self._proc.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._proc.returncode
+
+    def poll(self) -> Optional[int]:
+        return self._proc.returncode
+
+    def terminate(self) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            self._proc.terminate()
+
+    def kill(self) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            self._proc.kill()
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        limite = time.monotonic() + timeout if timeout is not None else None
+        while self._proc.returncode is None:
+            if limite is not None and time.monotonic() > limite:
+                raise subprocess.TimeoutExpired(str(self._proc.pid), timeout)
+            time.sleep(0.05)
+        return self._proc.returncode
+
+
+def opcoes_grupo() -> Dict[str, Any]:
+    """kwargs de criacao de subprocesso para rodar num grupo de processos proprio."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def sinalizar_grupo(pid: int, forcar: bool) -> None:
+    """SIGTERM/SIGKILL no grupo criado com `opcoes_grupo` (no Windows, taskkill /T)."""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(pid)], capture_output=True, check=False)
+        return
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pid, signal.SIGKILL if forcar else signal.SIGTERM)
+
+
+class ProcessoGrupo(ProcessoAsync):
+    """ProcessoAsync cujo terminate/kill atingem o grupo de processos inteiro."""
+
+    def terminate(self) -> None:
+        sinalizar_grupo(self.pid, forcar=False)
+
+    def kill(self) -> None:
+        sinalizar_grupo(self.pid, forcar=True)
+
+
+async def _ler_linhas(stream: asyncio.StreamReader) -> AsyncIterator[str]:
+    while True:
+        try:
+            bruto = await stream.readline()
+        except ValueError:
+            yield f"[...LINHA MAIOR QUE {_LIMITE_LINHA} BYTES DESCARTADA...]"
+            continue
+        if not bruto:
+            return
+        yield bruto.decode("utf-8", "replace").rstrip("\r\n")
+
+
+class MotorAsync:
+    """Event loop dedicado com limite de concorrencia para os CLIs."""
+
+    def __init__(self, max_concorrencia: int = MAX_CONCURRENCIA):
+        self.max_concorrencia = max(1, max_concorrencia)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"submetidos": 0, "em_execucao": 0, "pico": 0}
+
+    # --- LOOP ---
+    def _garantir_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                pronto = threading.Event()
+
+                def _rodar() -> None:
+                    asyncio.set_event_loop(loop)
+                    self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+                    pronto.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_rodar, daemon=True, name="jarvis-motor-async")
+                self._thread.start()
+                pronto.wait()
+                self._loop = loop
+        return self._loop
+
+    def agendar(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Agenda a corrotina no loop do motor sem bloquear o chamador."""
+        loop = self._garantir_loop()
+        self.stats["submetidos"] += 1
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def executar(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Executa a corrotina no motor e bloqueia ate o resultado (wrapper sincrono)."""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Wrapper sincrono chamado dentro do motor async; use a versao async.")
+        return self.agendar(coro).result()
+
+    def gerar_linhas(self, fabrica: Callable[[Callable[[str], None]], Awaitable[Any]]) -> Iterator[str]:
+        """Executa `fabrica(ao_receber)` no motor e devolve as linhas recebidas como gerador sincrono."""
+        fila: "queue.Queue[object]" = queue.Queue()
+        futuro = self.agendar(fabrica(fila.put))
+        futuro.add_done_callback(lambda _: fila.put(_FIM))
+        while True:
+            item = fila.get()
+            if item is _FIM:
+                break
+            yield item
+        futuro.result()
+
+    @contextlib.asynccontextmanager
+    async def limite(self) -> AsyncIterator[None]:
+        """Ocupa uma vaga do semaforo de concorrencia (usar dentro do loop)."""
+        async with self._semaforo:
+            self.stats["em_execucao"] += 1
+            self.stats["pico"] = max(self.stats["pico"], self.stats["em_execucao"])
+            try:
+                yield
+            finally:
+                self.stats["em_execucao"] -= 1
+
+    # --- SUBPROCESSOS ---
+    async def criar_processo(self, comando: List[str]) -> asyncio.subprocess.Process:
+        """Inicia o comando com pipes. Levanta FileNotFoundError se o executavel nao existir."""
+        inicio = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            *comando,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=_LIMITE_LINHA,
+            env=os.environ.copy(),
+        )
+        traces.somar("spawn", (time.perf_counter() - inicio) * 1000)
+        return proc
+
+    async def acompanhar(
+        self,
+        proc: asyncio.subprocess.Process,
+        entrada: Optional[str],
+        execucao: ExecucaoStream,
+        log_path: Path,
+        rid: str,
+        tipo: str,
+        timeout: Optional[float] = None,
+        ao_receber: Optional[Callable[[str], None]] = None,
+        ao_receber_stderr: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """
+        Envia `entrada` ao stdin, repassa o stdout linha a linha (log + buffer + callback)
+        e drena o stderr. O processo fica registrado em PROCESSOS_ATIVOS durante a execucao.
+        """
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS[rid] = {"proc": ProcessoAsync(proc), "type": tipo}
+        try:
+            await asyncio.wait_for(
+                self._comunicar(proc, entrada, execucao, log_path, ao_receber, ao_receber_stderr),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            execucao.timeout_expirado = True
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            await proc.wait()
+        except asyncio.CancelledError:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            await proc.wait()
+            raise
+        finally:
+            with PROCESSOS_LOCK:
+                PROCESSOS_ATIVOS.pop(rid, None)
+            execucao.returncode = proc.returncode
+            execucao.finalizar()
+
+    async def _comunicar(
+        self,
+        proc: asyncio.subprocess.Process,
+        entrada: Optional[str],
+        execucao: ExecucaoStream,
+        log_path: Path,
+        ao_receber: Optional[Callable[[str], None]],
+        ao_receber_stderr: Optional[Callable[[str], None]],
+    ) -> None:
+        async def _escrever() -> None:
+            try:
+                if entrada is not None:
+                    proc.stdin.write(entrada.encode("utf-8"))
+                    await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                proc.stdin.close()
+
+        async def _drenar_stderr() -> None:
+            async for linha in _ler_linhas(proc.stderr):
+                execucao.stderr.adicionar(linha)
+                if ao_receber_stderr:
+                    ao_receber_stderr(linha)
+
+        tarefas = [asyncio.ensure_future(_escrever()), asyncio.ensure_future(_drenar_stderr())]
+        try:
+            iniciar_log(log_path)
+            async for linha in _ler_linhas(proc.stdout):
+                execucao.receber(linha, log_path)
+                if ao_receber:
+                    ao_receber(linha)
+            await asyncio.gather(*tarefas)
+            await proc.wait()
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    async def executar_processo(
+        self,
+        comando: List[str],
+        entrada: Optional[str],
+        execucao: ExecucaoStream,
+        log_path: Path,
+        rid: str,
+        tipo: str,
+        timeout: Optional[float] = None,
+        ao_receber: Optional[Callable[[str], None]] = None,
+        ao_receber_stderr: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Atalho: ocupa uma vaga do semaforo, inicia o comando e acompanha ate o fim."""
+        async with self.limite():
+            proc = await self.criar_processo(comando)
+            await self.acompanhar(
+                proc, entrada, execucao, log_path, rid, tipo, timeout, ao_receber, ao_receber_stderr
+            )
+
+
+MOTOR = MotorAsync()
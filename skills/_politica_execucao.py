@@ -0,0 +1,254 @@
+"""
+Politica de prazos, novas tentativas e disjuntor para as chamadas de CLI.
+
+Por rota (`gemini`, `codex`):
+- Prazo adaptativo: com pelo menos POLITICA_MIN_AMOSTRAS execucoes concluidas,
+  o prazo e `p95 * POLITICA_FATOR_P95` (nunca abaixo do piso da rota). Sem
+  historico, vale o prazo padrao. Execucoes que estouraram o prazo contam como
+  amostra de pelo menos o prazo, para que a estimativa possa crescer. Um prazo
+  explicito do chamador (`timeout_segundos` do Codex) vale como esta e
+  substitui o aprendido. O historico inicial vem de
+  `jarvis_logs/stream_metricas.jsonl` e e atualizado a cada chamada.
+- Novas tentativas: falhas transitorias (timeout ou erro de rede/limite de taxa
+  no stderr) ANTES de qualquer saida sao repetidas ate POLITICA_TENTATIVAS
+  vezes, com backoff exponencial e jitter total. O Codex edita arquivos e
+  reporta progresso no stderr, entao nele so se repete o que com certeza nao
+  fez nada: nunca apos timeout, e so se stdout estiver vazio e o stderr vazio
+  (processo morreu ao iniciar) ou apenas com o erro de rede/limite.
+- Disjuntor: POLITICA_DISJUNTOR_FALHAS falhas seguidas abrem o circuito por
+  POLITICA_DISJUNTOR_SEGUNDOS; nesse periodo as chamadas falham na hora
+  (CircuitoAberto). Depois, uma chamada de teste fecha ou reabre o circuito.
+
+Percentis, prazos e estado dos disjuntores aparecem no comando `stats`.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from skills._streaming import METRICAS_LOG, ExecucaoStream
+from skills._traces import percentil
+
+TENTATIVAS = max(1, int(os.getenv("POLITICA_TENTATIVAS", "3")))
+BACKOFF_BASE = float(os.getenv("POLITICA_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("POLITICA_BACKOFF_MAX", "20"))
+MIN_AMOSTRAS = int(os.getenv("POLITICA_MIN_AMOSTRAS", "10"))
+FATOR_P95 = float(os.getenv("POLITICA_FATOR_P95", "3"))
+DISJUNTOR_FALHAS = int(os.getenv("POLITICA_DISJUNTOR_FALHAS", "5"))
+DISJUNTOR_SEGUNDOS = float(os.getenv("POLITICA_DISJUNTOR_SEGUNDOS", "120"))
+_MAX_AMOSTRAS = 500
+
+# (prazo padrao sem historico, piso do prazo adaptativo), em segundos.
+PRAZOS_ROTA: Dict[str, tuple] = {
+    "gemini": (float(os.getenv("POLITICA_PRAZO_GEMINI", "300")), 30.0),
+    "codex": (float(os.getenv("POLITICA_PRAZO_CODEX", "900")), 60.0),
+}
+_ROTA_HISTORICO = {"codex_paralelo": "codex"}
+# Rotas com efeitos colaterais (escrevem no workspace): repeticao so sem nenhum sinal de progresso.
+_ROTAS_COM_EFEITOS = {"codex", "codex_paralelo"}
+
+_TRANSITORIO = re.compile(
+    r"(?i)\b(429|500|502|503|504)\b|rate.?limit|too many requests|overloaded|unavailable|"
+    r"temporar|timed? ?out|ECONNRESET|ECONNREFUSED|ETIMEDOUT|EAI_AGAIN|ENOTFOUND|socket hang up|network"
+)
+
+
+class CircuitoAberto(RuntimeError):
+    """O disjuntor da rota esta aberto; a chamada nem e iniciada."""
+
+
+class Disjuntor:
+    """Circuit breaker: fechado -> aberto (apos N falhas seguidas) -> meio-aberto (teste)."""
+
+    def __init__(self, max_falhas: int = DISJUNTOR_FALHAS, espera: float = DISJUNTOR_SEGUNDOS):
+        self.max_falhas = max(1, max_falhas)
+        self.espera = espera
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+        self.em_teste = False
+        self.aberturas = 0
+
+    @property
+    def estado(self) -> str:
+        if self.falhas_seguidas < self.max_falhas:
+            return "fechado"
+        return "aberto" if time.monotonic() < self.aberto_ate else "meio-aberto"
+
+    def permitir(self) -> bool:
+        estado = self.estado
+        if estado == "fechado":
+            return True
+        if estado == "meio-aberto" and not self.em_teste:
+            self.em_teste = True
+            return True
+        return False
+
+    def sucesso(self) -> None:
+        self.falhas_seguidas = 0
+        self.em_teste = False
+
+    def falha(self) -> None:
+        self.falhas_seguidas += 1
+        self.em_teste = False
+        if self.falhas_seguidas >= self.max_falhas:
+            if self.falhas_seguidas == self.max_falhas or time.monotonic() >= self.aberto_ate:
+                self.aberturas += 1
+            self.aberto_ate = time.monotonic() + self.espera
+
+
+class PoliticaExecucao:
+    """Latencias por rota, prazos derivados do p95, retries com backoff e disjuntores."""
+
+    def __init__(self, metricas_log=METRICAS_LOG):
+        self.metricas_log = metricas_log
+        self._latencias: Dict[str, Deque[float]] = {}
+        self._disjuntores: Dict[str, Disjuntor] = {}
+        self._carregado = False
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    # --- HISTORICO ---
+    def _carregar(self) -> None:
+        with self._lock:
+            if self._carregado:
+                return
+            self._carregado = True
+            try:
+                with open(self.metricas_log, encoding="utf-8") as f:
+                    linhas = f.readlines()[-20 * _MAX_AMOSTRAS:]
+            except OSError:
+                return
+            for linha in linhas:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if registro.get("cache") or (registro.get("exit") != 0 and not registro.get("timeout")):
+                    continue
+                rota = _ROTA_HISTORICO.get(registro.get("rota"), registro.get("rota"))
+                if rota in PRAZOS_ROTA and registro.get("total"):
+                    self._amostras(rota).append(float(registro["total"]))
+
+    def _amostras(self, rota: str) -> Deque[float]:
+        return self._latencias.setdefault(rota, deque(maxlen=_MAX_AMOSTRAS))
+
+    def _contadores(self, rota: str) -> Dict[str, int]:
+        return self.stats.setdefault(
+            rota, {"chamadas": 0, "falhas": 0, "timeouts": 0, "repeticoes": 0, "rejeitadas": 0}
+        )
+
+    def disjuntor(self, rota: str) -> Disjuntor:
+        return self._disjuntores.setdefault(rota, Disjuntor())
+
+    def percentis(self, rota: str) -> Dict[str, float]:
+        self._carregar()
+        valores = list(self._amostras(rota))
+        return {f"p{p}": percentil(valores, p) for p in (50, 90, 95, 99)}
+
+    def prazo(self, rota: str) -> float:
+        """Prazo aprendido em segundos da proxima tentativa (ver docstring do modulo)."""
+        self._carregar()
+        padrao, piso = PRAZOS_ROTA.get(rota, (300.0, 30.0))
+        amostras = list(self._amostras(rota))
+        if len(amostras) >= MIN_AMOSTRAS:
+            return max(piso, percentil(amostras, 95) * FATOR_P95)
+        return padrao
+
+    # --- EXECUCAO ---
+    @staticmethod
+    def transitoria(execucao: ExecucaoStream, rota: str = "gemini") -> bool:
+        """Falha que vale repetir: sem nenhuma saida ainda e com timeout ou erro de rede/limite no stderr."""
+        if execucao.ttfb is not None:
+            return False
+        stderr = execucao.stderr.texto()
+        if rota in _ROTAS_COM_EFEITOS:
+            # Timeout ou qualquer linha de progresso: a execucao pode ter editado arquivos.
+            if execucao.timeout_expirado:
+                return False
+            linhas = [linha for linha in stderr.splitlines() if linha.strip()]
+            return all(_TRANSITORIO.search(linha) for linha in linhas)
+        return execucao.timeout_expirado or bool(_TRANSITORIO.search(stderr))
+
+    async def executar(
+        self,
+        rota: str,
+        chamada: Callable[[float], Awaitable[Any]],
+        execucao: ExecucaoStream,
+        prazo_fixo: Optional[float] = None,
+    ) -> Any:
+        """
+        Chama `chamada(prazo)` sob a politica da rota; `prazo_fixo`, se dado, substitui
+        o prazo aprendido. O sucesso e lido de `execucao` (returncode 0 e sem timeout);
+        entre tentativas a execucao e reiniciada.
+        Levanta CircuitoAberto se o disjuntor nao permitir a chamada.
+        """
+        contadores = self._contadores(rota)
+        disjuntor = self.disjuntor(rota)
+        tentativa = 0
+        while True:
+            if not disjuntor.permitir():
+                contadores["rejeitadas"] += 1
+                restante = max(0.0, disjuntor.aberto_ate - time.monotonic())
+                raise CircuitoAberto(
+                    f"circuito '{rota}' aberto apos {disjuntor.falhas_seguidas} falhas seguidas; "
+                    f"nova tentativa liberada em {restante:.0f}s"
+                )
+            tentativa += 1
+            contadores["chamadas"] += 1
+            prazo = prazo_fixo or self.prazo(rota)
+            inicio = time.perf_counter()
+            try:
+                resultado = await chamada(prazo)
+            except asyncio.CancelledError:
+                disjuntor.em_teste = False
+                raise
+            except Exception:
+                disjuntor.falha()
+                contadores["falhas"] += 1
+                raise
+            if execucao.returncode == 0 and not execucao.timeout_expirado:
+                disjuntor.sucesso()
+                self._amostras(rota).append(time.perf_counter() - inicio)
+                return resultado
+            if execucao.timeout_expirado:
+                # O prazo foi curto demais: a amostra puxa o p95 para cima.
+                self._amostras(rota).append(max(prazo, time.perf_counter() - inicio))
+            disjuntor.falha()
+            contadores["falhas"] += 1
+            contadores["timeouts"] += int(execucao.timeout_expirado)
+            if tentativa >= TENTATIVAS or not self.transitoria(execucao, rota):
+                return resultado
+            espera = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (tentativa - 1)))
+            motivo = f"timeout de {prazo:.0f}s" if execucao.timeout_expirado else f"exit {execucao.returncode}"
+            print(f"[POLITICA] {rota}: falha transitoria ({motivo}); tentativa {tentativa + 1}/{TENTATIVAS} em {espera:.1f}s")
+            contadores["repeticoes"] += 1
+            await asyncio.sleep(espera)
+            execucao.reiniciar()
+
+    def resumo(self) -> str:
+        self._carregar()
+        linhas = ["Politica de execucao (latencias concluidas ou estouradas, em segundos):"]
+        for rota in sorted(set(PRAZOS_ROTA) | set(self.stats)):
+            amostras = self._amostras(rota)
+            p = self.percentis(rota)
+            c = self._contadores(rota)
+            d = self.disjuntor(rota)
+            linhas.append(
+                f"  {rota}: {len(amostras)} amostras | p50 {p['p50']:.1f} p90 {p['p90']:.1f} "
+                f"p95 {p['p95']:.1f} p99 {p['p99']:.1f} | prazo {self.prazo(rota):.0f}s"
+                f"{'' if len(amostras) >= MIN_AMOSTRAS else ' (padrao, historico insuficiente)'}"
+            )
+            linhas.append(
+                f"    {c['chamadas']} chamadas, {c['falhas']} falhas ({c['timeouts']} timeouts), "
+                f"{c['repeticoes']} repeticoes, {c['rejeitadas']} rejeitadas | disjuntor {d.estado} "
+                f"({d.falhas_seguidas}/{d.max_falhas} falhas seguidas, aberto {d.aberturas}x)"
+            )
+        return "\n".join(linhas)
+
+
+POLITICA = PoliticaExecucao()
@@ -0,0 +1,356 @@
+"""
+Pool de workers do Gemini CLI mantidos quentes entre turnos.
+
+Modos (GEMINI_POOL_MODE):
+- prespawn (padrao): processos `gemini` sao iniciados antecipadamente e ficam
+  bloqueados lendo stdin. Cada worker atende UMA requisicao (o CLI le o prompt
+  ate EOF) e e reposto em background, escondendo o startup do Node/autenticacao.
+- persistent: cada worker atende varias requisicoes com um protocolo de
+  marcador de fim (MARCADOR_FIM). Exige um CLI/wrapper que suporte o protocolo
+  (GEMINI_POOL_ARGS). Se o handshake falhar, o pool se desativa e o cerebro
+  volta ao spawn por chamada.
+
+GEMINI_POOL_SIZE=0 (padrao) desativa o pool.
+"""
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+from skills.util_comuns import PROCESSOS_ATIVOS, PROCESSOS_LOCK, comando_gemini
+
+POOL_TAMANHO = int(os.getenv("GEMINI_POOL_SIZE", "0"))
+POOL_MODO = os.getenv("GEMINI_POOL_MODE", "prespawn").lower()
+POOL_MODO = POOL_MODO if POOL_MODO in {"prespawn", "persistent"} else "prespawn"
+POOL_ARGS = os.getenv("GEMINI_POOL_ARGS", "")
+POOL_MAX_REQUISICOES = int(os.getenv("GEMINI_POOL_MAX_REQUESTS", "50"))
+POOL_OCIOSO_SEGUNDOS = float(os.getenv("GEMINI_POOL_IDLE_SECONDS", "300"))
+POOL_HANDSHAKE_TIMEOUT = float(os.getenv("GEMINI_POOL_HANDSHAKE_TIMEOUT", "30"))
+
+# Protocolo persistente: o prompt termina com uma linha MARCADOR_FIM e a resposta
+# termina com uma linha "MARCADOR_FIM <exit_code>".
+MARCADOR_FIM = "<<<JARVIS_EOR>>>"
+
+_FIM_STREAM = object()
+
+
+class WorkerIndisponivel(Exception):
+    """Worker morto ou pool desativado; o chamador deve usar spawn por chamada."""
+
+
+class ErroRespostaGemini(Exception):
+    """O Gemini CLI respondeu com erro (exit code diferente de zero)."""
+
+
+class _WorkerGemini:
+    def __init__(self, persistente: bool):
+        self.id = f"gemini-pool-{uuid.uuid4().hex[:8]}"
+        self.persistente = persistente
+        self.requisicoes = 0
+        self.ultimo_uso = time.monotonic()
+
+        comando = comando_gemini()
+        if persistente and POOL_ARGS.strip():
+            comando += shlex.split(POOL_ARGS, posix=os.name != "nt")
+
+        self.proc = subprocess.Popen(
+            comando,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            env=os.environ.copy(),
+        )
+        self._stdout: "queue.Queue[object]" = queue.Queue()
+        self._stderr: Deque[str] = deque(maxlen=200)
+        threading.Thread(target=self._drenar_stdout, daemon=True).start()
+        threading.Thread(target=self._drenar_stderr, daemon=True).start()
+
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS[self.id] = {"proc": self.proc, "type": "brain_pool"}
+
+    def _drenar_stdout(self) -> None:
+        try:
+            for linha in self.proc.stdout:
+                self._stdout.put(linha)
+        except Exception:
+            pass
+        finally:
+            self._stdout.put(_FIM_STREAM)
+
+    def _drenar_stderr(self) -> None:
+        try:
+            for linha in self.proc.stderr:
+                self._stderr.append(linha)
+        except Exception:
+            pass
+
+    def vivo(self) -> bool:
+        return self.proc.poll() is None
+
+    def stderr(self) -> str:
+        return "".join(self._stderr).strip()
+
+    def executar(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """Envia o prompt ao worker e devolve um iterador com as linhas de stdout."""
+        self.requisicoes += 1
+        self.ultimo_uso = time.monotonic()
+        try:
+            if self.persistente:
+                self.proc.stdin.write(f"{prompt}\n{MARCADOR_FIM}\n")
+                self.proc.stdin.flush()
+            else:
+                self.proc.stdin.write(prompt)
+                self.proc.stdin.close()
+        except (OSError, ValueError) as e:
+            raise WorkerIndisponivel(f"worker {self.id} nao aceitou o prompt: {e}")
+        return self._ler_resposta(timeout)
+
+    def _ler_resposta(self, timeout: Optional[float]) -> Iterator[str]:
+        limite = time.monotonic() + timeout if timeout else None
+        while True:
+            espera = None if limite is None else max(0.0, limite - time.monotonic())
+            try:
+                linha = self._stdout.get(timeout=espera)
+            except queue.Empty:
+                self.encerrar()
+                raise WorkerIndisponivel(f"timeout aguardando worker {self.id}")
+            if linha is _FIM_STREAM:
+                break
+            if self.persistente and linha.startswith(MARCADOR_FIM):
+                self.ultimo_uso = time.monotonic()
+                codigo = linha[len(MARCADOR_FIM):].strip()
+                if codigo and codigo != "0":
+                    raise ErroRespostaGemini(self.stderr() or f"Exit {codigo}")
+                return
+            yield linha.rstrip("\n")
+
+        codigo = self.proc.wait()
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS.pop(self.id, None)
+        if self.persistente:
+            raise WorkerIndisponivel(f"worker {self.id} encerrou no meio da resposta (exit {codigo})")
+        if codigo != 0:
+            raise ErroRespostaGemini(self.stderr() or f"Exit {codigo}")
+
+    def encerrar(self) -> None:
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS.pop(self.id, None)
+        if self.proc.poll() is None:
+            try:
+                self.proc.terminate()
+                self.proc.wait(timeout=2)
+            except Exception:
+                self.proc.kill()
+
+
+class PoolGemini:
+    """Mantem ate `tamanho` workers do Gemini CLI prontos para uso."""
+
+    def __init__(
+        self,
+        tamanho: int = POOL_TAMANHO,
+        modo: str = POOL_MODO,
+        max_requisicoes: int = POOL_MAX_REQUISICOES,
+        ocioso_segundos: float = POOL_OCIOSO_SEGUNDOS,
+    ):
+        self.tamanho = max(0, tamanho)
+        self.persistente = modo == "persistent"
+        self.max_requisicoes = max(1, max_requisicoes) if self.persistente else 1
+        self.ocioso_segundos = ocioso_segundos
+        self.suportado = True
+        self._livres: Deque[_WorkerGemini] = deque()
+        self._iniciando = 0
+        self._em_uso = 0
+        self._lock = threading.Lock()
+        self._ceifador: Optional[threading.Thread] = None
+        self.stats: Dict[str, int] = {
+            "quentes": 0,
+            "frios": 0,
+            "reciclados": 0,
+            "ceifados": 0,
+            "mortos": 0,
+        }
+
+    def ativo(self) -> bool:
+        return self.tamanho > 0 and self.suportado
+
+    def aquecer(self) -> None:
+        """Repoe os workers em background ate o tamanho configurado."""
+        if not self.ativo():
+            return
+        self._iniciar_ceifador()
+        threading.Thread(target=self._repor, daemon=True, name="gemini-pool-repor").start()
+
+    def _criar_worker(self) -> Optional[_WorkerGemini]:
+        try:
+            worker = _WorkerGemini(self.persistente)
+        except (OSError, ValueError) as e:
+            print(f"[BRAIN] Pool Gemini: falha ao iniciar worker ({e}). Usando spawn por chamada.")
+            self.suportado = False
+            return None
+        if self.persistente and not self._handshake(worker):
+            worker.encerrar()
+            print("[BRAIN] Gemini CLI sem modo persistente (handshake falhou). Usando spawn por chamada.")
+            self.suportado = False
+            return None
+        return worker
+
+    def _handshake(self, worker: _WorkerGemini) -> bool:
+        try:
+            for _ in worker.executar("ping", timeout=POOL_HANDSHAKE_TIMEOUT):
+                pass
+        except (WorkerIndisponivel, ErroRespostaGemini):
+            return False
+        worker.requisicoes = 0
+        return True
+
+    def _repor(self) -> None:
+        while True:
+            with self._lock:
+                ocupados = len(self._livres) + self._iniciando + self._em_uso
+                if not self.ativo() or ocupados >= self.tamanho:
+                    return
+                self._iniciando += 1
+            worker = self._criar_worker()
+            with self._lock:
+                self._iniciando -= 1
+                if worker is None:
+                    return
+                self._livres.append(worker)
+
+    def adquirir(self) -> Optional[_WorkerGemini]:
+        """Retira um worker saudavel do pool (ou inicia um a frio se nao houver)."""
+        worker = None
+        mortos = []
+        with self._lock:
+            while self._livres:
+                candidato = self._livres.popleft()
+                if candidato.vivo():
+                    worker = candidato
+                    self.stats["quentes"] += 1
+                    break
+                self.stats["mortos"] += 1
+                mortos.append(candidato)
+            if self.persistente:
+                self._em_uso += 1
+        for morto in mortos:
+            morto.encerrar()
+
+        if worker is None:
+            worker = self._criar_worker()
+            if worker is None:
+                with self._lock:
+                    if self.persistente:
+                        self._em_uso -= 1
+                return None
+            self.stats["frios"] += 1
+
+        self.aquecer()
+        return worker
+
+    def devolver(self, worker: _WorkerGemini, saudavel: bool = True) -> None:
+        """Devolve o worker ao pool ou o recicla se atingiu o limite de requisicoes."""
+        with self._lock:
+            if self.persistente:
+                self._em_uso -= 1
+            reutilizar = (
+                self.persistente
+                and saudavel
+                and worker.vivo()
+                and worker.requisicoes < self.max_requisicoes
+                and len(self._livres) < self.tamanho
+            )
+            if reutilizar:
+                self._livres.append(worker)
+                return
+            if self.persistente and saudavel and worker.requisicoes >= self.max_requisicoes:
+                self.stats["reciclados"] += 1
+        worker.encerrar()
+        self.aquecer()
+
+    def executar(self, prompt: str, rid: Optional[str] = None) -> Iterator[str]:
+        """
+        Executa o prompt em um worker do pool, devolvendo as linhas de stdout.
+        Com `rid`, o worker fica registrado tambem sob essa chave em PROCESSOS_ATIVOS
+        durante a requisicao (permite cancelar pelo rid).
+        """
+        worker = self.adquirir()
+        if worker is None:
+            raise WorkerIndisponivel("pool Gemini indisponivel")
+        if rid:
+            with PROCESSOS_LOCK:
+                PROCESSOS_ATIVOS[rid] = {"proc": worker.proc, "type": "brain_pool"}
+        saudavel = False
+        try:
+            yield from worker.executar(prompt)
+            saudavel = True
+        except ErroRespostaGemini:
+            saudavel = True
+            raise
+        finally:
+            if rid:
+                with PROCESSOS_LOCK:
+                    PROCESSOS_ATIVOS.pop(rid, None)
+            self.devolver(worker, saudavel)
+
+    def _iniciar_ceifador(self) -> None:
+        with self._lock:
+            if self._ceifador and self._ceifador.is_alive():
+                return
+            self._ceifador = threading.Thread(
+                target=self._ceifar_loop, daemon=True, name="gemini-pool-ceifador"
+            )
+            self._ceifador.start()
+
+    def _ceifar_loop(self) -> None:
+        intervalo = max(1.0, min(30.0, self.ocioso_segundos / 2))
+        while self.ativo():
+            time.sleep(intervalo)
+            self.ceifar()
+
+    def ceifar(self) -> int:
+        """Encerra workers mortos ou ociosos alem de `ocioso_segundos`."""
+        agora = time.monotonic()
+        removidos = []
+        with self._lock:
+            for worker in list(self._livres):
+                if not worker.vivo():
+                    self.stats["mortos"] += 1
+                elif agora - worker.ultimo_uso > self.ocioso_segundos:
+                    self.stats["ceifados"] += 1
+                else:
+                    continue
+                self._livres.remove(worker)
+                removidos.append(worker)
+        for worker in removidos:
+            worker.encerrar()
+        return len(removidos)
+
+    def encerrar_todos(self) -> None:
+        with self._lock:
+            livres = list(self._livres)
+            self._livres.clear()
+        for worker in livres:
+            worker.encerrar()
+
+    def resumo(self) -> str:
+        if not self.tamanho:
+            return "Pool Gemini desativado (GEMINI_POOL_SIZE=0)."
+        modo = "persistent" if self.persistente else "prespawn"
+        estado = "ativo" if self.suportado else "fallback spawn-por-chamada"
+        with self._lock:
+            livres = len(self._livres)
+        stats = ", ".join(f"{k}={v}" for k, v in self.stats.items())
+        return f"Pool Gemini ({modo}, {estado}): {livres}/{self.tamanho} livres | {stats}"
+
+
+POOL_GEMINI = PoolGemini()
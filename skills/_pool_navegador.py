@@ -0,0 +1,168 @@
+"""
+Pool de navegador headless para `navegar_web` / `navegar_varias`.
+
+Em vez de um `AsyncWebCrawler` (e um Chromium novo) por URL, um unico crawler
+fica vivo no loop do motor async (skills/_motor_async.py, thread dedicada):
+- Abas reutilizadas: NAVEGADOR_MAX_ABAS sessoes (`session_id` do crawl4ai, uma
+  pagina/contexto cada) ficam numa fila; cada navegacao pega uma sessao livre
+  e a devolve ao terminar. O tamanho da fila e o limite de concorrencia.
+- Desligamento por ociosidade: sem navegacoes por NAVEGADOR_OCIOSO_SEGUNDOS o
+  browser e fechado; a proxima chamada sobe outro.
+- Falhas: uma pagina que estoura NAVEGADOR_TIMEOUT perde so a sua aba; outra
+  excecao do crawler descarta o browser (quando as abas em uso terminarem) e a
+  proxima chamada sobe outro. Em ambos os casos a URL cai no fallback HTTP.
+`NAVEGADOR_POOL=0` volta ao comportamento antigo (browser por chamada).
+"""
+import asyncio
+import atexit
+import contextlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+from crawl4ai import AsyncWebCrawler
+
+from skills._motor_async import MOTOR
+
+try:
+    from crawl4ai import CrawlerRunConfig
+except ImportError:  # crawl4ai < 0.4: opcoes passadas como kwargs de arun
+    CrawlerRunConfig = None
+
+ATIVO = os.getenv("NAVEGADOR_POOL", "1").lower() not in {"0", "false", "no"}
+MAX_ABAS = max(1, int(os.getenv("NAVEGADOR_MAX_ABAS", "4")))
+OCIOSO_SEGUNDOS = float(os.getenv("NAVEGADOR_OCIOSO_SEGUNDOS", "120"))
+TIMEOUT_PAGINA = float(os.getenv("NAVEGADOR_TIMEOUT", "60"))
+
+
+class PoolNavegador:
+    """Crawler compartilhado + sessoes reutilizaveis (ver docstring do modulo). Usar dentro do loop do motor."""
+
+    def __init__(self, max_abas: int = MAX_ABAS, ocioso_segundos: float = OCIOSO_SEGUNDOS, ativo: bool = ATIVO):
+        self.max_abas = max(1, max_abas)
+        self.ocioso_segundos = ocioso_segundos
+        self.ativo = ativo
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._sessoes: Optional[asyncio.Queue] = None
+        self._iniciando: Optional[asyncio.Lock] = None
+        self._em_uso = 0
+        self._descartar = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._usadas: set = set()
+        self.stats: Dict[str, int] = {
+            "paginas": 0, "reusos": 0, "inicializacoes": 0, "desligamentos_ociosos": 0, "falhas": 0,
+        }
+
+    # --- CICLO DE VIDA ---
+    async def _garantir_crawler(self) -> AsyncWebCrawler:
+        if self._iniciando is None:
+            self._iniciando = asyncio.Lock()
+            self._sessoes = asyncio.Queue()
+            for i in range(self.max_abas):
+                self._sessoes.put_nowait(f"jarvis-aba-{i}")
+        async with self._iniciando:
+            if self._crawler is None:
+                inicio = time.perf_counter()
+                crawler = AsyncWebCrawler(verbose=False)
+                await crawler.__aenter__()
+                self._crawler = crawler
+                self._usadas.clear()
+                self.stats["inicializacoes"] += 1
+                print(f"[NAVEGADOR] browser iniciado em {time.perf_counter() - inicio:.1f}s ({self.max_abas} abas)")
+        return self._crawler
+
+    async def fechar(self) -> None:
+        """Fecha o browser (as sessoes morrem junto)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        crawler, self._crawler = self._crawler, None
+        if crawler is not None:
+            with contextlib.suppress(Exception):
+                await crawler.__aexit__(None, None, None)
+
+    def _agendar_desligamento(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.ocioso_segundos > 0 and self._crawler is not None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.ocioso_segundos, self._desligar_se_ocioso)
+
+    def _desligar_se_ocioso(self) -> None:
+        self._timer = None
+        if self._em_uso == 0 and self._crawler is not None:
+            asyncio.ensure_future(self._fechar_se_ocioso())
+
+    async def _fechar_se_ocioso(self) -> None:
+        # Re-checa na tarefa: uma navegacao pode ter comecado depois do timer disparar.
+        if self._em_uso == 0 and self._crawler is not None:
+            self.stats["desligamentos_ociosos"] += 1
+            await self.fechar()
+
+    # --- NAVEGACAO ---
+    async def _arun(self, crawler: AsyncWebCrawler, url: str, sessao: str) -> Any:
+        if CrawlerRunConfig is not None:
+            return await crawler.arun(url=url, config=CrawlerRunConfig(session_id=sessao))
+        return await crawler.arun(url=url, session_id=sessao)
+
+    async def navegar(self, url: str) -> Any:
+        """Resultado do crawl4ai (`success`, `markdown`, `html`, `error_message`) para `url`."""
+        if not self.ativo:
+            async with AsyncWebCrawler(verbose=False) as crawler:
+                return await crawler.arun(url=url)
+        # Em uso desde antes de pegar o crawler: o desligamento por ociosidade nao fecha o browser entregue.
+        self._em_uso += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            crawler = await self._garantir_crawler()
+            sessao = await self._sessoes.get()
+            try:
+                self.stats["reusos"] += sessao in self._usadas
+                self._usadas.add(sessao)
+                resultado = await asyncio.wait_for(self._arun(crawler, url, sessao), TIMEOUT_PAGINA)
+                self.stats["paginas"] += 1
+                return resultado
+            except asyncio.TimeoutError:
+                self.stats["falhas"] += 1
+                # So a aba travada e descartada; o crawl4ai recria a sessao no proximo uso.
+                with contextlib.suppress(Exception):
+                    await crawler.crawler_strategy.kill_session(sessao)
+                self._usadas.discard(sessao)
+                raise
+            except Exception:
+                self.stats["falhas"] += 1
+                # Browser possivelmente quebrado: descartado quando as outras abas terminarem.
+                self._descartar = self._crawler is crawler
+                raise
+            finally:
+                self._sessoes.put_nowait(sessao)
+        finally:
+            self._em_uso -= 1
+            if self._em_uso == 0:
+                if self._descartar:
+                    self._descartar = False
+                    await self.fechar()
+                self._agendar_desligamento()
+
+    def resumo(self) -> str:
+        s = self.stats
+        estado = "ativo" if self._crawler is not None else "parado"
+        return (
+            f"Pool de navegador ({estado}, {self.max_abas} abas, ocioso {self.ocioso_segundos:.0f}s): "
+            f"{s['paginas']} paginas, {s['reusos']} com aba reutilizada, {s['inicializacoes']} inicializacoes, "
+            f"{s['desligamentos_ociosos']} desligamentos por ociosidade, {s['falhas']} falhas"
+        )
+
+
+POOL_NAVEGADOR = PoolNavegador()
+
+
+def _encerrar() -> None:
+    if POOL_NAVEGADOR._crawler is not None:
+        with contextlib.suppress(Exception):
+            MOTOR.agendar(POOL_NAVEGADOR.fechar()).result(timeout=10)
+
+
+atexit.register(_encerrar)
@@ -0,0 +1,262 @@
+"""
+Recall automatico (sem embeddings) de entradas de memoria/ para os prompts.
+
+Cada entrada do indice BM25 (skills/_indice_memoria.py) vira um vetor hashed de
+dimensao fixa: palavras + radical aproximado (prefixo de 5 letras, pega flexoes
+como "configurar"/"configuracao"), peso log-tf, normalizado. A consulta usa o mesmo
+hashing ponderado por IDF. Com NumPy os vetores ficam numa matriz float16 crua
+memory-mapped em `jarvis_logs/recall_vetores.f16`; sem NumPy, em dicionarios
+esparsos (Python puro). Entradas novas sao anexadas ao final do arquivo; ele so
+e regravado (reaproveitando as linhas ja calculadas) quando entradas mudam ou
+somem.
+
+O bloco injetado respeita RECALL_MAX_BYTES; latencia e bytes adicionados por
+turno ficam em `stats`. Variaveis: RECALL_K, RECALL_MAX_BYTES, RECALL_MIN_SCORE,
+RECALL_DIM.
+"""
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+from skills._indice_memoria import IndiceMemoria, tokenizar
+
+# NumPy e opcional e importado so no primeiro recall (custa ~90ms no startup).
+np = None
+
+
+def _tem_numpy() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np is not False
+
+RECALL_K = int(os.getenv("RECALL_K", "3"))
+RECALL_MAX_BYTES = int(os.getenv("RECALL_MAX_BYTES", "1200"))
+RECALL_MIN_SCORE = float(os.getenv("RECALL_MIN_SCORE", "0.12"))
+RECALL_DIM = int(os.getenv("RECALL_DIM", "1024"))
+VETORES_PATH = LOG_DIR / "recall_vetores.f16"
+META_PATH = LOG_DIR / "recall_meta.json"
+_TAMANHO_RADICAL = 5
+_PESO_RADICAL = 0.7
+
+Chave = Tuple[str, int, int]
+
+
+def vetorizar(tf: Dict[str, int], dim: int, idf: Optional[Dict[str, float]] = None) -> Dict[int, float]:
+    """Vetor esparso normalizado {indice: valor} com feature hashing assinado."""
+    vetor: Dict[int, float] = {}
+
+    def _somar(feature: str, valor: float) -> None:
+        h = zlib.crc32(feature.encode("utf-8"))
+        indice = h % dim
+        vetor[indice] = vetor.get(indice, 0.0) + (valor if h & 0x80000000 else -valor)
+
+    for termo, n in tf.items():
+        peso = (1.0 + math.log(n)) * (idf.get(termo, 1.0) if idf else 1.0)
+        _somar(termo, peso)
+        if len(termo) > _TAMANHO_RADICAL:
+            _somar("r:" + termo[:_TAMANHO_RADICAL], _PESO_RADICAL * peso)
+
+    norma = math.sqrt(sum(v * v for v in vetor.values()))
+    if norma:
+        vetor = {i: v / norma for i, v in vetor.items()}
+    return vetor
+
+
+def _aparar(texto: str, max_bytes: int) -> str:
+    """Corta em fronteira de palavra para caber em `max_bytes` (UTF-8)."""
+    if len(texto.encode("utf-8")) <= max_bytes:
+        return texto
+    corte = texto.encode("utf-8")[: max(0, max_bytes - 6)].decode("utf-8", "ignore")
+    espaco = corte.rfind(" ")
+    if espaco > len(corte) // 2:
+        corte = corte[:espaco]
+    return corte.rstrip(" ,;:") + " [...]"
+
+
+class RecallMemoria:
+    """Vetores hashed das entradas de memoria + selecao top-k com orcamento de bytes."""
+
+    def __init__(self, indice: IndiceMemoria, dim: int = RECALL_DIM):
+        self.indice = indice
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._versao_vista = -1
+        self._chaves: List[Chave] = []
+        self._posicoes: Dict[Chave, int] = {}
+        self._matriz = None  # np.memmap (N x dim, float16) com NumPy
+        self._esparsos: List[Dict[int, float]] = []  # fallback sem NumPy
+        self._carregado = False
+        self.stats: Dict[str, float] = {
+            "consultas": 0,
+            "injecoes": 0,
+            "ms_total": 0.0,
+            "ms_max": 0.0,
+            "ms_ultimo": 0.0,
+            "bytes_total": 0,
+            "bytes_max": 0,
+            "bytes_ultimo": 0,
+        }
+
+    # --- VETORES ---
+    def _carregar(self) -> None:
+        if self._carregado:
+            return
+        self._carregado = True
+        if not _tem_numpy() or not VETORES_PATH.exists() or not META_PATH.exists():
+            return
+        try:
+            meta = json.loads(META_PATH.read_text(encoding="utf-8"))
+            chaves = [tuple(c) for c in meta["chaves"]]
+            if meta.get("dim") != self.dim or VETORES_PATH.stat().st_size != len(chaves) * self.dim * 2:
+                return
+            self._chaves = chaves
+            self._posicoes = {c: i for i, c in enumerate(chaves)}
+            self._mapear()
+        except (OSError, ValueError, KeyError):
+            self._matriz, self._chaves, self._posicoes = None, [], {}
+
+    def _sincronizar(self) -> None:
+        self._carregar()
+        entradas = self.indice.entradas()
+        if self.indice.versao == self._versao_vista:
+            return
+        chaves = [(nome, e[0], e[1]) for nome, e in entradas]
+        if chaves != self._chaves:
+            n = len(self._chaves)
+            if _tem_numpy() and n and chaves[:n] == self._chaves:
+                self._anexar_linhas(chaves, entradas[n:])
+            elif _tem_numpy():
+                self._regravar_matriz(chaves, entradas)
+            else:
+                antigos = dict(zip(self._chaves, self._esparsos))
+                self._esparsos = [
+                    antigos.get(c) or vetorizar(e[3], self.dim) for c, (_, e) in zip(chaves, entradas)
+                ]
+            self._chaves = chaves
+            self._posicoes = {c: i for i, c in enumerate(chaves)}
+        self._versao_vista = self.indice.versao
+
+    def _linha_densa(self, tf: Dict[str, int]) -> "np.ndarray":
+        linha = np.zeros(self.dim, dtype=np.float16)
+        esparso = vetorizar(tf, self.dim)
+        if esparso:
+            linha[list(esparso)] = list(esparso.values())
+        return linha
+
+    def _mapear(self) -> None:
+        linhas = len(self._chaves)
+        self._matriz = (
+            np.memmap(VETORES_PATH, dtype=np.float16, mode="r", shape=(linhas, self.dim)) if linhas else None
+        )
+
+    def _gravar_meta(self, chaves: List[Chave]) -> None:
+        META_PATH.write_text(json.dumps({"dim": self.dim, "chaves": chaves}), encoding="utf-8")
+
+    def _anexar_linhas(self, chaves: List[Chave], novas: list) -> None:
+        with open(VETORES_PATH, "ab") as f:
+            for _, entrada in novas:
+                f.write(self._linha_densa(entrada[3]).tobytes())
+        self._gravar_meta(chaves)
+        self._chaves = chaves
+        self._mapear()
+
+    def _regravar_matriz(self, chaves: List[Chave], entradas: list) -> None:
+        tmp = VETORES_PATH.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            for chave, (_, entrada) in zip(chaves, entradas):
+                antiga = self._posicoes.get(chave)
+                if antiga is not None and self._matriz is not None:
+                    f.write(np.asarray(self._matriz[antiga]).tobytes())
+                else:
+                    f.write(self._linha_densa(entrada[3]).tobytes())
+        os.replace(tmp, VETORES_PATH)
+        self._gravar_meta(chaves)
+        self._chaves = chaves
+        self._mapear()
+
+    def _pontuar(self, consulta: Dict[int, float], k: int) -> List[Tuple[float, int]]:
+        if not consulta or not self._chaves:
+            return []
+        if _tem_numpy():
+            colunas = list(consulta)
+            valores = np.fromiter(consulta.values(), dtype=np.float32, count=len(colunas))
+            scores = self._matriz[:, colunas].astype(np.float32) @ valores
+            k = min(k, len(scores))
+            melhores = np.argpartition(-scores, k - 1)[:k]
+            return sorted(((float(scores[i]), int(i)) for i in melhores), reverse=True)
+        scores = [
+            (sum(v * doc.get(i, 0.0) for i, v in consulta.items()), linha)
+            for linha, doc in enumerate(self._esparsos)
+        ]
+        return sorted(scores, reverse=True)[:k]
+
+    # --- API ---
+    def buscar(self, texto: str, k: int = RECALL_K) -> List[Tuple[float, Chave]]:
+        """Top-k (score, (arquivo, inicio, fim)) por similaridade de cosseno."""
+        tf = Counter(tokenizar(texto))
+        with self._lock:
+            self._sincronizar()
+            total, df = self.indice.frequencias(list(tf))
+            idf = {t: math.log(1 + (total + 1) / (d + 1)) for t, d in df.items()}
+            consulta = vetorizar(tf, self.dim, idf)
+            return [(score, self._chaves[linha]) for score, linha in self._pontuar(consulta, k)]
+
+    def recordar(self, texto: str, k: int = RECALL_K, max_bytes: int = RECALL_MAX_BYTES) -> str:
+        """Bloco "MEMORIA RELEVANTE" para o prompt (vazio se nada passar do score minimo)."""
+        inicio = time.perf_counter()
+        bloco = ""
+        try:
+            linhas = []
+            restante = max_bytes - len("MEMORIA RELEVANTE (recall automatico):\n")
+            for score, (nome, ini, fim) in self.buscar(texto, k):
+                if score < RECALL_MIN_SCORE or restante <= 40:
+                    break
+                corpo = self.indice.ler(nome, (ini, fim, "", {}))
+                cabecalho, _, resto = corpo.partition("\n")
+                titulo = cabecalho[4:].strip() if cabecalho.startswith("### ") else ""
+                texto_entrada = " ".join((resto if titulo else corpo).split())
+                linha = _aparar(f"- [{nome[:-3]}{' | ' + titulo if titulo else ''}] {texto_entrada}", restante - 1)
+                linhas.append(linha)
+                restante -= len(linha.encode("utf-8")) + 1
+            if linhas:
+                bloco = "MEMORIA RELEVANTE (recall automatico):\n" + "\n".join(linhas)
+        except Exception:
+            bloco = ""
+        self._medir(time.perf_counter() - inicio, len(bloco.encode("utf-8")))
+        return bloco
+
+    def _medir(self, segundos: float, tamanho: int) -> None:
+        ms = segundos * 1000
+        with self._lock:
+            s = self.stats
+            s["consultas"] += 1
+            s["injecoes"] += 1 if tamanho else 0
+            s["ms_total"] += ms
+            s["ms_max"] = max(s["ms_max"], ms)
+            s["ms_ultimo"] = ms
+            s["bytes_total"] += tamanho
+            s["bytes_max"] = max(s["bytes_max"], tamanho)
+            s["bytes_ultimo"] = tamanho
+
+    def resumo(self) -> str:
+        s = self.stats
+        if not s["consultas"]:
+            return "Recall de memoria: nenhuma consulta ainda."
+        n = s["consultas"]
+        modo = "numpy/mmap" if _tem_numpy() else "python puro"
+        return (
+            f"Recall de memoria ({modo}, {len(self._chaves)} entradas): {int(s['injecoes'])}/{int(n)} turnos com injecao. "
+            f"Latencia: ultimo {s['ms_ultimo']:.1f}ms, media {s['ms_total'] / n:.1f}ms, max {s['ms_max']:.1f}ms. "
+            f"Bytes: ultimo {int(s['bytes_ultimo'])}, media {s['bytes_total'] / n:.0f}, max {int(s['bytes_max'])}."
+        )
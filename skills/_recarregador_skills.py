@@ -0,0 +1,202 @@
+"""
+Hot-reload das skills: observa skills/*.py e atualiza o TOOL_MAP sem reiniciar.
+
+Uma thread de polling (JARVIS_RELOAD_INTERVAL segundos; sem dependencia de
+inotify) compara mtime/tamanho dos arquivos de skill. Arquivos fora da
+allowlist sao apenas avisados. Para cada arquivo permitido alterado:
+- o manifesto (ast) e reprocessado so para ele;
+- se o modulo ja tinha sido importado, apenas ele passa por `importlib.reload`
+  (os demais nao sao tocados); senao as ferramentas continuam preguicosas;
+- as entradas do modulo no TOOL_MAP sao trocadas uma a uma (cada lookup ve a
+  versao antiga ou a nova, nunca um estado intermediario de uma ferramenta).
+Arquivos removidos tiram suas ferramentas do mapa. A latencia de cada
+recarga vai para `jarvis_logs/recarregamentos.jsonl`, e os ouvintes registrados
+em `ao_recarregar` sao avisados (ex.: cache do resumo de skills do Brain).
+"""
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+from skills._manifesto_skills import MANIFESTO_SKILLS, ManifestoSkills, ferramentas_do_arquivo
+
+INTERVALO_RELOAD = float(os.getenv("JARVIS_RELOAD_INTERVAL", "1.0"))
+RECARREGAMENTOS_LOG = LOG_DIR / "recarregamentos.jsonl"
+MARCADOR_RELOAD = "RECARREGAMENTO_SOLICITADO"  # devolvido por sistema.criar_skill
+
+
+class RecarregadorSkills:
+    """Observa arquivos de skill e recarrega so os modulos alterados."""
+
+    def __init__(
+        self,
+        tool_map: Dict[str, Callable],
+        listar_arquivos: Callable[[], List[Path]],
+        permitido: Callable[[Path], bool] = lambda _: True,
+        manifesto: ManifestoSkills = MANIFESTO_SKILLS,
+        intervalo: float = INTERVALO_RELOAD,
+    ):
+        self.tool_map = tool_map
+        self.listar_arquivos = listar_arquivos
+        self.permitido = permitido
+        self.manifesto = manifesto
+        self.intervalo = max(0.1, intervalo)
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._assinaturas: Dict[Path, Tuple[int, int]] = self._varrer()
+        self._ouvintes: List[Callable[[List[str]], None]] = []
+        self.stats: Dict[str, float] = {"recargas": 0, "falhas": 0, "ms_total": 0.0, "ms_max": 0.0}
+
+    def _varrer(self) -> Dict[Path, Tuple[int, int]]:
+        assinaturas = {}
+        for py_file in self.listar_arquivos():
+            try:
+                st = py_file.stat()
+            except OSError:
+                continue
+            assinaturas[py_file] = (st.st_mtime_ns, st.st_size)
+        return assinaturas
+
+    def ao_recarregar(self, ouvinte: Callable[[List[str]], None]) -> None:
+        """Registra um callback chamado a cada mudanca em skills/ (com os modulos recarregados)."""
+        self._ouvintes.append(ouvinte)
+
+    # --- CICLO ---
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._rodar, daemon=True, name="jarvis-recarregador")
+            self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def _rodar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"\n[RELOAD] Falha na verificacao de skills: {e}")
+
+    def verificar(self) -> List[str]:
+        """Recarrega imediatamente os arquivos alterados desde a ultima verificacao."""
+        with self._lock:
+            atuais = self._varrer()
+            alterados = [p for p, sig in atuais.items() if self._assinaturas.get(p) != sig]
+            removidos = [p for p in self._assinaturas if p not in atuais]
+            self._assinaturas = atuais
+            if not alterados and not removidos:
+                return []
+            for py_file in [p for p in alterados if not self.permitido(p)]:
+                print(f"\n[RELOAD] {py_file.name} alterado, mas fora de SKILLS_ALLOWLIST; ignorado.")
+            alterados = [p for p in alterados if self.permitido(p)]
+            removidos = [p for p in removidos if self.permitido(p)]
+            recarregados = []
+            for py_file in removidos:
+                self._remover(py_file)
+                recarregados.append(f"skills.{py_file.stem}")
+            if alterados:
+                importlib.invalidate_caches()
+                inicio = time.perf_counter()
+                entradas = self.manifesto.atualizar([p for p in atuais if self.permitido(p)])
+                # O parse (ast) do manifesto entra na latencia, dividido entre os arquivos.
+                parse = (time.perf_counter() - inicio) / len(alterados)
+                for py_file in alterados:
+                    if self._recarregar(py_file, entradas[py_file.name], parse):
+                        recarregados.append(f"skills.{py_file.stem}")
+        for ouvinte in self._ouvintes:
+            try:
+                ouvinte(recarregados)
+            except Exception:
+                pass
+        return recarregados
+
+    # --- TROCA NO TOOL_MAP ---
+    def _nomes_do_modulo(self, modulo: str) -> List[str]:
+        return [nome for nome, func in list(self.tool_map.items()) if getattr(func, "__module__", None) == modulo]
+
+    def _remover(self, py_file: Path) -> None:
+        modulo = f"skills.{py_file.stem}"
+        inicio = time.perf_counter()
+        antigos = self._nomes_do_modulo(modulo)
+        for nome in antigos:
+            self.tool_map.pop(nome, None)
+        sys.modules.pop(modulo, None)
+        self._registrar(modulo, inicio, [], antigos, importado=False)
+
+    def _recarregar(self, py_file: Path, entrada: Dict, parse: float = 0.0) -> bool:
+        modulo = f"skills.{py_file.stem}"
+        inicio = time.perf_counter() - parse
+        if entrada.get("erro"):
+            self._registrar(modulo, inicio, [], [], importado=False, erro=entrada["erro"])
+            return False
+
+        novas = {f.__name__: f for f in ferramentas_do_arquivo(py_file, entrada)}
+        importado = modulo in sys.modules
+        if importado:
+            try:
+                importlib.reload(sys.modules[modulo])
+                for ferramenta in novas.values():
+                    ferramenta.carregar()
+            except Exception as e:
+                self._registrar(modulo, inicio, [], [], importado=True, erro=f"{type(e).__name__}: {e}")
+                return False
+
+        antigos = set(self._nomes_do_modulo(modulo))
+        for nome, ferramenta in novas.items():
+            self.tool_map[nome] = ferramenta
+        for nome in antigos - set(novas):
+            self.tool_map.pop(nome, None)
+        self._registrar(modulo, inicio, sorted(set(novas) - antigos), sorted(antigos - set(novas)), importado)
+        return True
+
+    # --- METRICAS ---
+    def _registrar(
+        self,
+        modulo: str,
+        inicio: float,
+        adicionadas: List[str],
+        removidas: List[str],
+        importado: bool,
+        erro: Optional[str] = None,
+    ) -> None:
+        ms = (time.perf_counter() - inicio) * 1000
+        self.stats["recargas" if not erro else "falhas"] += 1
+        self.stats["ms_total"] += ms
+        self.stats["ms_max"] = max(self.stats["ms_max"], ms)
+        detalhe = f"+{len(adicionadas)}/-{len(removidas)} tools, {'reimportado' if importado else 'preguicoso'}"
+        if erro:
+            print(f"\n[RELOAD] {modulo} falhou em {ms:.1f}ms: {erro}")
+        else:
+            print(f"\n[RELOAD] {modulo} atualizado em {ms:.1f}ms ({detalhe})")
+        registro = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "modulo": modulo,
+            "ms": round(ms, 2),
+            "adicionadas": adicionadas,
+            "removidas": removidas,
+            "importado": importado,
+            "erro": erro,
+        }
+        try:
+            with open(RECARREGAMENTOS_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro) + "\n")
+        except OSError:
+            pass
+
+    def resumo(self) -> str:
+        s = self.stats
+        n = s["recargas"] + s["falhas"]
+        estado = f"polling a cada {self.intervalo:g}s" if self._thread else "sob demanda"
+        if not n:
+            return f"Hot-reload de skills ({estado}): nenhuma recarga ainda."
+        return (
+            f"Hot-reload de skills ({estado}): {int(s['recargas'])} recargas, {int(s['falhas'])} falhas. "
+            f"Latencia: media {s['ms_total'] / n:.1f}ms, max {s['ms_max']:.1f}ms. Log: {RECARREGAMENTOS_LOG}"
+        )
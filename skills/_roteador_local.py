@@ -0,0 +1,334 @@
+"""
+Roteador local aprendido (Gemini x Codex) sem chamadas ao LLM.
+
+Classificador linear (regressao logistica) sobre features n-gram com hashing,
+em Python puro. E treinado a partir das decisoes ja registradas em jarvis_logs/:
+- `rotas.jsonl`: diario de roteamento gravado pelo jarvis.py a cada turno;
+- arquivo de execucoes (`jarvis_logs/arquivo/`): partes input/output de cada rid,
+  com as classificacoes feitas pelo `_route_llm`, as mensagens dos turnos enviados
+  ao Gemini (so prompts com o marcador `USUARIO:`; chamadas internas como resumos
+  de contexto ficam de fora) e as tarefas delegadas ao Codex (e os
+  `{rid}_input.txt` soltos do formato antigo).
+
+O jarvis.py so escala para o `_route_llm` quando a confianca fica abaixo de
+ROUTER_LOCAL_THRESHOLD.
+
+Uso:
+    python -m skills._roteador_local treinar
+    python -m skills._roteador_local avaliar
+    python -m skills._roteador_local bench [--cli 3]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+from skills._arquivo_logs import ARQUIVO_DIR, ArquivoExecucoes
+
+DIMENSAO = 1 << 18
+MODELO_PATH = LOG_DIR / "roteador_modelo.json"
+ROTAS_LOG = LOG_DIR / "rotas.jsonl"
+LIMIAR_PADRAO = float(os.getenv("ROUTER_LOCAL_THRESHOLD", "0.85"))
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_MARCADOR_CLASSIFICACAO = "Responda APENAS com GEMINI ou CODEX"
+
+Amostra = Tuple[str, str]
+
+
+def extrair_features(texto: str) -> Dict[int, float]:
+    """Features esparsas: unigramas, bigramas de palavras e trigramas de caracteres."""
+    texto = texto.lower()[:4000]
+    tokens = _TOKEN_RE.findall(texto)
+    features: Dict[int, float] = {}
+
+    def _add(chave: str) -> None:
+        idx = zlib.crc32(chave.encode("utf-8")) & (DIMENSAO - 1)
+        features[idx] = features.get(idx, 0.0) + 1.0
+
+    for i, token in enumerate(tokens):
+        _add(f"w:{token}")
+        if i:
+            _add(f"b:{tokens[i - 1]}|{token}")
+    compacto = f" {' '.join(tokens)} "
+    for i in range(len(compacto) - 2):
+        _add(f"c:{compacto[i:i + 3]}")
+
+    norma = math.sqrt(sum(v * v for v in features.values())) or 1.0
+    return {k: v / norma for k, v in features.items()}
+
+
+def _sigmoide(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+class RoteadorLocal:
+    """Regressao logistica esparsa: p(codex | mensagem)."""
+
+    def __init__(self, pesos: Optional[Dict[int, float]] = None, vies: float = 0.0, meta: Optional[Dict] = None):
+        self.pesos: Dict[int, float] = pesos or {}
+        self.vies = vies
+        self.meta: Dict = meta or {}
+
+    def prob_codex(self, msg: str) -> float:
+        z = self.vies
+        pesos = self.pesos
+        for idx, valor in extrair_features(msg).items():
+            z += pesos.get(idx, 0.0) * valor
+        return _sigmoide(z)
+
+    def prever(self, msg: str) -> Tuple[str, float]:
+        """Retorna (rota, confianca) com confianca em [0.5, 1.0]."""
+        p = self.prob_codex(msg)
+        if p >= 0.5:
+            return "codex", p
+        return "gemini", 1.0 - p
+
+    def treinar(self, amostras: List[Amostra], epocas: int = 12, taxa: float = 0.5, l2: float = 1e-5) -> None:
+        dados = [(extrair_features(msg), 1.0 if rota == "codex" else 0.0) for msg, rota in amostras]
+        positivos = sum(y for _, y in dados) or 1.0
+        negativos = (len(dados) - positivos) or 1.0
+        peso_classe = {1.0: len(dados) / (2 * positivos), 0.0: len(dados) / (2 * negativos)}
+
+        rng = random.Random(0)
+        for epoca in range(epocas):
+            rng.shuffle(dados)
+            passo = taxa / (1 + epoca)
+            for x, y in dados:
+                z = self.vies + sum(self.pesos.get(i, 0.0) * v for i, v in x.items())
+                erro = (_sigmoide(z) - y) * peso_classe[y]
+                for i, v in x.items():
+                    w = self.pesos.get(i, 0.0)
+                    self.pesos[i] = w - passo * (erro * v + l2 * w)
+                self.vies -= passo * erro
+        self.pesos = {i: w for i, w in self.pesos.items() if abs(w) > 1e-6}
+
+    def salvar(self, path: Path = MODELO_PATH) -> None:
+        dados = {
+            "dimensao": DIMENSAO,
+            "vies": self.vies,
+            "pesos": {str(i): round(w, 6) for i, w in self.pesos.items()},
+            "meta": self.meta,
+        }
+        path.write_text(json.dumps(dados), encoding="utf-8")
+
+    @classmethod
+    def carregar(cls, path: Path = MODELO_PATH) -> Optional["RoteadorLocal"]:
+        try:
+            dados = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if dados.get("dimensao") != DIMENSAO:
+            return None
+        pesos = {int(i): float(w) for i, w in dados.get("pesos", {}).items()}
+        return cls(pesos, float(dados.get("vies", 0.0)), dados.get("meta", {}))
+
+
+# --- DATASET ---
+def _mensagem_de_prompt_gemini(prompt: str) -> Optional[str]:
+    # So turnos do usuario (`_build_gemini_prompt` do jarvis.py com contexto). Prompts sem o
+    # marcador sao ambiguos (resumos de contexto, tools, primeiro turno); o diario de rotas cobre os turnos.
+    if "<system_identity>" in prompt or "\n\nUSUARIO:\n" not in prompt:
+        return None
+    return prompt.rsplit("\n\nUSUARIO:\n", 1)[1].strip() or None
+
+
+def _mensagem_de_prompt_codex(prompt: str) -> Optional[str]:
+    if "PRIMARY TASK:\n" in prompt:
+        tarefa = prompt.split("PRIMARY TASK:\n", 1)[1]
+        return tarefa.split("\n\nEXTRA CONTEXT:\n", 1)[0].strip() or None
+    return prompt.strip() or None
+
+
+def carregar_amostras(log_dir: Path = LOG_DIR) -> List[Amostra]:
+    """Coleta (mensagem, rota) das decisoes registradas; a mais recente prevalece."""
+    rotulos: Dict[str, Tuple[float, str]] = {}
+
+    def _add(msg: Optional[str], rota: Optional[str], quando: float) -> None:
+        if not msg or rota not in {"gemini", "codex"}:
+            return
+        anterior = rotulos.get(msg)
+        if anterior is None or quando >= anterior[0]:
+            rotulos[msg] = (quando, rota)
+
+    def _add_prompt(prompt: str, codex: bool, saida: Callable[[], Optional[str]], quando: float) -> None:
+        if codex:
+            _add(_mensagem_de_prompt_codex(prompt), "codex", quando)
+        elif _MARCADOR_CLASSIFICACAO in prompt:
+            resposta = (saida() or "").upper()
+            rota = "codex" if "CODEX" in resposta else "gemini" if "GEMINI" in resposta else None
+            _add(prompt.split("MENSAGEM:\n", 1)[-1].strip(), rota, quando)
+        else:
+            _add(_mensagem_de_prompt_gemini(prompt), "gemini", quando)
+
+    # Arquivo de execucoes (skills/_arquivo_logs.py): partes input/output por rid.
+    arquivo = ArquivoExecucoes(log_dir / ARQUIVO_DIR.name)
+    entradas: Dict[str, Tuple[Path, Dict]] = {}
+    for segmento, entrada in arquivo.entradas(mais_novas_primeiro=False):
+        if entrada.get("parte") in {"input", "output"} and entrada.get("rota") in {"gemini", "codex"}:
+            entradas[f"{entrada['rid']}:{entrada['parte']}"] = (segmento, entrada)
+    for segmento, entrada in entradas.values():
+        if entrada["parte"] != "input":
+            continue
+        saida = entradas.get(f"{entrada['rid']}:output")
+        try:
+            prompt = arquivo.ler(segmento, entrada)
+            quando = datetime.fromisoformat(entrada["ts"]).timestamp()
+        except (OSError, ValueError, RuntimeError):
+            continue
+        _add_prompt(prompt, entrada["rota"] == "codex", lambda: arquivo.ler(*saida) if saida else None, quando)
+
+    # Arquivos soltos do formato antigo (antes de `python -m skills._arquivo_logs importar`).
+    for entrada in log_dir.glob("*_input.txt"):
+        try:
+            prompt = entrada.read_text(encoding="utf-8")
+            quando = entrada.stat().st_mtime
+        except OSError:
+            continue
+        saida = entrada.with_name(entrada.name.replace("_input.txt", "_output.txt"))
+        _add_prompt(
+            prompt,
+            entrada.name.endswith("_codex_input.txt"),
+            lambda: saida.read_text(encoding="utf-8") if saida.exists() else None,
+            quando,
+        )
+
+    # O diario de rotas e a fonte mais confiavel: aplicado por ultimo.
+    # Decisoes do proprio roteador local e do fallback padrao nao viram rotulo.
+    if (log_dir / ROTAS_LOG.name).exists():
+        with open(log_dir / ROTAS_LOG.name, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if registro.get("origem") in {"padrao", "local"}:
+                    continue
+                _add(registro.get("msg"), registro.get("rota"), float("inf"))
+
+    return [(msg, rota) for msg, (_, rota) in rotulos.items()]
+
+
+def _dividir(amostras: List[Amostra]) -> Tuple[List[Amostra], List[Amostra]]:
+    treino, teste = [], []
+    for amostra in amostras:
+        (teste if zlib.crc32(amostra[0].encode("utf-8")) % 5 == 0 else treino).append(amostra)
+    return treino, teste
+
+
+def _avaliar(modelo: RoteadorLocal, amostras: List[Amostra], limiar: float) -> Dict[str, float]:
+    acertos = confiantes = acertos_confiantes = 0
+    for msg, rota in amostras:
+        prevista, confianca = modelo.prever(msg)
+        acertos += prevista == rota
+        if confianca >= limiar:
+            confiantes += 1
+            acertos_confiantes += prevista == rota
+    total = len(amostras) or 1
+    return {
+        "n": len(amostras),
+        "acuracia": acertos / total,
+        "cobertura": confiantes / total,
+        "acuracia_confiante": acertos_confiantes / (confiantes or 1),
+    }
+
+
+# --- CLI ---
+def _cmd_treinar(args: argparse.Namespace) -> int:
+    amostras = carregar_amostras(Path(args.logs))
+    if len(amostras) < 4 or len({r for _, r in amostras}) < 2:
+        print(f"Amostras insuficientes em {args.logs} ({len(amostras)}); sao necessarias as duas rotas.")
+        return 1
+    modelo = RoteadorLocal()
+    modelo.treinar(amostras, epocas=args.epocas)
+    modelo.meta = {
+        "amostras": len(amostras),
+        "codex": sum(r == "codex" for _, r in amostras),
+        "treinado_em": time.strftime("%Y-%m-%d %H:%M"),
+    }
+    modelo.salvar(Path(args.modelo))
+    print(f"Modelo salvo em {args.modelo}: {len(modelo.pesos)} pesos, {len(amostras)} amostras.")
+    return 0
+
+
+def _cmd_avaliar(args: argparse.Namespace) -> int:
+    amostras = carregar_amostras(Path(args.logs))
+    treino, teste = _dividir(amostras)
+    if not teste or len({r for _, r in treino}) < 2:
+        print(f"Amostras insuficientes para avaliacao ({len(amostras)}).")
+        return 1
+    modelo = RoteadorLocal()
+    modelo.treinar(treino, epocas=args.epocas)
+    r = _avaliar(modelo, teste, args.limiar)
+    print(
+        f"treino={len(treino)} teste={r['n']:.0f} acuracia={r['acuracia']:.1%} "
+        f"cobertura@{args.limiar}={r['cobertura']:.1%} acuracia_confiante={r['acuracia_confiante']:.1%}"
+    )
+    return 0
+
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    modelo = RoteadorLocal.carregar(Path(args.modelo))
+    if modelo is None:
+        print(f"Modelo nao encontrado em {args.modelo}. Rode 'treinar' primeiro.")
+        return 1
+    mensagens = [m for m, _ in carregar_amostras(Path(args.logs))] or ["explique o roteador", "rode os testes"]
+    tempos = []
+    for _ in range(args.repeticoes):
+        for msg in mensagens:
+            inicio = time.perf_counter()
+            modelo.prever(msg)
+            tempos.append(time.perf_counter() - inicio)
+    print(
+        f"local: n={len(tempos)} p50={statistics.median(tempos) * 1e6:.0f}us "
+        f"p99={sorted(tempos)[int(len(tempos) * 0.99) - 1] * 1e6:.0f}us"
+    )
+
+    if args.cli:
+        from skills.cerebro import _executar_gemini_cli
+
+        tempos_cli = []
+        for i, msg in enumerate(mensagens[: args.cli]):
+            prompt = f"Classifique a mensagem do usuario como GEMINI (pensar) ou CODEX (executar). " \
+                     f"{_MARCADOR_CLASSIFICACAO}.\n\nMENSAGEM:\n{msg}\n"
+            inicio = time.perf_counter()
+            _executar_gemini_cli(prompt, rid=f"bench-roteador-{i}", proc_type="bench", usar_cache=False)
+            tempos_cli.append(time.perf_counter() - inicio)
+        p50_cli = statistics.median(tempos_cli)
+        print(f"cli:   n={len(tempos_cli)} p50={p50_cli * 1e6:.0f}us "
+              f"({p50_cli / statistics.median(tempos):.0f}x mais lento)")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m skills._roteador_local")
+    parser.add_argument("--logs", default=str(LOG_DIR))
+    parser.add_argument("--modelo", default=str(MODELO_PATH))
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_treinar = sub.add_parser("treinar", help="treina e salva o modelo")
+    p_treinar.add_argument("--epocas", type=int, default=12)
+    p_avaliar = sub.add_parser("avaliar", help="holdout 80/20 com acuracia e cobertura")
+    p_avaliar.add_argument("--epocas", type=int, default=12)
+    p_avaliar.add_argument("--limiar", type=float, default=LIMIAR_PADRAO)
+    p_bench = sub.add_parser("bench", help="latencia do classificador local (e opcionalmente do CLI)")
+    p_bench.add_argument("--repeticoes", type=int, default=20)
+    p_bench.add_argument("--cli", type=int, default=0, help="numero de chamadas reais ao Gemini CLI")
+    args = parser.parse_args(argv)
+    return {"treinar": _cmd_treinar, "avaliar": _cmd_avaliar, "bench": _cmd_bench}[args.comando](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
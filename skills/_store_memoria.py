@@ -0,0 +1,243 @@
+"""
+Armazenamento estruturado da memoria: SQLite (modo WAL) como fonte da verdade.
+
+Cada entrada tem id, topico, timestamp, conteudo e hash SHA-256 do conteudo
+normalizado; `UNIQUE(topico, hash)` faz a deduplicacao. O banco fica em
+`jarvis_logs/memoria.db` (fora do diretorio versionado `memoria/`; um banco
+antigo em `memoria/memoria.db` e movido na primeira abertura). Os arquivos
+`memoria/<topico>.md` continuam existindo como visao exportada (mesmo formato
+`### timestamp`), atualizada por append a cada entrada nova; o indice BM25 de
+skills/_indice_memoria.py segue indexando essa visao.
+
+Na primeira abertura os .md existentes sao importados. A compactacao
+(automatica a cada MEMORIA_COMPACTAR_A_CADA gravacoes, ou `compactar()`)
+reimporta edicoes manuais feitas nos .md, reexporta os topicos divergentes
+(remove duplicatas antigas e escritas intercaladas) e faz checkpoint do WAL.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from skills.util_comuns import LOG_DIR
+from skills._escritor_logs import EscritorLogs
+
+BANCO_PATH = LOG_DIR / "memoria.db"
+COMPACTAR_A_CADA = int(os.getenv("MEMORIA_COMPACTAR_A_CADA", "200"))
+_CABECALHO = re.compile(r"(?m)^### (.*)$")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topico TEXT NOT NULL,
+    criado TEXT NOT NULL,
+    conteudo TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    UNIQUE (topico, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_entradas_topico ON entradas (topico, id);
+CREATE TABLE IF NOT EXISTS exportacoes (
+    topico TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    tamanho INTEGER NOT NULL
+);
+"""
+
+
+def hash_conteudo(conteudo: str) -> str:
+    """Hash do conteudo normalizado (espacos colapsados), usado na deduplicacao."""
+    return hashlib.sha256(" ".join(conteudo.split()).encode("utf-8")).hexdigest()
+
+
+def formatar_entrada(criado: str, conteudo: str) -> str:
+    """Formato Markdown historico de `memorizar`."""
+    if not criado:
+        return f"{conteudo}\n"
+    return f"\n### {criado}\n{conteudo}\n"
+
+
+def dividir_markdown(texto: str) -> List[Tuple[str, str]]:
+    """Divide um .md em (timestamp, conteudo); texto antes do 1o cabecalho vira timestamp ''."""
+    entradas: List[Tuple[str, str]] = []
+    cabecalhos = list(_CABECALHO.finditer(texto))
+    preambulo = texto[: cabecalhos[0].start()] if cabecalhos else texto
+    if preambulo.strip():
+        entradas.append(("", preambulo.strip()))
+    for i, m in enumerate(cabecalhos):
+        fim = cabecalhos[i + 1].start() if i + 1 < len(cabecalhos) else len(texto)
+        conteudo = texto[m.end():fim].strip()
+        if conteudo:
+            entradas.append((m.group(1).strip(), conteudo))
+    return entradas
+
+
+class StoreMemoria:
+    """Entradas de memoria em SQLite com exportacao Markdown por topico."""
+
+    def __init__(self, diretorio: Path, caminho_banco: Path = BANCO_PATH, escritor: Optional[EscritorLogs] = None):
+        self.diretorio = Path(diretorio)
+        self.caminho_banco = Path(caminho_banco)
+        self.escritor = escritor
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pronto = False
+        self._gravacoes = 0
+
+    # --- CONEXAO ---
+    def _migrar_banco_antigo(self) -> None:
+        # Versoes anteriores criavam o banco (e o -wal/-shm) dentro de `memoria/`, versionado no git.
+        antigo = self.diretorio / self.caminho_banco.name
+        if self.caminho_banco.exists() or not antigo.exists() or antigo.resolve() == self.caminho_banco.resolve():
+            return
+        for sufixo in ("", "-wal", "-shm"):
+            origem = antigo.with_name(antigo.name + sufixo)
+            if origem.exists():
+                os.replace(origem, self.caminho_banco.with_name(self.caminho_banco.name + sufixo))
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            self.caminho_banco.parent.mkdir(parents=True, exist_ok=True)
+            self._migrar_banco_antigo()
+            con = sqlite3.connect(self.caminho_banco, timeout=10.0)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        if not self._pronto:
+            with self._lock:
+                if not self._pronto:
+                    con.executescript(_ESQUEMA)
+                    self._importar_legado(con)
+                    self._pronto = True
+        return con
+
+    def _importar_legado(self, con: sqlite3.Connection) -> None:
+        conhecidos = {t for (t,) in con.execute("SELECT DISTINCT topico FROM entradas")}
+        for md in sorted(self.diretorio.glob("*.md")):
+            if md.stem not in conhecidos:
+                self._importar_arquivo(con, md)
+                self._marcar_exportado(con, md)
+        con.commit()
+
+    def _importar_arquivo(self, con: sqlite3.Connection, md: Path) -> int:
+        novas = 0
+        for criado, conteudo in dividir_markdown(md.read_text(encoding="utf-8")):
+            cur = con.execute(
+                "INSERT OR IGNORE INTO entradas (topico, criado, conteudo, hash) VALUES (?, ?, ?, ?)",
+                (md.stem, criado, conteudo, hash_conteudo(conteudo)),
+            )
+            novas += cur.rowcount
+        return novas
+
+    def _marcar_exportado(self, con: sqlite3.Connection, md: Path) -> None:
+        st = md.stat()
+        con.execute(
+            "INSERT OR REPLACE INTO exportacoes (topico, mtime, tamanho) VALUES (?, ?, ?)",
+            (md.stem, st.st_mtime, st.st_size),
+        )
+
+    # --- API ---
+    def adicionar(self, md: Path, conteudo: str) -> Tuple[int, bool]:
+        """
+        Grava a entrada e, se for nova, anexa na visao Markdown.
+        Retorna (id, nova); entradas repetidas devolvem o id existente.
+        """
+        con = self._conexao()
+        topico = md.stem
+        criado = datetime.now().strftime("%Y-%m-%d %H:%M")
+        digest = hash_conteudo(conteudo)
+        with con:
+            cur = con.execute(
+                "INSERT OR IGNORE INTO entradas (topico, criado, conteudo, hash) VALUES (?, ?, ?, ?)",
+                (topico, criado, conteudo, digest),
+            )
+            if not cur.rowcount:
+                (existente,) = con.execute(
+                    "SELECT id FROM entradas WHERE topico = ? AND hash = ?", (topico, digest)
+                ).fetchone()
+                return existente, False
+            novo_id = cur.lastrowid
+
+        # Com escritor, o append na visao Markdown sai do caminho da chamada
+        # (o banco ja tem a entrada; a compactacao corrige qualquer divergencia).
+        self._gravacoes += 1
+        compactar = COMPACTAR_A_CADA and self._gravacoes % COMPACTAR_A_CADA == 0
+        if self.escritor is None:
+            self._exportar_entrada(md, criado, conteudo)
+            if compactar:
+                self.compactar()
+        else:
+            self.escritor.executar(lambda: self._exportar_entrada(md, criado, conteudo), len(conteudo))
+            if compactar:
+                self.escritor.executar(self._compactar_adiado)
+        return novo_id, True
+
+    def _exportar_entrada(self, md: Path, criado: str, conteudo: str) -> List[Path]:
+        con = self._conexao()
+        with con:
+            with open(md, "a", encoding="utf-8") as f:
+                f.write(formatar_entrada(criado, conteudo))
+            self._marcar_exportado(con, md)
+        return [md]
+
+    def _compactar_adiado(self) -> None:
+        self.compactar()
+
+    def topico(self, topico: str) -> Optional[str]:
+        """Entradas de um topico no formato Markdown (None se o topico nao existir)."""
+        linhas = self._conexao().execute(
+            "SELECT criado, conteudo FROM entradas WHERE topico = ? ORDER BY id", (topico,)
+        ).fetchall()
+        if not linhas:
+            return None
+        return "".join(formatar_entrada(criado, conteudo) for criado, conteudo in linhas)
+
+    def topicos(self) -> Dict[str, int]:
+        """{topico: numero de entradas}."""
+        return dict(
+            self._conexao().execute("SELECT topico, COUNT(*) FROM entradas GROUP BY topico ORDER BY topico")
+        )
+
+    def exportar(self, topico: str) -> Path:
+        """Regrava `memoria/<topico>.md` a partir do banco (escrita atomica)."""
+        con = self._conexao()
+        md = self.diretorio / f"{topico}.md"
+        tmp = md.with_suffix(".md.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for criado, conteudo in con.execute(
+                "SELECT criado, conteudo FROM entradas WHERE topico = ? ORDER BY id", (topico,)
+            ):
+                f.write(formatar_entrada(criado, conteudo))
+        os.replace(tmp, md)
+        with con:
+            self._marcar_exportado(con, md)
+        return md
+
+    def compactar(self) -> Dict[str, int]:
+        """
+        Reimporta .md editados a mao, reexporta topicos divergentes do banco
+        e faz checkpoint do WAL. Retorna contadores da operacao.
+        """
+        con = self._conexao()
+        resultado = {"importadas": 0, "reexportados": 0}
+        exportados = {t: (m, s) for t, m, s in con.execute("SELECT topico, mtime, tamanho FROM exportacoes")}
+        with con:
+            for md in self.diretorio.glob("*.md"):
+                st = md.stat()
+                if exportados.get(md.stem) != (st.st_mtime, st.st_size):
+                    resultado["importadas"] += self._importar_arquivo(con, md)
+                    exportados.pop(md.stem, None)
+        for topico in self.topicos():
+            md = self.diretorio / f"{topico}.md"
+            esperado = self.topico(topico) or ""
+            atual = md.read_text(encoding="utf-8") if md.exists() else None
+            if atual != esperado:
+                self.exportar(topico)
+                resultado["reexportados"] += 1
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return resultado
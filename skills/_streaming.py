@@ -0,0 +1,138 @@
+"""
+Streaming linha-a-linha das saidas dos CLIs (Gemini/Codex).
+
+Em vez de `proc.communicate()`, as linhas sao repassadas ao chamador assim que
+chegam, anexadas ao log incremental pelo escritor em background (nada de
+write/flush no loop do motor) e mantidas apenas num buffer circular limitado
+para o relatorio final. O tempo ate o primeiro byte (TTFB) e medido
+em toda execucao e registrado em `jarvis_logs/stream_metricas.jsonl`.
+"""
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from skills.util_comuns import LOG_DIR
+from skills import _traces as traces
+from skills._escritor_logs import ESCRITOR
+
+METRICAS_LOG = LOG_DIR / "stream_metricas.jsonl"
+
+
+class BufferCircular:
+    """Mantem apenas os ultimos `max_chars` caracteres de uma sequencia de linhas."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max(1, max_chars)
+        self._linhas: Deque[str] = deque()
+        self._chars = 0
+        self.total_chars = 0
+        self.descartados = 0
+        self._lock = threading.Lock()
+
+    def adicionar(self, linha: str) -> None:
+        if len(linha) > self.max_chars:
+            self.descartados += len(linha) - self.max_chars
+            linha = linha[-self.max_chars:]
+        tamanho = len(linha) + 1
+        with self._lock:
+            self._linhas.append(linha)
+            self._chars += tamanho
+            self.total_chars += tamanho
+            while self._chars > self.max_chars and len(self._linhas) > 1:
+                removida = self._linhas.popleft()
+                self._chars -= len(removida) + 1
+                self.descartados += len(removida) + 1
+
+    def texto(self) -> str:
+        with self._lock:
+            corpo = "\n".join(self._linhas).strip()
+        if self.descartados:
+            return f"[...{self.descartados} CHARS ANTERIORES OMITIDOS (ver log)...]\n{corpo}"
+        return corpo
+
+
+class ExecucaoStream:
+    """Buffers, metricas e resultado final de uma execucao em streaming."""
+
+    def __init__(self, rid: str, max_chars: int):
+        self.rid = rid
+        self.stdout = BufferCircular(max_chars)
+        self.stderr = BufferCircular(max_chars)
+        self.inicio = time.perf_counter()
+        self.ttfb: Optional[float] = None
+        self.duracao: Optional[float] = None
+        self.returncode: Optional[int] = None
+        self.timeout_expirado = False
+        self.cache_hit = False
+        self.bytes_entrada = 0
+        self.resultado = ""
+        self.mensagem_final = ""
+
+    def marcar_primeiro_byte(self) -> None:
+        if self.ttfb is None:
+            self.ttfb = time.perf_counter() - self.inicio
+
+    def receber(self, linha: str, log_path: Optional[Path] = None) -> None:
+        """Registra uma linha de stdout: TTFB, buffer circular e log incremental (via ESCRITOR)."""
+        self.marcar_primeiro_byte()
+        self.stdout.adicionar(linha)
+        if log_path is not None:
+            ESCRITOR.anexar(log_path, linha + "\n")
+
+    def reiniciar(self) -> None:
+        """Descarta a saida de uma tentativa que falhou antes de responder (mantem rid e inicio)."""
+        self.stdout = BufferCircular(self.stdout.max_chars)
+        self.stderr = BufferCircular(self.stderr.max_chars)
+        self.ttfb = None
+        self.duracao = None
+        self.returncode = None
+        self.timeout_expirado = False
+        self.resultado = ""
+        self.mensagem_final = ""
+
+    def finalizar(self) -> None:
+        if self.duracao is None:
+            self.duracao = time.perf_counter() - self.inicio
+
+    def metricas(self) -> str:
+        ttfb = f"{self.ttfb:.2f}s" if self.ttfb is not None else "n/a"
+        return f"ttfb={ttfb}, total={self.duracao or 0.0:.2f}s, saida={self.stdout.total_chars} chars"
+
+    def registrar(self, rota: str) -> None:
+        """Anexa as metricas da execucao em METRICAS_LOG (uma linha JSON por execucao) e ao trace do turno."""
+        traces.registrar_chamada(self, rota)
+        registro: Dict[str, object] = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "rid": self.rid,
+            "rota": rota,
+            "ttfb": round(self.ttfb, 4) if self.ttfb is not None else None,
+            "total": round(self.duracao or 0.0, 4),
+            "chars": self.stdout.total_chars,
+            "exit": self.returncode,
+            "timeout": self.timeout_expirado,
+            "cache": self.cache_hit,
+        }
+        ESCRITOR.anexar(METRICAS_LOG, json.dumps(registro) + "\n")
+
+
+def iniciar_log(log_path: Path) -> None:
+    """Zera o log incremental na thread do ESCRITOR; a ordem da fila o poe antes das linhas."""
+    def _zerar() -> List[Path]:
+        with open(log_path, "w", encoding="utf-8"):
+            return [log_path]
+    ESCRITOR.executar(_zerar)
+
+
+def transmitir(linhas: Iterable[str], execucao: ExecucaoStream, log_path: Path) -> Iterator[str]:
+    """Repassa as linhas ao chamador, gravando-as no log e no buffer circular."""
+    try:
+        iniciar_log(log_path)
+        for linha in linhas:
+            execucao.receber(linha, log_path)
+            yield linha
+    finally:
+        execucao.finalizar()
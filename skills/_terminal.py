@@ -0,0 +1,181 @@
+"""
+Execucao sincrona de comandos shell com limites (`executar_comando_terminal`).
+
+O comando roda no motor async num grupo de processos proprio. stdout/stderr
+sao lidos em blocos e guardados num buffer cabeca+cauda (os primeiros e os
+ultimos TERMINAL_CABECA_CHARS/TERMINAL_CAUDA_CHARS caracteres; o meio e so
+contado). Dois limites encerram o grupo inteiro (SIGTERM, depois SIGKILL):
+- tempo de parede: TERMINAL_TIMEOUT segundos;
+- volume de saida: TERMINAL_MAX_BYTES bytes somando stdout e stderr.
+O resultado traz os tempos de spawn, primeira saida e termino.
+"""
+import asyncio
+import codecs
+import contextlib
+import os
+import time
+import uuid
+from collections import deque
+from typing import Deque, List, Optional
+
+from skills.util_comuns import PROCESSOS_ATIVOS, PROCESSOS_LOCK
+from skills._motor_async import MOTOR, ProcessoGrupo, opcoes_grupo, sinalizar_grupo
+
+TIMEOUT_PADRAO = float(os.getenv("TERMINAL_TIMEOUT", "120"))
+MAX_BYTES_PADRAO = int(os.getenv("TERMINAL_MAX_BYTES", str(20 * 1024 * 1024)))
+CABECA_CHARS = int(os.getenv("TERMINAL_CABECA_CHARS", "6000"))
+CAUDA_CHARS = int(os.getenv("TERMINAL_CAUDA_CHARS", "6000"))
+_BLOCO = 64 * 1024
+_TOLERANCIA_TERMINO = 2.0
+
+
+class BufferCabecaCauda:
+    """Guarda o inicio e o fim de um fluxo de texto; o meio so e contado."""
+
+    def __init__(self, cabeca: int = CABECA_CHARS, cauda: int = CAUDA_CHARS):
+        self.max_cabeca = max(0, cabeca)
+        self.max_cauda = max(0, cauda)
+        self._cabeca: List[str] = []
+        self._chars_cabeca = 0
+        self._cauda: Deque[str] = deque()
+        self._chars_cauda = 0
+        self.total_chars = 0
+
+    def adicionar(self, texto: str) -> None:
+        if not texto:
+            return
+        self.total_chars += len(texto)
+        if self._chars_cabeca < self.max_cabeca:
+            parte = texto[: self.max_cabeca - self._chars_cabeca]
+            self._cabeca.append(parte)
+            self._chars_cabeca += len(parte)
+            texto = texto[len(parte):]
+        if not texto or not self.max_cauda:
+            return
+        self._cauda.append(texto[-self.max_cauda:])
+        self._chars_cauda += len(self._cauda[-1])
+        while self._chars_cauda - len(self._cauda[0]) >= self.max_cauda:
+            self._chars_cauda -= len(self._cauda.popleft())
+
+    def texto(self) -> str:
+        cabeca = "".join(self._cabeca)
+        cauda = "".join(self._cauda)
+        if len(cauda) > self.max_cauda:
+            cauda = cauda[-self.max_cauda:]
+        omitidos = self.total_chars - len(cabeca) - len(cauda)
+        if omitidos > 0:
+            return f"{cabeca}\n[...{omitidos} CHARS OMITIDOS...]\n{cauda}"
+        return cabeca + cauda
+
+
+class ResultadoComando:
+    """Saida limitada, codigo de retorno e tempos de uma execucao."""
+
+    def __init__(self, comando: str):
+        self.comando = comando
+        self.stdout = BufferCabecaCauda()
+        self.stderr = BufferCabecaCauda()
+        self.returncode: Optional[int] = None
+        self.bytes_saida = 0
+        self.motivo_interrupcao = ""
+        self.ms_spawn = 0.0
+        self.ms_primeira_saida: Optional[float] = None
+        self.ms_total = 0.0
+
+    def formatar(self) -> str:
+        primeira = f"{self.ms_primeira_saida:.0f}ms" if self.ms_primeira_saida is not None else "sem saida"
+        linhas = [
+            f"EXIT: {self.returncode}",
+            f"STDOUT: {self.stdout.texto()}",
+            f"STDERR: {self.stderr.texto()}",
+            f"TEMPOS: spawn {self.ms_spawn:.0f}ms | primeira saida {primeira} | "
+            f"termino {self.ms_total:.0f}ms | saida {self.bytes_saida} bytes",
+        ]
+        if self.motivo_interrupcao:
+            linhas.append(f"INTERROMPIDO: {self.motivo_interrupcao} (grupo de processos encerrado)")
+        return "\n".join(linhas)
+
+
+async def _encerrar(proc: asyncio.subprocess.Process) -> None:
+    sinalizar_grupo(proc.pid, forcar=False)
+    try:
+        await asyncio.wait_for(proc.wait(), _TOLERANCIA_TERMINO)
+    except asyncio.TimeoutError:
+        sinalizar_grupo(proc.pid, forcar=True)
+        await proc.wait()
+
+
+async def executar_limitado(comando: str, timeout: float = TIMEOUT_PADRAO, max_bytes: int = MAX_BYTES_PADRAO) -> ResultadoComando:
+    """Roda `comando` no shell com limites de tempo e de saida (ver docstring do modulo)."""
+    resultado = ResultadoComando(comando)
+    inicio = time.perf_counter()
+    proc = await asyncio.create_subprocess_shell(
+        comando,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **opcoes_grupo(),
+    )
+    resultado.ms_spawn = (time.perf_counter() - inicio) * 1000
+    rid = f"term-{uuid.uuid4().hex[:8]}"
+    with PROCESSOS_LOCK:
+        PROCESSOS_ATIVOS[rid] = {"proc": ProcessoGrupo(proc), "cmd": comando, "type": "terminal"}
+    estourou = asyncio.Event()
+
+    async def _drenar(stream: asyncio.StreamReader, buffer: BufferCabecaCauda) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        while True:
+            bloco = await stream.read(_BLOCO)
+            if not bloco:
+                buffer.adicionar(decoder.decode(b"", final=True))
+                return
+            if resultado.ms_primeira_saida is None:
+                resultado.ms_primeira_saida = (time.perf_counter() - inicio) * 1000
+            if estourou.is_set():
+                continue  # so drena ate o grupo morrer (pipe parado atrasa o proc.wait)
+            resultado.bytes_saida += len(bloco)
+            buffer.adicionar(decoder.decode(bloco))
+            if max_bytes and resultado.bytes_saida > max_bytes:
+                estourou.set()
+
+    leitores = [
+        asyncio.ensure_future(_drenar(proc.stdout, resultado.stdout)),
+        asyncio.ensure_future(_drenar(proc.stderr, resultado.stderr)),
+    ]
+    vigia = asyncio.ensure_future(estourou.wait())
+    try:
+        concluido = asyncio.gather(*leitores)
+        pronto, _ = await asyncio.wait({concluido, vigia}, timeout=timeout if timeout > 0 else None,
+                                       return_when=asyncio.FIRST_COMPLETED)
+        if estourou.is_set():
+            resultado.motivo_interrupcao = f"saida passou de {max_bytes} bytes"
+        elif not pronto:
+            resultado.motivo_interrupcao = f"tempo limite de {timeout:g}s"
+        if not resultado.motivo_interrupcao and proc.returncode is None:
+            # Pipes fechados/redirecionados (`cmd >log 2>&1`, daemons) nao liberam o processo: o limite vale ate o fim.
+            restante = timeout - (time.perf_counter() - inicio) if timeout > 0 else None
+            try:
+                await asyncio.wait_for(proc.wait(), max(0.0, restante) if restante is not None else None)
+            except asyncio.TimeoutError:
+                resultado.motivo_interrupcao = f"tempo limite de {timeout:g}s"
+        if resultado.motivo_interrupcao:
+            await _encerrar(proc)
+        await proc.wait()
+    except asyncio.CancelledError:
+        sinalizar_grupo(proc.pid, forcar=True)
+        raise
+    finally:
+        for tarefa in [*leitores, vigia]:
+            tarefa.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await asyncio.gather(*leitores, vigia, return_exceptions=True)
+        with PROCESSOS_LOCK:
+            PROCESSOS_ATIVOS.pop(rid, None)
+        resultado.returncode = proc.returncode
+        resultado.ms_total = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def executar_comando(comando: str, timeout: float = TIMEOUT_PADRAO, max_bytes: int = MAX_BYTES_PADRAO) -> ResultadoComando:
+    """Wrapper sincrono de `executar_limitado` (roda no motor async)."""
+    return MOTOR.executar(executar_limitado(comando, timeout, max_bytes))
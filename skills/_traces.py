@@ -0,0 +1,193 @@
+"""
+Trace estruturado de cada turno roteado (`jarvis_logs/traces.jsonl`).
+
+Um `TraceTurno` e criado em `executar_turno_async` e propagado por
+`contextvars` (as tasks do motor herdam o contexto), entao as camadas de baixo
+anotam o turno corrente sem receber parametros novos:
+- `fase(nome)`: cronometra um trecho (memoria, roteamento, prompt);
+- `somar(chave, ms)`: acumula tempos como o spawn de subprocessos;
+- `registrar_chamada(execucao, rota)`: cada chamada de CLI (Gemini/Codex),
+  com a fase em que ocorreu, TTFB, duracao, bytes e acerto de cache.
+Sem turno ativo, tudo vira no-op.
+
+Cada linha do JSONL traz `ms` (memoria, roteamento, prompt, spawn, ttfb e
+total), bytes de entrada/saida, acertos de cache e as chamadas (fora das
+fases nomeadas, a chamada conta como "execucao").
+`resumo_traces` agrega p50/p95/p99 por rota (`python jarvis.py stats`).
+"""
+import contextlib
+import contextvars
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from skills.util_comuns import LOG_DIR
+from skills._escritor_logs import ESCRITOR
+
+TRACES_LOG = LOG_DIR / "traces.jsonl"
+_TRACE_ATUAL: contextvars.ContextVar[Optional["TraceTurno"]] = contextvars.ContextVar("trace_turno", default=None)
+_FASE_ATUAL: contextvars.ContextVar[str] = contextvars.ContextVar("fase_turno", default="")
+_METRICAS_RESUMO = ["roteamento", "prompt", "spawn", "ttfb", "total"]
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil `p` (0-100) com interpolacao linear; 0.0 para lista vazia."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    pos = (len(ordenados) - 1) * p / 100
+    baixo = int(pos)
+    alto = min(baixo + 1, len(ordenados) - 1)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (pos - baixo)
+
+
+class TraceTurno:
+    """Tempos, bytes e chamadas de CLI de um turno."""
+
+    def __init__(self, msg: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.inicio = time.perf_counter()
+        self.ts = datetime.now().isoformat(timespec="seconds")
+        self.rota = ""
+        self.origem_rota = ""
+        self.especulativo = False
+        self.ms: Dict[str, float] = {}
+        self.bytes_entrada = len(msg.encode("utf-8"))
+        self.bytes_saida = 0
+        self.chamadas: List[Dict[str, Any]] = []
+        self.ttfb_ms: Optional[float] = None
+
+    def somar(self, chave: str, ms: float) -> None:
+        self.ms[chave] = self.ms.get(chave, 0.0) + ms
+
+    def para_dict(self) -> Dict[str, Any]:
+        ms = {k: round(v, 1) for k, v in self.ms.items()}
+        ms["ttfb"] = round(self.ttfb_ms, 1) if self.ttfb_ms is not None else None
+        ms["total"] = round((time.perf_counter() - self.inicio) * 1000, 1)
+        return {
+            "ts": self.ts,
+            "trace": self.id,
+            "rota": self.rota,
+            "origem_rota": self.origem_rota,
+            "especulativo": self.especulativo,
+            "ms": ms,
+            "bytes_entrada": self.bytes_entrada,
+            "bytes_saida": self.bytes_saida,
+            "cache_hits": sum(1 for c in self.chamadas if c["cache"]),
+            "chamadas": self.chamadas,
+        }
+
+
+def atual() -> Optional[TraceTurno]:
+    return _TRACE_ATUAL.get()
+
+
+@contextlib.contextmanager
+def turno(msg: str) -> Iterator[TraceTurno]:
+    """Abre o trace do turno no contexto atual e grava a linha JSONL ao sair."""
+    trace = TraceTurno(msg)
+    token = _TRACE_ATUAL.set(trace)
+    try:
+        yield trace
+    finally:
+        _TRACE_ATUAL.reset(token)
+        gravar(trace)
+
+
+@contextlib.contextmanager
+def fase(nome: str) -> Iterator[None]:
+    trace = _TRACE_ATUAL.get()
+    if trace is None:
+        yield
+        return
+    token = _FASE_ATUAL.set(nome)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.somar(nome, (time.perf_counter() - inicio) * 1000)
+        _FASE_ATUAL.reset(token)
+
+
+def somar(chave: str, ms: float) -> None:
+    trace = _TRACE_ATUAL.get()
+    if trace is not None:
+        trace.somar(chave, ms)
+
+
+def anotar(**campos: Any) -> None:
+    trace = _TRACE_ATUAL.get()
+    if trace is not None:
+        for chave, valor in campos.items():
+            setattr(trace, chave, valor)
+
+
+def registrar_chamada(execucao: Any, rota: str) -> None:
+    """Anexa uma chamada de CLI (ExecucaoStream) ao turno; a primeira fora do roteamento define o TTFB do turno."""
+    trace = _TRACE_ATUAL.get()
+    if trace is None:
+        return
+    fase_chamada = _FASE_ATUAL.get() or "execucao"
+    trace.chamadas.append({
+        "rid": execucao.rid,
+        "rota": rota,
+        "fase": fase_chamada,
+        "ttfb_ms": round(execucao.ttfb * 1000, 1) if execucao.ttfb is not None else None,
+        "total_ms": round((execucao.duracao or 0.0) * 1000, 1),
+        "bytes_entrada": execucao.bytes_entrada,
+        "chars_saida": execucao.stdout.total_chars,
+        "exit": execucao.returncode,
+        "cache": execucao.cache_hit,
+    })
+    if fase_chamada != "roteamento" and trace.ttfb_ms is None and execucao.ttfb is not None:
+        trace.ttfb_ms = (execucao.inicio + execucao.ttfb - trace.inicio) * 1000
+
+
+def gravar(trace: TraceTurno) -> None:
+    try:
+        ESCRITOR.anexar(TRACES_LOG, json.dumps(trace.para_dict(), ensure_ascii=False) + "\n")
+    except Exception:
+        pass
+
+
+def carregar(ultimos: int = 0) -> List[Dict[str, Any]]:
+    ESCRITOR.esperar(5.0)
+    try:
+        with open(TRACES_LOG, encoding="utf-8") as f:
+            linhas = f.readlines()
+    except OSError:
+        return []
+    registros = []
+    for linha in linhas[-ultimos:] if ultimos > 0 else linhas:
+        with contextlib.suppress(ValueError):
+            registros.append(json.loads(linha))
+    return registros
+
+
+def resumo_traces(ultimos: int = 0) -> str:
+    """p50/p95/p99 (ms) por rota das metricas dos traces."""
+    registros = carregar(ultimos)
+    if not registros:
+        return f"Traces: nenhum turno registrado em {TRACES_LOG}."
+    por_rota: Dict[str, List[Dict[str, Any]]] = {}
+    for r in registros:
+        por_rota.setdefault(r.get("rota") or "?", []).append(r)
+    linhas = [f"Traces: {len(registros)} turnos ({TRACES_LOG}). Tempos em ms (p50 / p95 / p99):"]
+    for rota, itens in sorted(por_rota.items()):
+        cache = sum(1 for r in itens if r.get("cache_hits"))
+        especulativos = sum(1 for r in itens if r.get("especulativo"))
+        entrada = sum(r.get("bytes_entrada", 0) for r in itens) / len(itens)
+        saida = sum(r.get("bytes_saida", 0) for r in itens) / len(itens)
+        linhas.append(
+            f"  {rota}: {len(itens)} turnos | {cache} com cache | {especulativos} especulativos | "
+            f"bytes medios {entrada:.0f} in / {saida:.0f} out"
+        )
+        for metrica in _METRICAS_RESUMO:
+            valores = [r["ms"][metrica] for r in itens if r.get("ms", {}).get(metrica) is not None]
+            if not valores:
+                continue
+            p50, p95, p99 = (percentil(valores, p) for p in (50, 95, 99))
+            linhas.append(f"    {metrica:<11} {p50:9.1f} / {p95:9.1f} / {p99:9.1f}  (n={len(valores)})")
+    return "\n".join(linhas)
@@ -0,0 +1,111 @@
+"""
+Areas de trabalho isoladas para sessoes do Codex rodando em paralelo.
+
+Num repositorio git cada tarefa ganha um `git worktree` destacado em
+`jarvis_logs/worktrees/<nome>`, criado a partir de `git stash create` (HEAD +
+alteracoes rastreadas ainda nao commitadas, sem mexer no working tree atual).
+Ao final, tudo o que a sessao alterou vira um patch binario (`git diff`
+contra a base) que pode ser aplicado na arvore principal com `git apply`.
+
+Fora de um repositorio git, a area e uma copia da pasta (scratch dir),
+ignorando `.git`, `jarvis_logs`, ambientes virtuais e caches; nesse caso nao
+ha patch e a pasta e mantida para inspecao.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+from skills.util_comuns import LOG_DIR
+
+WORKTREES_DIR = LOG_DIR / "worktrees"
+_IGNORAR_COPIA = shutil.ignore_patterns(
+    ".git", "jarvis_logs", "venv", ".venv", "__pycache__", "node_modules", "workspace_output"
+)
+
+
+def _git(args: List[str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=False)
+
+
+def raiz_git(pasta: Path) -> Optional[Path]:
+    """Raiz do repositorio git que contem `pasta` (None se nao for repositorio ou sem git)."""
+    try:
+        resultado = _git(["rev-parse", "--show-toplevel"], pasta)
+    except FileNotFoundError:
+        return None
+    if resultado.returncode != 0:
+        return None
+    return Path(resultado.stdout.decode("utf-8", "replace").strip())
+
+
+class AreaIsolada:
+    """Pasta onde uma tarefa roda sem colidir com as demais."""
+
+    def __init__(
+        self, nome: str, caminho: Path, tipo: str, base: str = "", raiz: Optional[Path] = None, subpasta: str = ""
+    ):
+        self.nome = nome
+        self.caminho = caminho
+        self.tipo = tipo  # "worktree" ou "scratch"
+        self.base = base
+        self.raiz = raiz
+        self.subpasta = subpasta  # origem relativa a raiz do repositorio
+
+    @property
+    def diretorio_trabalho(self) -> Path:
+        """Equivalente, dentro da area, a pasta de origem."""
+        return self.caminho / self.subpasta if self.subpasta else self.caminho
+
+    def __repr__(self) -> str:
+        return f"{self.tipo}:{self.caminho}"
+
+
+def criar_area(origem: Path, nome: str) -> AreaIsolada:
+    """Cria um worktree (repositorio git) ou uma copia scratch de `origem`."""
+    WORKTREES_DIR.mkdir(parents=True, exist_ok=True)
+    destino = (WORKTREES_DIR / nome).resolve()
+    if destino.exists():
+        remover_area(AreaIsolada(nome, destino, "scratch"))
+    raiz = raiz_git(origem)
+    if raiz is not None:
+        stash = _git(["stash", "create"], raiz).stdout.decode().strip()
+        base = stash or _git(["rev-parse", "HEAD"], raiz).stdout.decode().strip()
+        if base:
+            resultado = _git(["worktree", "add", "--detach", str(destino), base], raiz)
+            if resultado.returncode == 0:
+                subpasta = Path(origem).resolve().relative_to(raiz.resolve()).as_posix()
+                return AreaIsolada(nome, destino, "worktree", base, raiz, "" if subpasta == "." else subpasta)
+    shutil.copytree(origem, destino, ignore=_IGNORAR_COPIA, symlinks=True)
+    return AreaIsolada(nome, destino, "scratch")
+
+
+def gerar_patch(area: AreaIsolada, destino: Path) -> List[str]:
+    """Grava em `destino` o diff da area contra a base; devolve os arquivos alterados."""
+    if area.tipo != "worktree":
+        return []
+    _git(["add", "-A"], area.caminho)
+    arquivos = _git(["diff", "--cached", "--name-only", area.base], area.caminho).stdout.decode("utf-8", "replace")
+    alterados = [a for a in arquivos.splitlines() if a.strip()]
+    if alterados:
+        patch = _git(["diff", "--cached", "--binary", area.base], area.caminho).stdout
+        destino.write_bytes(patch)
+    return alterados
+
+
+def aplicar_patch(raiz: Path, patch: Path) -> str:
+    """`git apply` do patch na arvore principal; devolve "" ou a mensagem de erro."""
+    resultado = _git(["apply", "--whitespace=nowarn", str(patch)], raiz)
+    if resultado.returncode == 0:
+        return ""
+    return resultado.stderr.decode("utf-8", "replace").strip() or f"git apply exit {resultado.returncode}"
+
+
+def remover_area(area: AreaIsolada) -> None:
+    """Apaga a area (no caso de worktree, tambem o registro no git)."""
+    if area.tipo == "worktree" and area.raiz is not None:
+        _git(["worktree", "remove", "--force", str(area.caminho)], area.raiz)
+    if area.caminho.exists():
+        shutil.rmtree(area.caminho, ignore_errors=True)
+    if area.raiz is not None:
+        _git(["worktree", "prune"], area.raiz)
@@ -1,14 +1,24 @@
+import ast
+import asyncio
 import uuid
 import os
 import re
-import subprocess
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from skills.util_comuns import (
-    PROCESSOS_LOCK,
-    PROCESSOS_ATIVOS,
-    LOG_DIR,
+    cancelar_processo,
+    comando_gemini,
     get_project_structure
 )
+from skills._arquivo_logs import ARQUIVO, caminho_em_andamento
+from skills._cache_artefatos import ArtefatoMemoizado
+from skills._pool_gemini import POOL_GEMINI, POOL_ARGS, ErroRespostaGemini, WorkerIndisponivel
+from skills._cache_respostas import CACHE_GEMINI, chave_cache
+from skills._motor_async import MOTOR
+from skills._politica_execucao import POLITICA, CircuitoAberto
+from skills._streaming import ExecucaoStream, transmitir
+
+_STREAM_MAX_CHARS = int(os.getenv("GEMINI_STREAM_MAX_CHARS", "200000"))
 
 
 def _comando_direto_por_texto(query: str) -> str | None:
@@ -43,61 +53,263 @@ def _comando_direto_por_texto(query: str) -> str | None:
     )
 
 
-def _executar_gemini_cli(prompt: str, rid: str, proc_type: str) -> str:
-    input_log = LOG_DIR / f"{rid}_input.txt"
-    output_log = LOG_DIR / f"{rid}_output.txt"
-    input_log.write_text(prompt, encoding="utf-8")
-
-    # ==================================================================================
-    # CRITICAL ARCHITECTURAL COMPONENT: GEMINI CLI SUBPROCESS
-    #
-    # DO NOT REPLACE THIS BLOCK WITH DIRECT SDK CALLS (google.genai).
-    # ==================================================================================
-
-    command = ["gemini"]
-    if os.name == "nt":
-        command = ["gemini.cmd"]
-
-    proc = subprocess.Popen(
-        command,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        env=os.environ.copy()
-    )
-
-    with PROCESSOS_LOCK:
-        PROCESSOS_ATIVOS[rid] = {"proc": proc, "type": proc_type}
+def _consumir_pool(
+    prompt: str,
+    execucao: ExecucaoStream,
+    output_log: Path,
+    ao_receber: Optional[Callable[[str], None]],
+) -> None:
+    for linha in transmitir(POOL_GEMINI.executar(prompt, rid=execucao.rid), execucao, output_log):
+        if ao_receber:
+            ao_receber(linha)
 
-    stdout, stderr = proc.communicate(input=prompt)
 
-    with PROCESSOS_LOCK:
-        PROCESSOS_ATIVOS.pop(rid, None)
+# Configuracao que muda a resposta do CLI sem mudar o prompt: modelo/projeto via env e settings.json do CLI.
+_VARIAVEIS_CHAVE = [v.strip() for v in os.getenv(
+    "GEMINI_CACHE_ENV", "GEMINI_MODEL,GOOGLE_CLOUD_PROJECT,GOOGLE_CLOUD_LOCATION,GOOGLE_GENAI_USE_VERTEXAI"
+).split(",") if v.strip()]
 
-    if proc.returncode != 0:
-        return f"Erro no Gemini CLI: {stderr or f'Exit {proc.returncode}'}"
 
-    output_log.write_text(stdout.strip(), encoding="utf-8")
-    return stdout.strip()
+def _config_gemini() -> List[str]:
+    config = [*comando_gemini(), POOL_ARGS]
+    config += [f"{nome}={os.getenv(nome, '')}" for nome in _VARIAVEIS_CHAVE]
+    for settings in (Path.home() / ".gemini" / "settings.json", Path.cwd() / ".gemini" / "settings.json"):
+        try:
+            config.append(settings.read_text(encoding="utf-8", errors="replace"))
+        except OSError:
+            config.append("")
+    return config
+
+
+def _chave_cache(prompt: str) -> str:
+    return chave_cache(prompt, _config_gemini())
+
+
+def _responder_do_cache(
+    resposta: str,
+    execucao: ExecucaoStream,
+    output_log: Path,
+    ao_receber: Optional[Callable[[str], None]],
+) -> str:
+    for linha in transmitir(resposta.splitlines(), execucao, output_log):
+        if ao_receber:
+            ao_receber(linha)
+    execucao.cache_hit = True
+    execucao.returncode = 0
+    execucao.resultado = execucao.stdout.texto()
+    return execucao.resultado
+
+
+async def _gemini_cli_async(
+    prompt: str,
+    rid: str,
+    proc_type: str,
+    execucao: ExecucaoStream,
+    ao_receber: Optional[Callable[[str], None]] = None,
+    usar_cache: bool = False,
+) -> str:
+    output_log = caminho_em_andamento(rid, "output")
+    ARQUIVO.enfileirar(rid, "gemini", "input", prompt)
+    execucao.bytes_entrada = len(prompt.encode("utf-8"))
 
+    try:
+        chave = _chave_cache(prompt) if usar_cache and CACHE_GEMINI.ativo else None
+        if chave:
+            em_cache = CACHE_GEMINI.obter(chave)
+            if em_cache is not None:
+                return _responder_do_cache(em_cache, execucao, output_log, ao_receber)
 
-def gemini_cli_raw(prompt: str) -> str:
+        try:
+            resultado = await POLITICA.executar(
+                "gemini",
+                lambda prazo: _gemini_cli_sem_cache(prompt, rid, proc_type, execucao, output_log, ao_receber, prazo),
+                execucao,
+            )
+        except CircuitoAberto as e:
+            execucao.resultado = f"Erro no Gemini CLI: {e}"
+            return execucao.resultado
+        if chave and execucao.returncode == 0 and not execucao.timeout_expirado:
+            CACHE_GEMINI.gravar(chave, resultado, execucao.duracao or 0.0)
+        return resultado
+    finally:
+        ARQUIVO.enfileirar_arquivo(rid, "gemini", "output", output_log)
+
+
+async def _gemini_cli_sem_cache(
+    prompt: str,
+    rid: str,
+    proc_type: str,
+    execucao: ExecucaoStream,
+    output_log: Path,
+    ao_receber: Optional[Callable[[str], None]],
+    timeout: Optional[float] = None,
+) -> str:
+    async with MOTOR.limite():
+        if POOL_GEMINI.ativo():
+            leitura = asyncio.ensure_future(
+                asyncio.to_thread(_consumir_pool, prompt, execucao, output_log, ao_receber)
+            )
+            try:
+                pronto, _ = await asyncio.wait({leitura}, timeout=timeout)
+                if not pronto:
+                    # O worker fica registrado sob o rid; mata-lo encerra a thread de leitura.
+                    cancelar_processo(rid)
+                    leitura.add_done_callback(lambda f: f.cancelled() or f.exception())
+                    await asyncio.wait({leitura}, timeout=5)
+                    execucao.timeout_expirado = True
+                    execucao.resultado = f"Erro no Gemini CLI: timeout apos {timeout:.0f}s"
+                    return execucao.resultado
+                leitura.result()
+                execucao.returncode = 0
+                execucao.resultado = execucao.stdout.texto()
+                return execucao.resultado
+            except ErroRespostaGemini as e:
+                execucao.returncode = 1
+                execucao.stderr.adicionar(str(e))
+                execucao.resultado = f"Erro no Gemini CLI: {e}"
+                return execucao.resultado
+            except WorkerIndisponivel as e:
+                if execucao.ttfb is not None:
+                    raise
+                print(f"[BRAIN] Pool Gemini indisponivel ({e}). Usando spawn por chamada.")
+
+        # ==================================================================================
+        # CRITICAL ARCHITECTURAL COMPONENT: GEMINI CLI SUBPROCESS
+        #
+        # DO NOT REPLACE THIS BLOCK WITH DIRECT SDK CALLS (google.genai).
+        # ==================================================================================
+
+        proc = await MOTOR.criar_processo(comando_gemini())
+        await MOTOR.acompanhar(proc, prompt, execucao, output_log, rid, proc_type, timeout, ao_receber)
+
+    if execucao.timeout_expirado:
+        execucao.resultado = f"Erro no Gemini CLI: timeout apos {timeout:.0f}s"
+    elif execucao.returncode != 0:
+        execucao.resultado = f"Erro no Gemini CLI: {execucao.stderr.texto() or f'Exit {execucao.returncode}'}"
+    else:
+        execucao.resultado = execucao.stdout.texto()
+    return execucao.resultado
+
+
+# Gerador: devolve as linhas de stdout do Gemini CLI conforme chegam.
+# O resultado final (texto ou erro) fica em `execucao.resultado`.
+def _stream_gemini_cli(prompt: str, rid: str, proc_type: str, execucao: ExecucaoStream) -> Iterator[str]:
+    return MOTOR.gerar_linhas(lambda ao_receber: _gemini_cli_async(prompt, rid, proc_type, execucao, ao_receber))
+
+
+def _executar_gemini_cli(
+    prompt: str,
+    rid: str,
+    proc_type: str,
+    ao_receber: Optional[Callable[[str], None]] = None,
+    execucao: Optional[ExecucaoStream] = None,
+    usar_cache: bool = False,
+) -> str:
+    execucao = execucao or ExecucaoStream(rid, _STREAM_MAX_CHARS)
+    output = MOTOR.executar(_gemini_cli_async(prompt, rid, proc_type, execucao, ao_receber, usar_cache))
+    execucao.registrar("gemini")
+    return output
+
+
+async def gemini_cli_raw_async(
+    prompt: str,
+    ao_receber: Optional[Callable[[str], None]] = None,
+    rid: Optional[str] = None,
+    usar_cache: bool = False,
+) -> str:
     """
-    Tool: Executa o Gemini CLI com prompt bruto (pass-through), sem protocolo JSON.
+    Versao async de `gemini_cli_raw` (roda no loop do motor, ver skills/_motor_async.py).
+    `rid` opcional permite cancelar a chamada via `cancelar_processo(rid)`.
+    `usar_cache=True` reaproveita respostas do cache (skills/_cache_respostas.py); so para
+    chamadas idempotentes (classificacao de rota, resumos). Turnos de conversa pedem resposta nova.
     """
-    rid = str(uuid.uuid4())
+    rid = rid or str(uuid.uuid4())
     print(f"\n[BRAIN] Gemini raw: {rid}")
     try:
-        output = _executar_gemini_cli(prompt=prompt, rid=rid, proc_type="brain_raw")
-        print(f"[BRAIN] Gemini raw concluido: {rid}")
+        execucao = ExecucaoStream(rid, _STREAM_MAX_CHARS)
+        output = await _gemini_cli_async(prompt, rid, "brain_raw", execucao, ao_receber, usar_cache)
+        execucao.registrar("gemini")
+        origem = "cache" if execucao.cache_hit else "concluido"
+        print(f"[BRAIN] Gemini raw {origem}: {rid} ({execucao.metricas()})")
         return output
     except Exception as e:
         return f"Falha critica no Gemini CLI: {e}"
 
 
-def iniciar_raciocinio(query: str, context_level: str = "none") -> str:
+def gemini_cli_raw(
+    prompt: str,
+    ao_receber: Optional[Callable[[str], None]] = None,
+    usar_cache: bool = False,
+) -> str:
+    """
+    Tool: Executa o Gemini CLI com prompt bruto (pass-through), sem protocolo JSON.
+    Args:
+        prompt: Texto bruto a ser enviado ao Gemini CLI.
+        ao_receber: Callback opcional chamado a cada linha de saida (streaming).
+        usar_cache: True reaproveita a resposta do cache para o mesmo prompt/configuracao (padrao: chamada nova).
+    """
+    return MOTOR.executar(gemini_cli_raw_async(prompt, ao_receber, usar_cache=usar_cache))
+
+
+# --- INJECAO DINAMICA DE SKILLS ---
+# Linhas do resumo por arquivo, reaproveitadas enquanto (mtime, tamanho) nao mudar.
+_LINHAS_SKILLS: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+
+
+def _assinatura(entrada: os.DirEntry) -> Tuple[int, int]:
+    st = entrada.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _arquivos_skills() -> List[Tuple[str, int, int]]:
+    try:
+        with os.scandir("skills") as it:
+            arquivos = [
+                (e.name, *_assinatura(e)) for e in it
+                if e.name.endswith(".py") and not e.name.startswith("_") and e.name != "util_comuns.py"
+            ]
+    except OSError:
+        return []
+    return sorted(arquivos)
+
+
+def _linhas_skill(nome: str, assinatura: Tuple[int, int]) -> List[str]:
+    em_cache = _LINHAS_SKILLS.get(nome)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+    linhas = []
+    # Leitura simplificada para extrair defs
+    try:
+        content = (Path("skills") / nome).read_text(encoding="utf-8")
+        tree = ast.parse(content)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef):
+                if not node.name.startswith("_") and ast.get_docstring(node):
+                    doc = ast.get_docstring(node).split("\n")[0]
+                    linhas.append(f"- {node.name}(...): {doc} (em {nome})")
+    except Exception:
+        pass
+    _LINHAS_SKILLS[nome] = (assinatura, linhas)
+    return linhas
+
+
+def _listar_skills_disponiveis() -> str:
+    """Le os arquivos em skills/ e gera um resumo para o Brain (so reprocessa arquivos alterados)."""
+    arquivos = _arquivos_skills()
+    for nome in set(_LINHAS_SKILLS) - {n for n, _, _ in arquivos}:
+        _LINHAS_SKILLS.pop(nome, None)
+    return "\n".join(linha for nome, mtime, tamanho in arquivos for linha in _linhas_skill(nome, (mtime, tamanho)))
+
+
+# Resumo inteiro memoizado pelo stat de skills/*.py; o hot-reload do Jarvis tambem invalida.
+RESUMO_SKILLS = ArtefatoMemoizado("resumo de skills", lambda: tuple(_arquivos_skills()), _listar_skills_disponiveis)
+
+
+def invalidar_resumo_skills(*_: object) -> None:
+    RESUMO_SKILLS.invalidar()
+
+
+def iniciar_raciocinio(query: str, context_level: str = "none", usar_cache: bool = True) -> str:
     """Tool: Inicia raciocinio profundo e aguarda a conclusao (Sincrono via Gemini CLI)."""
     rid = str(uuid.uuid4())
     print(f"\n[BRAIN] Processando: {rid} (Context: {context_level})")
@@ -111,34 +323,8 @@ def iniciar_raciocinio(query: str, context_level: str = "none") -> str:
     elif context_level == "medium":
         ctx = f"FILES: {[f.name for f in Path('.').iterdir() if f.is_file()][:50]}"
 
-    # --- INJECAO DINAMICA DE SKILLS ---
-    def _listar_skills_disponiveis() -> str:
-        """Le os arquivos em skills/ e gera um resumo para o Brain."""
-        resumo = []
-        try:
-            skill_files = list(Path("skills").glob("*.py"))
-            for f in skill_files:
-                if f.name.startswith("_") or f.name == "util_comuns.py":
-                    continue
-
-                # Leitura simplificada para extrair defs
-                try:
-                    content = f.read_text(encoding="utf-8")
-                    import ast
-                    tree = ast.parse(content)
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef):
-                            if not node.name.startswith("_") and ast.get_docstring(node):
-                                doc = ast.get_docstring(node).split("\n")[0]
-                                resumo.append(f"- {node.name}(...): {doc} (em {f.name})")
-                except:
-                    pass
-        except Exception as e:
-            return f"Error listing skills: {e}"
-        return "\n".join(resumo)
-
     try:
-        skills_summary = _listar_skills_disponiveis()
+        skills_summary = RESUMO_SKILLS.obter()
 
         sys_inst = f"""
 <system_identity>
@@ -185,11 +371,11 @@ SPECIAL TOOL: `criar_skill(nome, codigo, descricao)`
 </objective>
 """
 
-        output = _executar_gemini_cli(prompt=sys_inst, rid=rid, proc_type="brain_sync")
+        output = _executar_gemini_cli(prompt=sys_inst, rid=rid, proc_type="brain_sync", usar_cache=usar_cache)
         if output.startswith("Erro no Gemini CLI"):
             return output
         print(f"[BRAIN] {rid} Concluido.")
-        return f"CONCLUSAO DO CEREBRO (Log: {LOG_DIR / f'{rid}_output.txt'}):\n\n{output}"
+        return f"CONCLUSAO DO CEREBRO (Log: python -m skills._arquivo_logs mostrar {rid}):\n\n{output}"
 
     except Exception as e:
         print(f"DEBUG EXCEPTION: {e}")
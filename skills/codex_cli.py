@@ -1,12 +1,19 @@
+import asyncio
 import os
 import subprocess
+import time
 import uuid
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from skills.util_comuns import PROCESSOS_ATIVOS, PROCESSOS_LOCK, LOG_DIR
+from skills._arquivo_logs import ARQUIVO, caminho_em_andamento
+from skills._motor_async import MOTOR
+from skills._politica_execucao import POLITICA, CircuitoAberto
+from skills._streaming import ExecucaoStream
+from skills import _worktrees as worktrees
 
 _MAX_OUTPUT_CHARS = 20000
+PARALELO_MAX = int(os.getenv("CODEX_PARALELO_MAX", "3"))
 
 
 def _truncate(text: str, max_chars: int = _MAX_OUTPUT_CHARS) -> str:
@@ -15,6 +22,10 @@ def _truncate(text: str, max_chars: int = _MAX_OUTPUT_CHARS) -> str:
     return f"{text[:max_chars]}\n\n[...TRUNCATED. TOTAL {len(text)} CHARS...]"
 
 
+def _comando_logs(rid: str) -> str:
+    return f"python -m skills._arquivo_logs mostrar {rid}"
+
+
 def _codex_command_candidates() -> List[str]:
     if os.name == "nt":
         return ["codex.cmd", "codex"]
@@ -73,95 +84,133 @@ def verificar_codex_cli() -> str:
     return "Codex CLI not found in PATH."
 
 
-def _run_codex_cli(
+async def _codex_cli_async(
     prompt: str,
+    execucao: ExecucaoStream,
     sandbox: str = "workspace-write",
     timeout_segundos: int = 900,
     modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
+    ao_receber_stderr: Optional[Callable[[str], None]] = None,
+    diretorio: Optional[Path] = None,
 ) -> str:
     sandboxes_validos = {"read-only", "workspace-write", "danger-full-access"}
     if sandbox not in sandboxes_validos:
-        return (
+        execucao.resultado = (
             "Sandbox invalido. Use um destes valores: "
             "read-only, workspace-write, danger-full-access."
         )
+        return execucao.resultado
 
     if not prompt or not prompt.strip():
-        return "O prompt para o Codex nao pode estar vazio."
+        execucao.resultado = "O prompt para o Codex nao pode estar vazio."
+        return execucao.resultado
 
     timeout_segundos = max(30, min(int(timeout_segundos), 3600))
-    rid = str(uuid.uuid4())
+    rid = execucao.rid
 
-    input_log = LOG_DIR / f"{rid}_codex_input.txt"
-    output_log = LOG_DIR / f"{rid}_codex_output.txt"
-    last_message_log = LOG_DIR / f"{rid}_codex_last_message.txt"
-    input_log.write_text(prompt, encoding="utf-8")
+    stream_log = caminho_em_andamento(rid, "codex_stream")
+    last_message_log = caminho_em_andamento(rid, "codex_last_message")
+    ARQUIVO.enfileirar(rid, "codex", "input", prompt)
+    execucao.bytes_entrada = len(prompt.encode("utf-8"))
+    try:
+        return await _executar_e_relatar(
+            prompt, execucao, sandbox, timeout_segundos, modelo, ao_receber, ao_receber_stderr,
+            diretorio, stream_log, last_message_log,
+        )
+    finally:
+        ARQUIVO.enfileirar_arquivo(rid, "codex", "stream", stream_log)
+        ARQUIVO.enfileirar_arquivo(rid, "codex", "last_message", last_message_log)
 
-    proc = None
-    command_used = ""
 
-    for command in _codex_command_candidates():
-        cmd = [
-            command,
-            "exec",
-            "--full-auto",
-            "--sandbox",
-            sandbox,
-            "--color",
-            "never",
-            "-C",
-            str(Path.cwd()),
-            "--output-last-message",
-            str(last_message_log),
-            "-",
-        ]
-        if modelo.strip():
-            cmd[2:2] = ["--model", modelo.strip()]
+async def _executar_e_relatar(
+    prompt: str,
+    execucao: ExecucaoStream,
+    sandbox: str,
+    timeout_segundos: int,
+    modelo: str,
+    ao_receber: Optional[Callable[[str], None]],
+    ao_receber_stderr: Optional[Callable[[str], None]],
+    diretorio: Optional[Path],
+    stream_log: Path,
+    last_message_log: Path,
+) -> str:
+    rid = execucao.rid
 
-        try:
-            proc = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                env=os.environ.copy(),
+    proc = None
+    command_used = ""
+    prazo = float(timeout_segundos)
+
+    async def _tentativa(prazo_tentativa: float) -> None:
+        nonlocal proc, command_used, prazo
+        proc, prazo = None, prazo_tentativa
+        async with MOTOR.limite():
+            for command in _codex_command_candidates():
+                cmd = [
+                    command,
+                    "exec",
+                    "--full-auto",
+                    "--sandbox",
+                    sandbox,
+                    "--color",
+                    "never",
+                    "-C",
+                    str(diretorio or Path.cwd()),
+                    "--output-last-message",
+                    str(last_message_log.resolve()),
+                    "-",
+                ]
+                if modelo.strip():
+                    cmd[2:2] = ["--model", modelo.strip()]
+
+                try:
+                    proc = await MOTOR.criar_processo(cmd)
+                    command_used = command
+                    break
+                except FileNotFoundError:
+                    continue
+
+            if proc is None:
+                raise FileNotFoundError("codex")
+
+            await MOTOR.acompanhar(
+                proc,
+                prompt,
+                execucao,
+                stream_log,
+                rid,
+                "codex_exec",
+                timeout=prazo_tentativa,
+                ao_receber=ao_receber,
+                ao_receber_stderr=ao_receber_stderr,
             )
-            command_used = command
-            break
-        except FileNotFoundError:
-            continue
-        except Exception as exc:
-            return f"Falha ao iniciar Codex CLI: {exc}"
-
-    if proc is None:
-        return "Codex CLI nao encontrado no PATH (tentativas: codex/codex.cmd)."
-
-    with PROCESSOS_LOCK:
-        PROCESSOS_ATIVOS[rid] = {"proc": proc, "type": "codex_exec"}
 
+    # timeout_segundos e o prazo de cada tentativa (nunca o aprendido), com retries e disjuntor.
     try:
-        stdout, stderr = proc.communicate(input=prompt, timeout=timeout_segundos)
-    except subprocess.TimeoutExpired:
-        proc.kill()
-        stdout, stderr = proc.communicate()
-        with PROCESSOS_LOCK:
-            PROCESSOS_ATIVOS.pop(rid, None)
+        await POLITICA.executar("codex", _tentativa, execucao, prazo_fixo=timeout_segundos)
+    except CircuitoAberto as exc:
+        execucao.resultado = f"Codex CLI indisponivel: {exc}"
+        return execucao.resultado
+    except FileNotFoundError:
+        execucao.resultado = "Codex CLI nao encontrado no PATH (tentativas: codex/codex.cmd)."
+        return execucao.resultado
+    except Exception as exc:
+        execucao.resultado = f"Falha ao iniciar Codex CLI: {exc}"
+        return execucao.resultado
+
+    stdout_clean = execucao.stdout.texto()
+    stderr_clean = execucao.stderr.texto()
+
+    if execucao.timeout_expirado:
         timeout_report = (
-            f"Codex CLI timeout apos {timeout_segundos}s.\n\n"
-            f"STDOUT:\n{_truncate((stdout or '').strip())}\n\n"
-            f"STDERR:\n{_truncate((stderr or '').strip())}"
+            f"Codex CLI timeout apos {prazo:.0f}s.\n\n"
+            f"STDOUT:\n{stdout_clean}\n\n"
+            f"STDERR:\n{stderr_clean}"
         )
-        output_log.write_text(timeout_report, encoding="utf-8")
-        return timeout_report
-    finally:
-        with PROCESSOS_LOCK:
-            PROCESSOS_ATIVOS.pop(rid, None)
+        ARQUIVO.enfileirar(rid, "codex", "output", timeout_report)
+        execucao.resultado = timeout_report
+        return execucao.resultado
 
-    stdout_clean = (stdout or "").strip()
-    stderr_clean = (stderr or "").strip()
     final_message = ""
 
     if last_message_log.exists():
@@ -169,6 +218,7 @@ def _run_codex_cli(
             final_message = last_message_log.read_text(encoding="utf-8").strip()
         except Exception:
             final_message = ""
+    execucao.mensagem_final = final_message
 
     report_parts = []
     if proc.returncode == 0:
@@ -179,28 +229,102 @@ def _run_codex_cli(
     if final_message:
         report_parts.append(f"FINAL MESSAGE:\n{_truncate(final_message)}")
     if stdout_clean:
-        report_parts.append(f"STDOUT:\n{_truncate(stdout_clean)}")
+        report_parts.append(f"STDOUT:\n{stdout_clean}")
     if stderr_clean:
-        report_parts.append(f"STDERR:\n{_truncate(stderr_clean)}")
+        report_parts.append(f"STDERR:\n{stderr_clean}")
 
     if len(report_parts) == 1:
         report_parts.append("Codex returned no output.")
 
-    report_parts.append(
-        f"LOGS: input={input_log.name}, output={output_log.name}, last={last_message_log.name}"
-    )
+    report_parts.append(f"LOGS: {_comando_logs(rid)} (input, output, stream, last_message)")
 
     final_report = "\n\n".join(report_parts)
-    output_log.write_text(final_report, encoding="utf-8")
+    ARQUIVO.enfileirar(rid, "codex", "output", final_report)
+    execucao.resultado = final_report
     return final_report
 
 
+# Gerador: devolve as linhas de stdout do Codex CLI conforme chegam.
+# O relatorio final fica em `execucao.resultado`.
+def _stream_codex_cli(
+    prompt: str,
+    execucao: ExecucaoStream,
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    ao_receber_stderr: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    return MOTOR.gerar_linhas(
+        lambda ao_receber: _codex_cli_async(
+            prompt, execucao, sandbox, timeout_segundos, modelo, ao_receber, ao_receber_stderr
+        )
+    )
+
+
+async def _run_codex_cli_async(
+    prompt: str,
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
+) -> str:
+    execucao = ExecucaoStream(str(uuid.uuid4()), _MAX_OUTPUT_CHARS)
+    resultado = await _codex_cli_async(
+        prompt, execucao, sandbox, timeout_segundos, modelo, ao_receber, ao_receber
+    )
+    if execucao.returncode is not None:
+        execucao.registrar("codex")
+        print(f"[CODEX] {execucao.rid} concluido ({execucao.metricas()})")
+    return resultado
+
+
+def _run_codex_cli(
+    prompt: str,
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
+) -> str:
+    return MOTOR.executar(_run_codex_cli_async(prompt, sandbox, timeout_segundos, modelo, ao_receber))
+
+
+async def executar_codex_cli_async(
+    tarefa: str,
+    contexto: str = "",
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Versao async de `executar_codex_cli` (roda no loop do motor, ver skills/_motor_async.py).
+    """
+    if not tarefa or not tarefa.strip():
+        return "A tarefa para o Codex nao pode estar vazia."
+    prompt = _build_codex_prompt(tarefa, contexto)
+    return await _run_codex_cli_async(prompt, sandbox, timeout_segundos, modelo, ao_receber)
+
+
+async def executar_codex_cli_raw_async(
+    prompt: str,
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Versao async de `executar_codex_cli_raw` (roda no loop do motor).
+    """
+    return await _run_codex_cli_async(prompt, sandbox, timeout_segundos, modelo, ao_receber)
+
+
 def executar_codex_cli(
     tarefa: str,
     contexto: str = "",
     sandbox: str = "workspace-write",
     timeout_segundos: int = 900,
     modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Tool: Delega uma tarefa para o Codex CLI em modo nao interativo (sessao nova por chamada).
@@ -210,6 +334,7 @@ def executar_codex_cli(
         sandbox: read-only, workspace-write, ou danger-full-access.
         timeout_segundos: Timeout total da execucao.
         modelo: Modelo opcional para o Codex CLI (ex: gpt-5-codex).
+        ao_receber: Callback opcional chamado a cada linha de saida (streaming).
     """
     if not tarefa or not tarefa.strip():
         return "A tarefa para o Codex nao pode estar vazia."
@@ -219,6 +344,7 @@ def executar_codex_cli(
         sandbox=sandbox,
         timeout_segundos=timeout_segundos,
         modelo=modelo,
+        ao_receber=ao_receber,
     )
 
 
@@ -227,6 +353,7 @@ def executar_codex_cli_raw(
     sandbox: str = "workspace-write",
     timeout_segundos: int = 900,
     modelo: str = "",
+    ao_receber: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Tool: Executa o Codex CLI com prompt bruto (pass-through), sem preambulo.
@@ -235,10 +362,165 @@ def executar_codex_cli_raw(
         sandbox: read-only, workspace-write, ou danger-full-access.
         timeout_segundos: Timeout total da execucao.
         modelo: Modelo opcional para o Codex CLI (ex: gpt-5-codex).
+        ao_receber: Callback opcional chamado a cada linha de saida (streaming).
     """
     return _run_codex_cli(
         prompt=prompt,
         sandbox=sandbox,
         timeout_segundos=timeout_segundos,
         modelo=modelo,
+        ao_receber=ao_receber,
+    )
+
+
+# --- FAN-OUT PARALELO ---
+# Aceita lista de strings ou de dicts {"tarefa", "contexto"}; uma string vira uma tarefa por linha.
+def _normalizar_tarefas(tarefas: Any) -> List[Dict[str, str]]:
+    if isinstance(tarefas, str):
+        tarefas = [linha for linha in tarefas.splitlines() if linha.strip()]
+    normalizadas = []
+    for item in tarefas or []:
+        if isinstance(item, dict):
+            tarefa, contexto = str(item.get("tarefa", "")), str(item.get("contexto", ""))
+        else:
+            tarefa, contexto = str(item), ""
+        if tarefa.strip():
+            normalizadas.append({"tarefa": tarefa.strip(), "contexto": contexto})
+    return normalizadas
+
+
+async def _executar_subtarefa(
+    indice: int,
+    item: Dict[str, str],
+    area: worktrees.AreaIsolada,
+    contexto: str,
+    sandbox: str,
+    timeout_segundos: int,
+    modelo: str,
+    vagas: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    execucao = ExecucaoStream(area.nome, _MAX_OUTPUT_CHARS)
+    contexto_tarefa = "\n\n".join(c for c in (contexto.strip(), item["contexto"].strip()) if c)
+    async with vagas:
+        inicio = time.perf_counter()
+        relatorio = await _codex_cli_async(
+            _build_codex_prompt(item["tarefa"], contexto_tarefa),
+            execucao,
+            sandbox,
+            timeout_segundos,
+            modelo,
+            diretorio=area.diretorio_trabalho,
+        )
+        duracao = time.perf_counter() - inicio
+    if execucao.returncode is not None:
+        execucao.registrar("codex_paralelo")
+
+    # Temporario em em_andamento/: usado pelo `git apply` e arquivado (parte "patch") ao fim do lote.
+    patch = caminho_em_andamento(execucao.rid, "patch")
+    alterados = await asyncio.to_thread(worktrees.gerar_patch, area, patch)
+    return {
+        "indice": indice,
+        "tarefa": item["tarefa"],
+        "area": area,
+        "ok": execucao.returncode == 0 and not execucao.timeout_expirado,
+        "exit": "timeout" if execucao.timeout_expirado else execucao.returncode,
+        "duracao": duracao,
+        "final": execucao.mensagem_final or relatorio,
+        "alterados": alterados,
+        "patch": patch if alterados else None,
+        "log": execucao.rid,
+    }
+
+
+def _relatorio_paralelo(resultados: List[Dict[str, Any]], parede: float, aplicar: bool) -> str:
+    soma = sum(r["duracao"] for r in resultados)
+    ok = sum(1 for r in resultados if r["ok"])
+    cabecalho = (
+        f"Codex paralelo: {len(resultados)} tarefas, {ok} ok, {len(resultados) - ok} com falha | "
+        f"parede {parede:.1f}s (soma {soma:.1f}s, {soma / parede if parede else 1:.1f}x)"
+    )
+    finais, detalhes = [], []
+    for r in resultados:
+        titulo = r["tarefa"].splitlines()[0][:80]
+        finais.append(f"### Tarefa {r['indice']}: {titulo}\n{_truncate(r['final'], _MAX_OUTPUT_CHARS // len(resultados))}")
+        linha = f"- tarefa {r['indice']}: exit {r['exit']} em {r['duracao']:.1f}s | {r['area']!r} | rid={r['log']}"
+        if r["patch"] is not None:
+            linha += f" | patch: {_comando_logs(r['log'])} --parte patch ({len(r['alterados'])} arquivos)"
+            if aplicar:
+                linha += f" | aplicado: {r.get('aplicado') or 'sim'}"
+        elif r["area"].tipo == "worktree":
+            linha += " | sem alteracoes"
+        detalhes.append(linha)
+    detalhes.append(f"(conteudo arquivado: {_comando_logs('<rid>')})")
+    return "\n\n".join([cabecalho, "FINAL MESSAGE:\n" + "\n\n".join(finais), "LOGS:\n" + "\n".join(detalhes)])
+
+
+async def executar_codex_paralelo_async(
+    tarefas: list,
+    contexto: str = "",
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    max_paralelo: int = 0,
+    aplicar: bool = False,
+) -> str:
+    """
+    Versao async de `executar_codex_paralelo` (roda no loop do motor).
+    """
+    itens = _normalizar_tarefas(tarefas)
+    if not itens:
+        return "A lista de tarefas para o Codex nao pode estar vazia."
+    lote = uuid.uuid4().hex[:8]
+    origem = Path.cwd()
+    areas: List[worktrees.AreaIsolada] = []
+    try:
+        for i in range(len(itens)):
+            areas.append(await asyncio.to_thread(worktrees.criar_area, origem, f"codex-{lote}-{i + 1}"))
+        vagas = asyncio.Semaphore(max(1, max_paralelo or PARALELO_MAX))
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*[
+            _executar_subtarefa(i + 1, item, area, contexto, sandbox, timeout_segundos, modelo, vagas)
+            for i, (item, area) in enumerate(zip(itens, areas))
+        ])
+        parede = time.perf_counter() - inicio
+        if aplicar:
+            for r in resultados:
+                if r["patch"] is not None and r["area"].raiz is not None:
+                    erro = await asyncio.to_thread(worktrees.aplicar_patch, r["area"].raiz, r["patch"])
+                    r["aplicado"] = f"falhou ({erro.splitlines()[0]})" if erro else ""
+    finally:
+        for area in areas:
+            if area.tipo == "worktree":
+                await asyncio.to_thread(worktrees.remover_area, area)
+    for r in resultados:
+        if r["patch"] is not None:
+            ARQUIVO.enfileirar_arquivo(r["log"], "codex", "patch", r["patch"])
+    relatorio = _relatorio_paralelo(list(resultados), parede, aplicar)
+    ARQUIVO.enfileirar(f"codex-{lote}", "codex_paralelo", "relatorio", relatorio)
+    print(f"[CODEX] lote {lote}: {len(itens)} tarefas em {parede:.1f}s")
+    return relatorio
+
+
+def executar_codex_paralelo(
+    tarefas: list,
+    contexto: str = "",
+    sandbox: str = "workspace-write",
+    timeout_segundos: int = 900,
+    modelo: str = "",
+    max_paralelo: int = 0,
+    aplicar: bool = False,
+) -> str:
+    """
+    Tool: Executa varias tarefas independentes do Codex CLI ao mesmo tempo, cada uma numa copia isolada do repositorio (git worktree ou pasta scratch), e junta as FINAL MESSAGE num relatorio.
+    Args:
+        tarefas: Lista de tarefas independentes (strings ou {"tarefa": ..., "contexto": ...}).
+        contexto: Contexto comum a todas as tarefas.
+        sandbox: read-only, workspace-write, ou danger-full-access.
+        timeout_segundos: Timeout de cada sessao.
+        modelo: Modelo opcional para o Codex CLI (ex: gpt-5-codex).
+        max_paralelo: Sessoes simultaneas (0 = CODEX_PARALELO_MAX).
+        aplicar: Se True, aplica os patches gerados na arvore principal com git apply.
+    """
+    return MOTOR.executar(
+        executar_codex_paralelo_async(tarefas, contexto, sandbox, timeout_segundos, modelo, max_paralelo, aplicar)
     )
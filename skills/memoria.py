@@ -1,12 +1,25 @@
 import os
 import glob
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
+from skills._escritor_logs import ESCRITOR
+from skills._indice_memoria import IndiceMemoria
+from skills._recall_memoria import RecallMemoria
+from skills._store_memoria import StoreMemoria
+
 # Define the memory directory relative to the current working directory
 MEMORIA_DIR = Path("memoria")
 
+# SQLite (WAL) source of truth; memoria/*.md is the exported view (see skills/_store_memoria.py)
+STORE_MEMORIA = StoreMemoria(MEMORIA_DIR, escritor=ESCRITOR)
+
+# Incremental BM25 index over the "### timestamp" entries (see skills/_indice_memoria.py)
+INDICE_MEMORIA = IndiceMemoria(MEMORIA_DIR)
+
+# Hashed-vector recall injected into routed prompts (see skills/_recall_memoria.py)
+RECALL_MEMORIA = RecallMemoria(INDICE_MEMORIA)
+
 def _validate_memoria_path(filename: str) -> Optional[Path]:
     """
     Validates that the filename results in a path inside the memoria directory.
@@ -43,17 +56,15 @@ def memorizar(conteudo: str, topico: str = "geral") -> str:
     if not path:
         return f"❌ Erro: Tópico '{topico}' inválido."
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    entry = f"\n### {timestamp}\n{conteudo}\n"
-    
     try:
-        if not MEMORIA_DIR.exists():
-            MEMORIA_DIR.mkdir(parents=True)
-            
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(entry)
-            
-        return f"✅ Informação salva em 'memoria/{path.name}'."
+        entry_id, nova = STORE_MEMORIA.adicionar(path, conteudo)
+        if not nova:
+            return f"ℹ️ Informação já existe em 'memoria/{path.name}' (id {entry_id})."
+
+        # Markdown append and index update run on the background log writer (see skills/_escritor_logs.py)
+        ESCRITOR.executar(lambda: INDICE_MEMORIA.atualizar(path))
+
+        return f"✅ Informação salva em 'memoria/{path.name}' (id {entry_id})."
     except Exception as e:
         return f"❌ Erro ao salvar memória: {e}"
 
@@ -71,11 +82,11 @@ def consultar_memoria(topico: str) -> str:
     if not path:
         return f"❌ Erro: Tópico '{topico}' inválido."
         
-    if not path.exists():
-        return f"ℹ️ Nenhuma memória encontrada para o tópico '{topico}'."
-        
     try:
-        return path.read_text(encoding="utf-8")
+        conteudo = STORE_MEMORIA.topico(path.stem)
+        if conteudo is None:
+            return f"ℹ️ Nenhuma memória encontrada para o tópico '{topico}'."
+        return conteudo
     except Exception as e:
         return f"❌ Erro ao ler memória: {e}"
 
@@ -90,11 +101,60 @@ def listar_topicos() -> str:
         return "ℹ️ O diretório de memória ainda não existe."
         
     try:
-        files = list(MEMORIA_DIR.glob("*.md"))
-        if not files:
+        topicos = STORE_MEMORIA.topicos()
+        if not topicos:
             return "ℹ️ Nenhum tópico encontrado na memória."
             
-        topicos = [f.stem for f in files]
-        return f"📂 Tópicos de Memória:\n" + "\n".join([f"- {t}" for t in topicos])
+        return f"📂 Tópicos de Memória:\n" + "\n".join([f"- {t} ({n})" for t, n in topicos.items()])
     except Exception as e:
         return f"❌ Erro ao listar tópicos: {e}"
+
+def buscar_memoria(query: str, k: int = 5) -> str:
+    """
+    Busca fatos em todos os tópicos da memória (índice BM25), sem carregar os arquivos inteiros.
+    
+    Args:
+        query: Termos a procurar.
+        k: Número máximo de entradas retornadas. Padrão: 5.
+    
+    Returns:
+        As k entradas "### timestamp" mais relevantes, com tópico e score.
+    """
+    if not MEMORIA_DIR.exists():
+        return "ℹ️ O diretório de memória ainda não existe."
+
+    try:
+        ESCRITOR.esperar(10.0)
+        resultados = INDICE_MEMORIA.buscar(query, max(1, int(k)))
+        if not resultados:
+            return f"ℹ️ Nada encontrado na memória para '{query}'."
+
+        blocos = []
+        for score, arquivo, entrada in resultados:
+            texto = INDICE_MEMORIA.ler(arquivo, entrada)
+            blocos.append(f"[{Path(arquivo).stem}] (score {score:.2f})\n{texto}")
+        total = INDICE_MEMORIA.total_entradas()
+        return f"🔎 {len(blocos)} de {total} entradas para '{query}':\n\n" + "\n\n".join(blocos)
+    except Exception as e:
+        return f"❌ Erro ao buscar na memória: {e}"
+
+def compactar_memoria() -> str:
+    """
+    Compacta a memória: reimporta edições manuais dos .md, regrava os tópicos divergentes e faz checkpoint do banco.
+    
+    Returns:
+        Resumo da compactação.
+    """
+    if not MEMORIA_DIR.exists():
+        return "ℹ️ O diretório de memória ainda não existe."
+
+    try:
+        ESCRITOR.esperar(10.0)
+        resultado = STORE_MEMORIA.compactar()
+        INDICE_MEMORIA.sincronizar()
+        return (
+            f"🧹 Memória compactada: {resultado['importadas']} entradas importadas dos .md, "
+            f"{resultado['reexportados']} tópicos regravados."
+        )
+    except Exception as e:
+        return f"❌ Erro ao compactar memória: {e}"
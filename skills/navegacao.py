@@ -1,19 +1,26 @@
 ﻿import asyncio
-import requests
-from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler
+import time
+from typing import List
 
-_USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/120.0.0.0 Safari/537.36"
-)
+from skills._extrator_html import extrair_markdown
+from skills._http import HTTP, USER_AGENT
+from skills._motor_async import MOTOR
+from skills._pool_navegador import POOL_NAVEGADOR
 
+_MAX_CHARS = 40000
+_MIN_CHARS_POR_PAGINA = 4000
 
-def _fallback_request(url: str, tipo_extracao: str) -> str:
-    headers = {"User-Agent": _USER_AGENT}
+
+def _truncar(texto: str, limite: int) -> str:
+    if len(texto) > limite:
+        return f"{texto[:limite]}\n\n[...CONTEUDO TRUNCADO (Total: {len(texto)} chars)...]"
+    return texto
+
+
+def _fallback_request(url: str, tipo_extracao: str, limite: int = _MAX_CHARS) -> str:
+    headers = {"User-Agent": USER_AGENT}
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = HTTP.get(url, headers=headers, timeout=15)
         response.raise_for_status()
     except Exception as e:
         return f"âŒ Fallback HTTP falhou para {url}: {str(e)}"
@@ -21,13 +28,16 @@ def _fallback_request(url: str, tipo_extracao: str) -> str:
     if tipo_extracao == "raw_html":
         return response.text
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.get_text(strip=True) if soup.title else ""
-    text = " ".join(soup.get_text(" ", strip=True).split())
-    if len(text) > 40000:
-        text = f"{text[:40000]}\n\n[...CONTEUDO TRUNCADO (Total: {len(text)} chars)...]"
-    if title:
-        return f"# {title}\n\n{text}"
+    # Parse incremental: para no fim do <main> ou ao atingir o limite, sem ler o resto do HTML.
+    extracao = extrair_markdown(response.text, limite)
+    text = extracao.texto
+    if extracao.truncado:
+        text += (
+            f"\n\n[...CONTEUDO TRUNCADO (limite: {limite} chars; "
+            f"{extracao.lidos} de {len(response.text)} chars de HTML lidos)...]"
+        )
+    if extracao.titulo:
+        return f"# {extracao.titulo}\n\n{text}"
     return text
 
 
@@ -40,34 +50,52 @@ def navegar_web(url: str, tipo_extracao: str = "markdown") -> str:
     Returns:
         Texto contendo o conteÃºdo da pÃ¡gina ou mensagem de erro.
     """
-    async def _run_crawler():
-        # Inicializa o crawler com modo verbose para logs (opcional)
-        # O crawl4ai gerencia o ciclo de vida do navegador internamente no context manager
-        async with AsyncWebCrawler(verbose=True) as crawler:
-            result = await crawler.arun(url=url)
-
-            if not result.success:
-                fallback = _fallback_request(url, tipo_extracao)
-                return (
-                    f"âŒ Falha ao acessar {url}: {result.error_message}\n\n"
-                    f"{fallback}"
-                )
-
-            if tipo_extracao == "raw_html":
-                return result.html
-
-            # Retorna o markdown.
-            # Trunca se for muito grande para evitar estourar limites de contexto
-            # O limite de 40k caracteres Ã© razoÃ¡vel para processamento posterior
-            conteudo = result.markdown
-            if len(conteudo) > 40000:
-                return f"{conteudo[:40000]}\n\n[...CONTEUDO TRUNCADO (Total: {len(conteudo)} chars)...]"
-            return conteudo
+    return MOTOR.executar(_navegar_async(url, tipo_extracao))
+
+
+def navegar_varias(urls: list, tipo_extracao: str = "markdown") -> str:
+    """
+    Acessa varias URLs em paralelo reutilizando o mesmo navegador (abas do pool) e junta o conteudo.
+    Args:
+        urls: Lista de enderecos web completos (ou um texto com uma URL por linha).
+        tipo_extracao: 'markdown' (padrao) ou 'raw_html'.
+    Returns:
+        Conteudo de cada pagina sob um titulo com a URL (ou a mensagem de erro dela).
+    """
+    if isinstance(urls, str):
+        urls = urls.split()
+    unicas = list(dict.fromkeys(str(u).strip() for u in urls or [] if str(u).strip()))
+    if not unicas:
+        return "âŒ Nenhuma URL informada."
+    return MOTOR.executar(_navegar_varias_async(unicas, tipo_extracao))
+
 
+async def _navegar_async(url: str, tipo_extracao: str, limite: int = _MAX_CHARS) -> str:
     try:
-        # asyncio.run() cria um novo event loop, executa a corrotina e fecha o loop.
-        # Isso Ã© seguro pois jarvis.py Ã© sÃ­ncrono e nÃ£o tem um loop rodando na main thread.
-        return asyncio.run(_run_crawler())
+        result = await POOL_NAVEGADOR.navegar(url)
     except Exception as e:
-        fallback = _fallback_request(url, tipo_extracao)
+        fallback = await asyncio.to_thread(_fallback_request, url, tipo_extracao, limite)
         return f"âŒ Erro sistemico ao navegar: {str(e)}\n\n{fallback}"
+
+    if not result.success:
+        fallback = await asyncio.to_thread(_fallback_request, url, tipo_extracao, limite)
+        return (
+            f"âŒ Falha ao acessar {url}: {result.error_message}\n\n"
+            f"{fallback}"
+        )
+
+    if tipo_extracao == "raw_html":
+        return result.html
+
+    # Trunca se for muito grande para evitar estourar limites de contexto
+    return _truncar(str(result.markdown or ""), limite)
+
+
+async def _navegar_varias_async(urls: List[str], tipo_extracao: str) -> str:
+    # O limite de contexto e dividido entre as paginas; a concorrencia e a do pool (NAVEGADOR_MAX_ABAS).
+    limite = max(_MIN_CHARS_POR_PAGINA, _MAX_CHARS // len(urls))
+    inicio = time.perf_counter()
+    conteudos = await asyncio.gather(*[_navegar_async(url, tipo_extracao, limite) for url in urls])
+    duracao = time.perf_counter() - inicio
+    blocos = [f"## {url}\n\n{conteudo}" for url, conteudo in zip(urls, conteudos)]
+    return f"{len(urls)} paginas em {duracao:.1f}s\n\n" + "\n\n".join(blocos)
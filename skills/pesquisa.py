@@ -1,31 +1,43 @@
-﻿import requests
-from bs4 import BeautifulSoup
+﻿from typing import Dict, Optional
 
-_USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/120.0.0.0 Safari/537.36"
-)
+from skills._extrator_html import coletar_elementos
+from skills._http import HTTP, USER_AGENT
+
+
+# Seletores do parse incremental (skills/_extrator_html.py): tipo do elemento ou None.
+def _seletor_ddg(tag: str, attrs: Dict[str, str]) -> Optional[str]:
+    classes = attrs.get("class", "").split()
+    if tag == "a" and "result__a" in classes:
+        return "titulo"
+    if "result__snippet" in classes:
+        return "resumo"
+    if tag == "div" and "result" in classes:
+        return "bloco"
+    return None
+
+
+def _seletor_ddg_lite(tag: str, attrs: Dict[str, str]) -> Optional[str]:
+    if tag == "a" and "nofollow" in attrs.get("rel", "").split():
+        return "link"
+    return None
 
 
 def _buscar_ddg_lite(query: str, max_results: int = 5) -> str:
     url = "https://lite.duckduckgo.com/lite/"
-    headers = {"User-Agent": _USER_AGENT}
+    headers = {"User-Agent": USER_AGENT}
     try:
-        response = requests.get(url, params={"q": query}, headers=headers, timeout=15)
+        response = HTTP.get(url, params={"q": query}, headers=headers, timeout=15)
         response.raise_for_status()
     except Exception as e:
         return f"Erro ao acessar DuckDuckGo Lite: {str(e)}"
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    links = soup.find_all("a", rel="nofollow", limit=max_results * 2)
+    links = coletar_elementos(response.text, _seletor_ddg_lite, {"link": max_results * 2})
 
     formatted_output = [f"Resultados para: '{query}' (fallback DDG Lite)\n"]
     count = 0
 
-    for link in links:
-        title = link.get_text(strip=True)
-        href = link.get("href", "")
+    for _, attrs, title in links:
+        href = attrs.get("href", "")
         if not title or not href:
             continue
 
@@ -60,58 +72,44 @@ def pesquisar_web(query: str, max_results: int = 5) -> str:
     data = {'q': query}
     # Headers simulando um navegador real para evitar bloqueio
     headers = {
-        'User-Agent': _USER_AGENT,
+        'User-Agent': USER_AGENT,
         'Referer': 'https://html.duckduckgo.com/',
         'Origin': 'https://html.duckduckgo.com',
         'Content-Type': 'application/x-www-form-urlencoded'
     }
 
     try:
-        response = requests.post(url, data=data, headers=headers, timeout=15)
+        response = HTTP.post(url, data=data, headers=headers, timeout=15)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
         formatted_output = [f"Resultados para: '{query}'\n"]
 
-        # Encontra os blocos de resultado
-        # Estrutura comum do DDG HTML: div.result
-        results_divs = soup.find_all('div', class_='result', limit=max_results)
-
-        if not results_divs:
-            # Fallback: Tenta achar apenas os links se a estrutura mudou
-            links = soup.find_all('a', class_='result__a', limit=max_results)
-            if not links:
-                if "No results" in response.text:
-                    return f"Nenhum resultado encontrado para: '{query}'."
-                if "captcha" in response.text.lower() or "verify" in response.text.lower():
-                    return _buscar_ddg_lite(query, max_results=max_results)
-                return "Erro: Estrutura da pÃ¡gina desconhecida ou bloqueio (Captcha)."
+        # Estrutura comum do DDG HTML: div.result > a.result__a (titulo/link) + a.result__snippet.
+        # O parse para no titulo seguinte ao ultimo resultado pedido.
+        itens = coletar_elementos(response.text, _seletor_ddg, {"titulo": max_results + 1})
+        resultados = []
+        for tipo, attrs, texto in itens:
+            if tipo == "titulo":
+                resultados.append([texto, attrs.get('href', ''), None])
+            elif tipo == "resumo" and resultados and resultados[-1][2] is None:
+                resultados[-1][2] = texto
+
+        if not resultados and not any(tipo == "bloco" for tipo, _, _ in itens):
+            if "No results" in response.text:
+                return f"Nenhum resultado encontrado para: '{query}'."
+            if "captcha" in response.text.lower() or "verify" in response.text.lower():
+                return _buscar_ddg_lite(query, max_results=max_results)
+            return "Erro: Estrutura da pÃ¡gina desconhecida ou bloqueio (Captcha)."
 
         count = 0
-        for div in results_divs:
-            # TÃ­tulo e Link
-            link_tag = div.find('a', class_='result__a')
-            if not link_tag:
-                continue
-
-            title = link_tag.get_text(strip=True)
-            href = link_tag.get('href', '')
-
-            # Snippet
-            snippet_tag = div.find('a', class_='result__snippet')
-            snippet = snippet_tag.get_text(strip=True) if snippet_tag else "Resumo indisponivel"
-
+        for title, href, snippet in resultados[:max_results]:
             count += 1
             formatted_output.append(
                 f"{count}. {title}\n"
                 f"   URL: {href}\n"
-                f"   Resumo: {snippet}\n"
+                f"   Resumo: {snippet or 'Resumo indisponivel'}\n"
             )
 
-            if count >= max_results:
-                break
-
         if count == 0:
             # Caso tenha achado divs mas nÃ£o links (estranho, mas possÃ­vel)
             return _buscar_ddg_lite(query, max_results=max_results)
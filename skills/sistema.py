@@ -1,54 +1,98 @@
-import subprocess
+import re
 import sys
 import importlib.util
 import inspect
 from skills.util_comuns import (
-    PROCESSOS_LOCK,
-    PROCESSOS_ATIVOS,
     SKILLS_DIR,
     validate_path,
     get_project_structure
 )
+from skills._jobs import JOBS, LimiteJobs
+from skills import _leitor_arquivos as leitor
+from skills import _terminal as terminal
 
 # --- FERRAMENTAS DE SISTEMA ---
 
-def executar_comando_terminal(comando: str) -> str:
-    """Tool: Executa comandos síncronos."""
+def executar_comando_terminal(comando: str, timeout_segundos: int = 0, max_bytes_saida: int = 0) -> str:
+    """Tool: Executa comandos síncronos com limite de tempo e de saída (mata o grupo de processos ao estourar). Devolve EXIT, STDOUT/STDERR (início+fim) e TEMPOS (spawn, primeira saída, término)."""
     print(f"\n[⚙️ EXEC SYNC] {comando}")
     try:
-        resultado = subprocess.run(comando, shell=True, text=True, capture_output=True, encoding='utf-8')
-        output = f"EXIT: {resultado.returncode}\nSTDOUT: {resultado.stdout}\nSTDERR: {resultado.stderr}"
-        return output
+        resultado = terminal.executar_comando(
+            comando,
+            timeout_segundos if timeout_segundos > 0 else terminal.TIMEOUT_PADRAO,
+            max_bytes_saida if max_bytes_saida > 0 else terminal.MAX_BYTES_PADRAO,
+        )
+        return resultado.formatar()
     except Exception as e: return f"❌ EXCEPTION: {e}"
 
 def executar_processo_background(comando: str) -> str:
-    """Tool: Inicia processos de longa duração."""
+    """Tool: Inicia processos de longa duração como job (acompanhe com status_job/tail_job, encerre com cancelar_job)."""
     print(f"\n[🚀 START ASYNC] {comando}")
     try:
-        proc = subprocess.Popen(comando, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8')
-        pid = str(proc.pid)
-        with PROCESSOS_LOCK:
-            PROCESSOS_ATIVOS[pid] = {"proc": proc, "cmd": comando, "type": "background"}
-        return f"✅ PID {pid} iniciado."
+        # Job no motor async: saida drenada para log rotativo, grupo de processos proprio.
+        job = JOBS.iniciar(comando)
+        return f"✅ {job.id} (PID {job.pid}) iniciado. Log: {job.log.caminho}"
+    except LimiteJobs as e: return f"⚠️ {e}"
     except Exception as e: return f"❌ ERRO: {e}"
 
-def ler_arquivo(caminho: str) -> str:
-    """Tool: Lê arquivo texto."""
+def status_job(job_id: str = "") -> str:
+    """Tool: Status de um job em background (id 'job-N' ou PID) ou de todos, com CPU/RSS amostrados."""
+    if job_id:
+        job = JOBS.obter(job_id)
+        return job.resumo() if job else f"❌ Job '{job_id}' não encontrado."
+    jobs = JOBS.jobs()
+    if not jobs: return "ℹ️ Nenhum job iniciado nesta sessão."
+    ativos = sum(1 for j in jobs if j.ativo)
+    return f"📋 {ativos} em execução (limite {JOBS.max_concorrentes}):\n" + "\n".join(j.resumo() for j in jobs)
+
+def tail_job(job_id: str, linhas: int = 50) -> str:
+    """Tool: Últimas linhas da saída (stdout+stderr) de um job em background."""
+    job = JOBS.obter(job_id)
+    if not job: return f"❌ Job '{job_id}' não encontrado."
+    return f"{job.id} {job.estado()} (log completo: {job.log.caminho}):\n{JOBS.tail(job, linhas)}"
+
+def cancelar_job(job_id: str) -> str:
+    """Tool: Encerra um job em background e todo o seu grupo de processos."""
+    job = JOBS.obter(job_id)
+    if not job: return f"❌ Job '{job_id}' não encontrado."
+    if not JOBS.cancelar(job): return f"ℹ️ {job.id} já havia terminado ({job.estado()})."
+    return f"🛑 {job.id} {job.estado()}."
+
+def ler_arquivo(
+    caminho: str,
+    linha_inicio: int = 0,
+    linha_fim: int = 0,
+    cauda: int = 0,
+    grep: str = "",
+    byte_inicio: int = 0,
+    byte_fim: int = 0,
+    max_bytes: int = 0,
+) -> str:
+    """Tool: Lê arquivo texto sem carregá-lo inteiro (mmap). Por padrão devolve o início até o limite de bytes; linha_inicio/linha_fim (1-based) leem uma faixa de linhas, cauda=N as últimas N linhas, grep=regex as linhas que casam, byte_inicio/byte_fim uma faixa de bytes."""
     p = validate_path(caminho)
-    if not p or not p.exists(): return "❌ Arquivo inexistente."
-    return p.read_text(encoding='utf-8')
+    if not p or not p.is_file(): return "❌ Arquivo inexistente."
+    limite = max_bytes if max_bytes > 0 else leitor.MAX_BYTES
+    try:
+        if grep:
+            return leitor.grep(p, grep, max_bytes=limite)
+        if cauda:
+            return leitor.cauda(p, cauda, limite)
+        if linha_inicio or linha_fim:
+            return leitor.trecho_linhas(p, linha_inicio or 1, linha_fim, limite)
+        return leitor.trecho_bytes(p, byte_inicio, byte_fim, limite)
+    except re.error as e: return f"❌ Regex inválida: {e}"
+    except Exception as e: return f"❌ ERRO: {e}"
 
 def escrever_arquivo(caminho: str, conteudo: str) -> str:
-    """Tool: Escreve/Cria arquivo."""
+    """Tool: Escreve/Cria arquivo (gravação atômica em blocos)."""
     p = validate_path(caminho)
     if not p: return "❌ Caminho inválido."
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(conteudo, encoding='utf-8')
+    leitor.escrever_atomico(p, conteudo)
     return f"✅ Salvo: {p}"
 
-def listar_estrutura_projeto(caminho: str = ".") -> str:
-    """Tool: Lista estrutura de pastas."""
-    return get_project_structure(caminho)
+def listar_estrutura_projeto(caminho: str = ".", profundidade: int = 0, padrao: str = "", ordenar: str = "nome") -> str:
+    """Tool: Lista estrutura de pastas (respeita .gitignore). profundidade>0 limita os niveis, padrao filtra por glob (ex: "*.py"), ordenar="tamanho" lista os maiores arquivos."""
+    return get_project_structure(caminho, profundidade or None, padrao or None, ordenar)
 
 
 def _safe_override_skill(nome_safe: str, codigo_python: str) -> str:
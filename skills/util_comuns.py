@@ -1,9 +1,12 @@
 import os
 import sys
+import shlex
 import threading
 from pathlib import Path
-from typing import Dict, Optional, Any
-from skills.schemas import extract_json_from_text, BrainCommand
+from typing import Dict, List, Optional, Any
+
+from skills._cache_artefatos import ArtefatoMemoizado
+from skills._indice_arquivos import IndiceArquivos
 
 # --- CONFIGURAÇÃO ---
 # Recriamos as constantes aqui para serem usadas pelos módulos
@@ -15,7 +18,21 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSOS_LOCK = threading.Lock()
 PROCESSOS_ATIVOS: Dict[str, Dict] = {}
 
+# --- ESTRUTURA DO PROJETO (INDICE INCREMENTAL, VER skills/_indice_arquivos.py) ---
+INDICE_ARQUIVOS = IndiceArquivos(Path("."), LOG_DIR / "indice_arquivos.json")
+_ESTRUTURAS_LOCK = threading.Lock()
+_ESTRUTURAS: Dict[str, ArtefatoMemoizado] = {}
+
 # --- FUNÇÕES UTILITÁRIAS ---
+def comando_gemini() -> List[str]:
+    """Retorna o comando do Gemini CLI (sobrescrevível via GEMINI_CMD, ex: stub local)."""
+    custom = os.getenv("GEMINI_CMD", "").strip()
+    if custom:
+        return shlex.split(custom, posix=os.name != "nt")
+    if os.name == "nt":
+        return ["gemini.cmd"]
+    return ["gemini"]
+
 def validate_path(path_str: str) -> Optional[Path]:
     """Valida se o caminho está dentro da raiz do projeto para segurança."""
     try:
@@ -27,22 +44,63 @@ def validate_path(path_str: str) -> Optional[Path]:
         return target_path
     except: return None
 
-def get_project_structure(caminho: str = ".") -> str:
-    """Retorna a árvore de arquivos do projeto."""
+def _artefato_estrutura(base: str) -> ArtefatoMemoizado:
+    with _ESTRUTURAS_LOCK:
+        artefato = _ESTRUTURAS.get(base)
+        if artefato is None:
+            nome = f"estrutura de {base}/" if base else "estrutura do projeto"
+            artefato = ArtefatoMemoizado(
+                nome,
+                INDICE_ARQUIVOS.atualizar,
+                lambda: INDICE_ARQUIVOS.arvore(base, sincronizar=False),
+            )
+            _ESTRUTURAS[base] = artefato
+        return artefato
+
+def get_project_structure(
+    caminho: str = ".",
+    profundidade: Optional[int] = None,
+    padrao: Optional[str] = None,
+    ordenar: str = "nome",
+) -> str:
+    """
+    Retorna a árvore de arquivos do projeto a partir do índice incremental (respeita .gitignore).
+    `profundidade` limita os níveis expandidos, `padrao` filtra por glob e
+    `ordenar="tamanho"` lista os maiores arquivos.
+    """
     p = validate_path(caminho)
     if not p: return "❌ Erro path."
-    ignorar = {'.git', 'venv', '__pycache__', '.vscode', 'node_modules', 'jarvis_logs', '__init__.py', 'workspace_output'}
-    res = []
-    for root, dirs, files in os.walk(str(p)):
-        dirs[:] = [d for d in dirs if d not in ignorar]
-        level = root.replace(str(p), '').count(os.sep)
-        indent = ' ' * 4 * level
-        res.append(f"{indent}📂 {os.path.basename(root)}/")
-        for f in files: 
-            if f.endswith('.py') or f.endswith('.md') or f.endswith('.txt') or f.endswith('.json'):
-                res.append(f"{indent}    📄 {f}")
-        if len(res) > 300: break
-    return "\n".join(res)
+    if not p.is_dir(): return f"❌ Erro: '{caminho}' não é um diretório."
+    base = p.relative_to(Path.cwd().resolve()).as_posix()
+    base = "" if base == "." else base
+    if ordenar == "tamanho":
+        maiores = INDICE_ARQUIVOS.maiores(base, 30, padrao)
+        if not maiores:
+            return f"ℹ️ Nenhum arquivo indexado em '{caminho}'."
+        return "\n".join(f"{_formatar_bytes(tamanho):>10}  {relativo}" for relativo, tamanho in maiores)
+    if profundidade is None and not padrao:
+        # A arvore completa e a visao pedida pelo Brain a cada turno: memoizada pela versao do indice.
+        return _artefato_estrutura(base).obter()
+    return INDICE_ARQUIVOS.arvore(base, profundidade, padrao)
+
+def _formatar_bytes(n: int) -> str:
+    for unidade in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unidade == "GB":
+            return f"{n:.0f} {unidade}" if unidade == "B" else f"{n:.1f} {unidade}"
+        n /= 1024
+    return f"{n} B"
+
+def cancelar_processo(chave: str) -> bool:
+    """Encerra (sem aguardar) um processo registrado em PROCESSOS_ATIVOS pela chave (rid/pid)."""
+    with PROCESSOS_LOCK:
+        dados = PROCESSOS_ATIVOS.pop(chave, None)
+    if not dados: return False
+    try:
+        proc = dados["proc"]
+        if proc.poll() is None:
+            proc.kill()
+        return True
+    except Exception: return False
 
 def cleanup_processos():
     """Garante encerramento recursivo e total de processos órfãos."""